@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: raw sqlite tuples + json.loads vs __slots__ row models
+
+Usage: python benchmarks/bench_row_models.py [row_count]
+"""
+
+import json
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db.models import Entity, entity_factory
+
+
+def _seed(conn: sqlite3.Connection, row_count: int):
+    """Fill an in-memory entities table with row_count rows"""
+    conn.execute("""
+        CREATE TABLE entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            description TEXT,
+            location_id INTEGER,
+            properties TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO entities (name, entity_type, description, location_id, properties) VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"Entity {i}", "npc", f"A shadowy figure #{i}", i % 50,
+             json.dumps({"hostile": i % 2 == 0, "health": 100, "tags": ["undead", "castle"]}))
+            for i in range(row_count)
+        )
+    )
+
+
+def _measure(label: str, fetch, access, rounds: int = 5):
+    """Measure retained memory of fetched rows and time of repeated property access"""
+    tracemalloc.start()
+    rows = fetch()
+    fetched, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for row in rows:
+            access(row)
+    elapsed = time.perf_counter() - start
+    accessed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} fetched={fetched / 1024:9.1f} KiB  "
+          f"after_access={accessed / 1024:9.1f} KiB  access={elapsed * 1000:8.1f} ms")
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    conn = sqlite3.connect(":memory:")
+    _seed(conn, row_count)
+    print(f"{row_count} entity rows, 5 property reads per row\n")
+
+    def fetch_tuples():
+        return conn.execute("SELECT * FROM entities").fetchall()
+
+    def fetch_models():
+        cursor = conn.cursor()
+        cursor.row_factory = entity_factory
+        return cursor.execute(f"SELECT {Entity.COLUMNS} FROM entities").fetchall()
+
+    def fetch_dicts():
+        cursor = conn.execute("SELECT * FROM entities")
+        columns = [col[0] for col in cursor.description]
+        rows = []
+        for row in cursor:
+            record = dict(zip(columns, row))
+            record["properties"] = json.loads(record["properties"]) if record["properties"] else {}
+            rows.append(record)
+        return rows
+
+    _measure("tuples + json.loads", fetch_tuples, lambda row: json.loads(row[5])["hostile"])
+    _measure("dicts (eager json)", fetch_dicts, lambda row: row["properties"]["hostile"])
+    _measure("__slots__ models (lazy)", fetch_models, lambda row: row.properties["hostile"])
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+End-to-end session benchmark on the offline stub LLM
+
+Runs N-turn scripted sessions headlessly and reports turn latency
+percentiles, retrieval time and memory growth. Results are saved to
+benchmarks/results/<commit>.json and compared with earlier runs.
+
+Usage: python benchmarks/bench_session.py [turns] [stub_latency_seconds]
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Must be set before config is imported
+os.environ["LLM_PROVIDER"] = "stub"
+if len(sys.argv) > 2:
+    os.environ["STUB_LATENCY"] = sys.argv[2]
+os.environ.setdefault("STUB_LATENCY", "0.05")
+os.environ.setdefault("STUB_TOKENS_PER_SECOND", "0")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main import clear_databases
+from src.world.world import World
+from src.agents.dungeon_master.dm import DungeonMaster
+from src.utils.scripted_player import run_scripted_session
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _compare(commit: str):
+    """Print p50/p90 latency and memory growth of earlier saved runs next to this one"""
+    rows = []
+    for path in sorted(RESULTS_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime):
+        previous = json.loads(path.read_text())
+        rows.append((path.stem, previous))
+    print(f"\n{'commit':<10} {'turns':>5} {'p50 ms':>9} {'p90 ms':>9} {'retr ms/turn':>13} {'KiB/turn':>9}")
+    for name, result in rows:
+        marker = " *" if name == commit else ""
+        print(f"{name:<10} {result['turns']:>5} {result['turn_latency_ms']['p50']:>9.1f} "
+              f"{result['turn_latency_ms']['p90']:>9.1f} {result['retrieval_ms_per_turn']:>13.2f} "
+              f"{result['memory_kib']['growth_per_turn']:>9.1f}{marker}")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    clear_databases()
+    world = None
+    dm = None
+    try:
+        world = World()
+        dm = DungeonMaster(world)
+        dm.generate_opening_scene()
+        result = run_scripted_session(dm, turns)
+    finally:
+        if dm:
+            dm.close()
+        if world:
+            world.close()
+        clear_databases()
+
+    commit = _commit()
+    RESULTS_DIR.mkdir(exist_ok=True)
+    (RESULTS_DIR / f"{commit}.json").write_text(json.dumps(result, indent=2, default=str))
+
+    print(json.dumps({key: value for key, value in result.items() if key != "plot_status"}, indent=2))
+    _compare(commit)
+
+
+if __name__ == "__main__":
+    main()
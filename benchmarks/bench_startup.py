@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time the player waits after entering their name
+
+Compares the old strictly sequential startup (all work after the name prompt)
+with the background warm-up pipeline, given a simulated time spent on the
+title and name screens. Needs the configured LLM provider for the opening scene.
+
+Usage: python benchmarks/bench_startup.py [seconds_on_name_screen]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from main import build_warmup_pipeline, clear_databases
+from src.db.embeddings import stop_embedding_pool
+
+
+def _sequential() -> float:
+    """Run every stage inline, as the old startup did after the name prompt"""
+    pipeline = build_warmup_pipeline()
+    results = {}
+    start = time.perf_counter()
+    for stage in pipeline.stages:
+        results[stage.name] = stage.fn(results)
+    return time.perf_counter() - start
+
+
+def _pipelined(name_screen_seconds: float):
+    """Start warm-up, simulate the player typing, then measure the remaining wait"""
+    pipeline = build_warmup_pipeline().start()
+    time.sleep(name_screen_seconds)
+    start = time.perf_counter()
+    pipeline.wait()
+    return time.perf_counter() - start, pipeline.timings()
+
+
+def main():
+    name_screen_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    try:
+        sequential = _sequential()
+        waited, timings = _pipelined(name_screen_seconds)
+    finally:
+        clear_databases()
+        stop_embedding_pool()
+
+    print("Stage timings (pipelined run):")
+    for name, duration in timings.items():
+        print(f"  {name:<14} {duration * 1000:9.1f} ms" if duration is not None else f"  {name:<14}       n/a")
+    print(f"\nWait after name, sequential: {sequential * 1000:9.1f} ms")
+    print(f"Wait after name, pipelined:  {waited * 1000:9.1f} ms "
+          f"(after {name_screen_seconds:.1f}s on the name screen)")
+
+
+if __name__ == "__main__":
+    main()
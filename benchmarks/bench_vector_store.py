@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Vector store benchmark: NumPy memmap backend vs ChromaDB for episodic memory
+
+Fills both backends with the same N synthetic memories (embedded once), then
+reports cold start (opening the persisted store plus its first query) and
+query latency p50/p95 over a set of queries. The ChromaDB collection is
+cleared before and after; the NumPy store lives in a temporary directory.
+
+Usage: python benchmarks/bench_vector_store.py [n_docs] [n_queries]
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db.embeddings import embed_texts
+from src.db.vector_store import ChromaVectorStore, NumpyVectorStore
+
+SUBJECTS = ["The Count", "Jonathan", "Mina", "A wolf", "The coachman", "Van Helsing", "A bat", "The innkeeper"]
+VERBS = ["whispers in", "waits in", "flees from", "searches", "locks", "guards", "remembers", "burns"]
+PLACES = ["the library", "the chapel", "the north tower", "the crypt", "the great hall", "the courtyard", "the cellar"]
+DETAILS = ["at midnight", "by candlelight", "in the fog", "before dawn", "under a blood moon", "while wolves howl"]
+
+
+def _synthetic_docs(n: int) -> list:
+    rng = random.Random(7)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(PLACES)} {rng.choice(DETAILS)}. (#{i})"
+        for i in range(n)
+    ]
+
+
+def _fill(store, docs, embeddings, batch_size: int = 500):
+    for start in range(0, len(docs), batch_size):
+        end = start + batch_size
+        ids = [f"bench-{i}" for i in range(start, min(end, len(docs)))]
+        metadatas = [{"type": "bench", "turn": i} for i in range(start, min(end, len(docs)))]
+        store.add(ids, docs[start:end], metadatas, embeddings=embeddings[start:end])
+
+
+def _measure(open_store, queries) -> dict:
+    start = time.perf_counter()
+    store = open_store()
+    store.query(queries[0], 5)
+    cold_start = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.query(query, 5)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "cold_start": cold_start,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0],
+    }
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    docs = _synthetic_docs(n_docs)
+    queries = [f"who {verb} {place}" for verb, place in zip(VERBS * 10, PLACES * 10)][:n_queries]
+
+    start = time.perf_counter()
+    embeddings = embed_texts(docs)
+    print(f"Embedded {n_docs} docs in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        _fill(NumpyVectorStore(path=Path(tmp)), docs, embeddings)
+        results["numpy"] = _measure(lambda: NumpyVectorStore(path=Path(tmp)), queries)
+
+    chroma = ChromaVectorStore()
+    chroma.clear()
+    try:
+        _fill(chroma, docs, embeddings)
+        results["chroma"] = _measure(ChromaVectorStore, queries)
+    finally:
+        chroma.clear()
+
+    print(f"\n{'backend':<8} {'cold start':>12} {'query p50':>12} {'query p95':>12}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['cold_start'] * 1000:9.1f} ms {result['p50'] * 1000:9.2f} ms {result['p95'] * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
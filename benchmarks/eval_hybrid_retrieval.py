@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Relevance/latency evaluation: vector-only vs hybrid (BM25 + vector) episodic memory search
+
+Seeds the episodic memory collection with the world lore plus a handful of
+conversation memories, runs labelled queries through both retrieval modes and
+reports hit rate @k and latency. Wipes the collection before and after.
+
+Usage: python benchmarks/eval_hybrid_retrieval.py [k]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db.crud import add_episodic_memory, search_episodic_memory, clear_episodic_memory
+from src.world.world import World
+
+MEMORIES = [
+    "Player: I open the oak door | Dungeon Master: The library swallows you in dust and parchment.",
+    "Player: I call out to Dracula | Dungeon Master: Laughter echoes from the great hall above.",
+    "Player: I light the candle | Dungeon Master: Wax drips onto a silver crucifix beside the altar.",
+    "Player: I climb the tower stairs | Dungeon Master: The north tower wind carries the howl of wolves.",
+    "Player: I read the journal | Dungeon Master: Jonathan Harker's handwriting trembles across the page.",
+]
+
+# (query, substring a relevant document must contain)
+QUERIES = [
+    ("Dracula", "Dracula"),
+    ("library", "library"),
+    ("crucifix", "crucifix"),
+    ("Harker journal", "Harker"),
+    ("go back up the north tower", "tower"),
+    ("where did I hear wolves", "wolves"),
+    ("holy symbols that protect against vampires", "crucifix"),
+    ("the castle gates", "gates"),
+]
+
+
+def _evaluate(label: str, k: int, hybrid: bool):
+    hits = 0
+    latencies = []
+    for query, expected in QUERIES:
+        start = time.perf_counter()
+        results = search_episodic_memory(query, n_results=k, hybrid=hybrid)
+        latencies.append((time.perf_counter() - start) * 1000)
+        documents = results["documents"][0] if results.get("documents") else []
+        hits += any(expected.lower() in doc.lower() for doc in documents)
+    print(f"{label:<8} hit@{k}={hits}/{len(QUERIES)}  "
+          f"p50={statistics.median(latencies):7.2f} ms  max={max(latencies):7.2f} ms")
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    clear_episodic_memory()
+    try:
+        World()
+        for memory in MEMORIES:
+            add_episodic_memory(memory, {"type": "conversation", "timestamp": time.time()})
+
+        # Warm the embedding model and the lexical index before timing
+        search_episodic_memory("warm up", n_results=k, hybrid=True)
+
+        _evaluate("vector", k, hybrid=False)
+        _evaluate("hybrid", k, hybrid=True)
+    finally:
+        clear_episodic_memory()
+
+
+if __name__ == "__main__":
+    main()
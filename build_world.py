@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Build World - precompute the world snapshot the game maps in at startup
+
+Chunks and embeds the lore, creates the seeded SQLite database and copies the
+prompt files into data/snapshots/<content hash>/. The game uses the snapshot
+whose hash matches the current sources; nothing is rebuilt while they are unchanged.
+
+Usage: python build_world.py [--force] [--keep N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.world.snapshot import build_snapshot
+from src.db.embeddings import start_embedding_pool, stop_embedding_pool
+from src.utils.log import setup_logging, shutdown_logging
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Build the BhootAI world snapshot")
+    parser.add_argument("--force", action="store_true", help="rebuild even if a snapshot for the current sources exists")
+    parser.add_argument("--keep", type=int, default=2, help="snapshots to keep, the new one included")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    start_embedding_pool()
+    try:
+        start = time.perf_counter()
+        snapshot, built = build_snapshot(force=args.force, keep=args.keep)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_embedding_pool()
+        shutdown_logging()
+
+    if built:
+        print(f"Built world snapshot {snapshot.content_hash} in {elapsed:.1f}s")
+    else:
+        print(f"World snapshot {snapshot.content_hash} is up to date")
+    print(f"  path:   {snapshot.path}")
+    print(f"  chunks: {snapshot.manifest['chunks']} x {snapshot.manifest['dim']} dims")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -12,9 +13,19 @@ DATA_DIR = BASE_DIR / "data"
 # Database paths
 SQLITE_DB_PATH = DATA_DIR / "sqlite" / "game.db"
 CHROMADB_PATH = DATA_DIR / "chromadb"
+VECTOR_STORE_PATH = DATA_DIR / "vectors"
+
+# World sources and the prebuilt snapshots made from them (python build_world.py)
+LORE_PATH = BASE_DIR / "initial_world_context.txt"
+PROMPTS_DIR = BASE_DIR / "prompts"
+WORLD_SNAPSHOT_DIR = DATA_DIR / "snapshots"
+WORLD_SNAPSHOT = os.getenv("WORLD_SNAPSHOT", "true").lower() == "true"  # use a matching snapshot when one exists
+
+# Episodic memory vector store: "numpy" (memory-mapped matrix) or "chroma"
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "numpy").lower()
 
 # LLM Configuration
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()  # openai, anthropic, gemini
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()  # openai, anthropic, gemini, local, stub
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -23,8 +34,143 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 LLM_MODELS = {
     "openai": os.getenv("OPENAI_MODEL", "gpt-4"),
     "anthropic": os.getenv("ANTHROPIC_MODEL", "claude-3-sonnet-20240229"),
-    "gemini": os.getenv("GEMINI_MODEL", "gemini-pro")
+    "gemini": os.getenv("GEMINI_MODEL", "gemini-pro"),
+    "local": os.getenv("LOCAL_MODEL", "local-model"),
+    "stub": "stub"
+}
+
+# Local OpenAI-compatible server (llama.cpp, vLLM, ...) used by the "local" provider
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8080/v1")
+LOCAL_LLM_API_KEY = os.getenv("LOCAL_LLM_API_KEY", "local")
+
+# Per-task routing: "provider" or "provider:model"; unset tasks use LLM_PROVIDER and its model
+LLM_TASK_ROUTES = {
+    "narration": os.getenv("LLM_NARRATION_ROUTE"),  # player-facing responses and opening scene
+    "plot": os.getenv("LLM_PLOT_ROUTE"),  # plot extension
+    "summary": os.getenv("LLM_SUMMARY_ROUTE"),  # memory consolidation summaries
+}
+
+# Prices in USD per million (input, output) tokens; override with LLM_PRICING_JSON='{"model": [in, out]}'
+LLM_PRICING = {
+    "gpt-4": (30.0, 60.0),
+    "claude-3-sonnet-20240229": (3.0, 15.0),
+    "gemini-pro": (0.5, 1.5),
+}
+LLM_PRICING.update({model: tuple(prices) for model, prices in json.loads(os.getenv("LLM_PRICING_JSON", "{}")).items()})
+
+# Per-session LLM budgets (0 disables): past the soft budget optional calls are skipped and
+# context shrinks; past the hard budget only narration with minimal context is generated
+LLM_SOFT_BUDGET_TOKENS = int(os.getenv("LLM_SOFT_BUDGET_TOKENS", "0"))
+LLM_HARD_BUDGET_TOKENS = int(os.getenv("LLM_HARD_BUDGET_TOKENS", "0"))
+LLM_SOFT_BUDGET_USD = float(os.getenv("LLM_SOFT_BUDGET_USD", "0"))
+LLM_HARD_BUDGET_USD = float(os.getenv("LLM_HARD_BUDGET_USD", "0"))
+LLM_USAGE_FLUSH_EVERY = int(os.getenv("LLM_USAGE_FLUSH_EVERY", "10"))  # usage rows buffered per SQLite write
+
+# Output token budgets per narration turn type and per call site; replies cut at the budget are
+# trimmed to the last full sentence. Override with OUTPUT_TOKEN_BUDGETS_JSON='{"scene_change": 400}'
+OUTPUT_TOKEN_BUDGETS = {
+    "scene_change": 220,
+    "short_reaction": 90,
+    "option_list": 160,
+    "opening_scene": 160,
+    "memory_summary": 120,
+    "story_summary": 200,
+    "npc_reactor": 60,
+    "world_extractor": 400,
+    "plot_reask": 200,
+    "cache_variation": 270,  # also capped at the cached reply's length plus 50
 }
+OUTPUT_TOKEN_BUDGETS.update({name: int(tokens) for name, tokens in json.loads(os.getenv("OUTPUT_TOKEN_BUDGETS_JSON", "{}")).items()})
+PLOT_POINT_TOKENS = int(os.getenv("PLOT_POINT_TOKENS", "40"))  # plot extension budget per requested point
+# Narration stops before the model starts writing the player's next line
+NARRATION_STOP_SEQUENCES = json.loads(os.getenv("NARRATION_STOP_SEQUENCES_JSON", '["\\nPlayer:", "\\nPlayer says:", "\\nUser:"]'))
+
+# Offline stub provider (LLM_PROVIDER=stub): deterministic canned outputs for tests and benchmarks
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.2"))  # seconds before the first token
+STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", "50"))  # 0 = instant
+STUB_RESPONSES_PATH = os.getenv("STUB_RESPONSES_PATH")  # optional JSON overriding canned outputs
+
+# Episodic memory consolidation
+EPISODIC_MEMORY_MAX_RECORDS = int(os.getenv("EPISODIC_MEMORY_MAX_RECORDS", "500"))
+MEMORY_CONSOLIDATION_INTERVAL = float(os.getenv("MEMORY_CONSOLIDATION_INTERVAL", "60"))  # seconds between passes
+MEMORY_CONSOLIDATION_BATCH_SIZE = int(os.getenv("MEMORY_CONSOLIDATION_BATCH_SIZE", "100"))  # records per pass
+MEMORY_DUPLICATE_THRESHOLD = float(os.getenv("MEMORY_DUPLICATE_THRESHOLD", "0.92"))  # cosine similarity
+MEMORY_CONSOLIDATION_MIN_AGE = float(os.getenv("MEMORY_CONSOLIDATION_MIN_AGE", "600"))  # seconds before merging
+MEMORY_MAX_AGE = float(os.getenv("MEMORY_MAX_AGE", "0"))  # seconds, 0 disables age eviction
+
+# Lore ingestion: sentence-aligned chunks streamed from the lore file
+LORE_CHUNK_MAX_TOKENS = int(os.getenv("LORE_CHUNK_MAX_TOKENS", "96"))
+LORE_CHUNK_MIN_TOKENS = int(os.getenv("LORE_CHUNK_MIN_TOKENS", "32"))  # smaller chunks continue into the next paragraph
+LORE_READ_SIZE = int(os.getenv("LORE_READ_SIZE", str(64 * 1024)))  # bytes read from the lore file at a time
+LORE_INGEST_BATCH_SIZE = int(os.getenv("LORE_INGEST_BATCH_SIZE", "64"))  # chunks per embed + write
+
+# Embedding worker processes for large jobs (lore, consolidation, memory batches)
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))  # 0 embeds everything in the game process
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))  # texts per worker request
+EMBEDDING_MAX_PENDING = int(os.getenv("EMBEDDING_MAX_PENDING", "4"))  # shared buffers, i.e. batches in flight
+EMBEDDING_MAX_DIM = int(os.getenv("EMBEDDING_MAX_DIM", "1024"))  # buffer width; the default model uses 384
+EMBEDDING_SYNC_THRESHOLD = int(os.getenv("EMBEDDING_SYNC_THRESHOLD", "8"))  # smaller jobs are embedded inline
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "60"))  # seconds before a batch falls back inline
+
+# Write-behind ingestion of episodic memories
+MEMORY_WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "16"))  # memories per embed + write
+MEMORY_WRITE_FLUSH_INTERVAL = float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.5"))  # seconds to wait for a fuller batch
+
+# Hybrid lexical + vector retrieval
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+LEXICAL_FAST_PATH_MAX_TERMS = int(os.getenv("LEXICAL_FAST_PATH_MAX_TERMS", "3"))  # short queries only
+LEXICAL_FAST_PATH_MARGIN = float(os.getenv("LEXICAL_FAST_PATH_MARGIN", "1.5"))  # top score / runner-up score
+
+# Per-turn retrieval gating: continuations and same-topic inputs reuse the last search
+RETRIEVAL_GATING = os.getenv("RETRIEVAL_GATING", "true").lower() == "true"
+RETRIEVAL_MIN_COLLECTION_SIZE = int(os.getenv("RETRIEVAL_MIN_COLLECTION_SIZE", "8"))  # smaller stores are searched once
+RETRIEVAL_MIN_INPUT_WORDS = int(os.getenv("RETRIEVAL_MIN_INPUT_WORDS", "2"))  # shorter inputs reuse the last search
+RETRIEVAL_DRIFT_THRESHOLD = float(os.getenv("RETRIEVAL_DRIFT_THRESHOLD", "0.8"))  # cosine to the last searched input
+RETRIEVAL_AUDIT_EVERY = int(os.getenv("RETRIEVAL_AUDIT_EVERY", "10"))  # gated turns per background quality audit, 0 = never
+
+# Recency-weighted retrieval of conversation memories
+RECENCY_WEIGHT = float(os.getenv("RECENCY_WEIGHT", "0.3"))  # 0 = pure relevance, 1 = pure recency
+RECENCY_HALF_LIFE = float(os.getenv("RECENCY_HALF_LIFE", "1800"))  # seconds
+
+# Speculative pre-generation of DM responses for offered options (opt-in)
+SPECULATIVE_MODE = os.getenv("SPECULATIVE_MODE", "false").lower() == "true"
+SPECULATION_MAX_OPTIONS = int(os.getenv("SPECULATION_MAX_OPTIONS", "3"))
+SPECULATION_TOKEN_BUDGET = int(os.getenv("SPECULATION_TOKEN_BUDGET", "1500"))  # estimated tokens per round
+SPECULATION_EXPECTED_TOKENS = int(os.getenv("SPECULATION_EXPECTED_TOKENS", "300"))  # prompt + response per option
+SPECULATION_MATCH_THRESHOLD = float(os.getenv("SPECULATION_MATCH_THRESHOLD", "0.85"))  # cosine similarity
+
+# Plot extension scheduling
+PLOT_LOW_WATERMARK = int(os.getenv("PLOT_LOW_WATERMARK", "2"))  # generate when fewer upcoming points remain
+PLOT_BATCH_SIZE = int(os.getenv("PLOT_BATCH_SIZE", "4"))  # points generated per extension
+PLOT_QUEUE_MAX = int(os.getenv("PLOT_QUEUE_MAX", "12"))
+PLOT_COMPLETED_HISTORY = int(os.getenv("PLOT_COMPLETED_HISTORY", "50"))
+PLOT_ADVANCE_SIMILARITY = float(os.getenv("PLOT_ADVANCE_SIMILARITY", "0.45"))  # response vs plot point
+
+# Session checkpointing for crash-safe resume
+CHECKPOINT_PATH = DATA_DIR / "checkpoints" / "session.json"
+CHECKPOINT_INTERVAL = int(os.getenv("CHECKPOINT_INTERVAL", "1"))  # turns between checkpoints
+CHECKPOINT_HISTORY_TAIL = int(os.getenv("CHECKPOINT_HISTORY_TAIL", "20"))  # messages kept in a checkpoint
+
+# Semantic cache of DM responses for near-duplicate inputs in an unchanged state
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "true").lower() == "true"
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "64"))
+RESPONSE_CACHE_VARIATION = os.getenv("RESPONSE_CACHE_VARIATION", "false").lower() == "true"  # rephrase hits with the summary model
+
+# Per-turn background agents (plot planner, NPC reactors, story summarizer)
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "4"))
+AGENT_TURN_DEADLINE = float(os.getenv("AGENT_TURN_DEADLINE", "30"))  # seconds before a turn's agents are cancelled
+NPC_REACTOR_MAX = int(os.getenv("NPC_REACTOR_MAX", "3"))  # NPCs reacting per turn
+STORY_SUMMARY_INTERVAL = int(os.getenv("STORY_SUMMARY_INTERVAL", "5"))  # turns between story summary updates
+WORLD_EXTRACTION = os.getenv("WORLD_EXTRACTION", "true").lower() == "true"  # map locations and entities from responses
+WORLD_EXTRACTION_MAX_ITEMS = int(os.getenv("WORLD_EXTRACTION_MAX_ITEMS", "8"))  # locations and entities kept per response
+
+# Logging configuration
+LOG_PATH = Path(os.getenv("LOG_PATH", BASE_DIR / "logs" / "bhootai.log"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_SECONDS = float(os.getenv("LOG_ROTATE_SECONDS", str(24 * 3600)))  # 0 disables time-based rotation
 
 # Ensure directories exist
 SQLITE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -4,9 +4,11 @@ BhootAI - Interactive Horror Text RPG
 Main game loop that manages player-DM interactions
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
+from typing import Dict, Optional
 
 # Suppress HuggingFace tokenizer warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -16,14 +18,19 @@ sys.path.append(str(Path(__file__).parent / "src"))
 
 from src.world.world import World
 from src.agents.dungeon_master.dm import DungeonMaster
-from src.db.database import get_sqlite_connection, get_chromadb_client
-from src.db.crud import get_current_game_state
+from src.db.database import get_sqlite_connection
+from src.db.crud import get_current_game_state, clear_episodic_memory
+from src.db.embeddings import embed_text, start_embedding_pool, stop_embedding_pool, get_embedding_pool_metrics
 from src.utils.terminal_ui import TerminalUI
+from src.utils.warmup import WarmupPipeline
+from src.utils.log import setup_logging, shutdown_logging, set_log_context, get_logger
+from src.world.checkpoint import save_checkpoint, load_checkpoint, delete_checkpoint
+from config.configs import CHECKPOINT_INTERVAL
+
+logger = get_logger("main")
 
 def clear_databases():
     """Clear all data from databases for fresh session"""
-    print("Clearing databases for fresh session...")
-    
     # Clear SQLite database
     conn = get_sqlite_connection()
     cursor = conn.cursor()
@@ -32,80 +39,134 @@ def clear_databases():
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
     tables = cursor.fetchall()
     
-    # Clear all tables
+    # Clear all tables; LLM usage is kept so cost can be compared across sessions
     for table in tables:
         table_name = table[0]
-        if table_name != 'sqlite_sequence':  # Skip SQLite internal table
+        if table_name not in ('sqlite_sequence', 'llm_usage'):  # Skip SQLite internal table and usage history
             cursor.execute(f"DELETE FROM {table_name}")
     
     conn.commit()
     conn.close()
     
-    # Clear ChromaDB collection
-    try:
-        client = get_chromadb_client()
-        collection = client.get_collection("episodic_memory")
-        
-        # Get all documents to delete them by ID
-        results = collection.get()
-        if results and results.get('ids'):
-            collection.delete(ids=results['ids'])
-            
-    except Exception as e:
-        pass  # Silently handle ChromaDB errors
+    # Clear ChromaDB collection and its lexical index
+    clear_episodic_memory()
+    
+    # A fresh session invalidates any saved checkpoint
+    delete_checkpoint()
 
-def log_to_file(message: str):
-    """Log messages to logs.txt file"""
-    try:
-        with open("logs.txt", "a") as f:
-            f.write(f"{message}\n")
-    except:
-        pass  # Silently fail if logging fails
+def restore_world(checkpoint: Dict) -> World:
+    """Reattach to the persisted databases without re-ingesting the world lore"""
+    world = World(load_initial_context=False)
+    world.restore_state(checkpoint["world"])
+    return world
+
+def restore_dungeon_master(world: World, checkpoint: Dict) -> DungeonMaster:
+    """Rebuild the DM from a checkpoint without any LLM calls"""
+    dm = DungeonMaster(world)
+    dm.restore_state(checkpoint["dm"])
+    return dm
+
+def warm_up_embeddings():
+    """Load the query embedding model here and start the worker pool for bulk embedding"""
+    start_embedding_pool()
+    return embed_text("warm up")
+
+def build_warmup_pipeline(checkpoint: Optional[Dict] = None) -> WarmupPipeline:
+    """Startup work that runs in the background while the player is on the title screens"""
+    pipeline = WarmupPipeline()
+    if checkpoint is None:
+        pipeline.add_stage("databases", "Clearing the previous nightmare...", lambda results: clear_databases())
+    pipeline.add_stage("embeddings", "Loading ancient memories...", lambda results: warm_up_embeddings())
+    if checkpoint is None:
+        pipeline.add_stage("world", "Initializing the cursed realm...", lambda results: World())
+        pipeline.add_stage("dm", "Summoning the Dungeon Master...", lambda results: DungeonMaster(results["world"]))
+        pipeline.add_stage("opening_scene", "Preparing your nightmare...", lambda results: results["dm"].generate_opening_scene())
+    else:
+        pipeline.add_stage("world", "Returning to the cursed realm...", lambda results: restore_world(checkpoint))
+        pipeline.add_stage("dm", "Summoning the Dungeon Master...", lambda results: restore_dungeon_master(results["world"], checkpoint))
+    return pipeline
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BhootAI - Interactive Horror Text RPG")
+    parser.add_argument("--resume", action="store_true", help="continue the last interrupted session from its checkpoint")
+    return parser.parse_args(argv)
 
 def main():
     """Main game loop"""
+    args = parse_args()
+    setup_logging()
     ui = TerminalUI()
+    world = None
+    dm = None
+    pipeline = None
+    clean_exit = False
     
     try:
-        # Show loading screen
-        ui.show_loading_screen()
-        
-        # Clear databases for fresh session
-        clear_databases()
-        
-        # Show title screen
-        ui.show_title_screen()
+        checkpoint = load_checkpoint() if args.resume else None
+        if args.resume and checkpoint is None:
+            print("No saved session found, starting a new nightmare...")
         
-        # Get player name
-        player_name = ui.get_player_name()
+        # Start database setup, model loading, world ingestion and the opening scene right away
+        pipeline = build_warmup_pipeline(checkpoint).start()
         
-        # Initialize world and DM
-        print("Initializing the cursed realm...")
-        world = World()
-        dm = DungeonMaster(world)
+        # Show loading screen until the first stage is done
+        first_stage = pipeline.stages[0].name
+        ui.show_loading_screen(progress_fn=pipeline.progress, until=lambda: pipeline.is_done(first_stage))
         
-        # Generate chapter description
-        chapter_description = dm.generate_opening_scene()
-        
-        # Show chapter header
-        ui.show_chapter_header(1, "THE AWAKENING", chapter_description)
+        if checkpoint:
+            player_name = checkpoint["player_name"]
+        else:
+            # Show title screen
+            ui.show_title_screen()
+            
+            # Get player name while the rest of the warm-up continues
+            player_name = ui.get_player_name()
         
-        # Wait for player to say "start"
-        while True:
-            player_input = input(f"{player_name}: ").strip().lower()
-            if player_input == "start":
-                break
-            elif player_input in ['quit', 'exit', 'q']:
-                return
-            else:
-                print("Say 'start' to begin your nightmare...")
+        # Wait for whatever warm-up work is still outstanding
+        ui.wait_with_progress(pipeline.progress, pipeline.is_done)
+        results = pipeline.wait()
+        world = results["world"]
+        dm = results["dm"]
+        world.start_memory_consolidation(summarize_fn=dm.summarize_memories)
+        set_log_context(session_id=world.session_id)
+        logger.info("Warm-up complete", extra={"timings": pipeline.timings(), "resumed": checkpoint is not None})
         
-        # Generate first DM interaction automatically
-        first_interaction = dm.respond_to_player("begin")
-        ui.show_dm_response(first_interaction)
+        if checkpoint:
+            # Pick up where the interrupted session left off
+            interaction_count = checkpoint["interaction_count"]
+            ui.show_chapter_header(1, "THE AWAKENING", f"{player_name}, the nightmare has not let you go...")
+            last_response = next((msg["content"] for msg in reversed(dm.conversation_history) if msg["role"] == "assistant"), None)
+            if last_response:
+                ui.show_dm_response(last_response)
+        else:
+            # Generated chapter description
+            chapter_description = results["opening_scene"]
+            
+            # Show chapter header
+            ui.show_chapter_header(1, "THE AWAKENING", chapter_description)
+            
+            # Generate the first DM interaction while the player reads the chapter header
+            first_turn = dm.prepare_turn_async("begin")
+            
+            # Wait for player to say "start"
+            while True:
+                player_input = input(f"{player_name}: ").strip().lower()
+                if player_input == "start":
+                    break
+                elif player_input in ['quit', 'exit', 'q']:
+                    clean_exit = True
+                    return
+                else:
+                    print("Say 'start' to begin your nightmare...")
+            
+            # Commit the first DM interaction generated in the background
+            first_interaction = dm.commit_prepared_turn(first_turn.result())
+            ui.show_dm_response(first_interaction)
+            interaction_count = 1  # Start at 1 since we already had the first interaction
+            save_checkpoint(dm, player_name, interaction_count)
         
         # Game loop
-        interaction_count = 1  # Start at 1 since we already had the first interaction
         while True:
             try:
                 # Get player input
@@ -113,6 +174,7 @@ def main():
                 
                 # Check for exit commands
                 if player_input.lower() in ['quit', 'exit', 'q']:
+                    clean_exit = True
                     break
                 
                 if not player_input:
@@ -120,21 +182,27 @@ def main():
                     continue
                 
                 # Get DM response
+                set_log_context(turn=interaction_count + 1)
                 response = dm.respond_to_player(player_input)
                 ui.show_dm_response(response)
                 
                 interaction_count += 1
                 
+                # Checkpoint is small and bounded, so this stays cheap as the session grows
+                if interaction_count % CHECKPOINT_INTERVAL == 0:
+                    save_checkpoint(dm, player_name, interaction_count)
+                
                 # Show progress every 10 interactions
                 if interaction_count % 10 == 0:
                     plot_status = dm.get_current_plot_status()
                     ui.show_progress(interaction_count, plot_status)
                 
             except KeyboardInterrupt:
+                save_checkpoint(dm, player_name, interaction_count)
                 print(f"\n\n{player_name}, you are torn from the nightmare realm...")
                 break
             except Exception as e:
-                log_to_file(f"Error in game loop: {e}")
+                logger.error("Error in game loop", exc_info=e)
                 ui.show_error_message(str(e))
                 continue
         
@@ -143,15 +211,49 @@ def main():
         ui.show_exit_screen(player_name, interaction_count, plot_status)
         
     except Exception as e:
-        log_to_file(f"Fatal error: {e}")
+        logger.critical("Fatal error", exc_info=e)
         ui.show_error_message(str(e))
         sys.exit(1)
     
     finally:
-        # Clean up databases
-        print("Cleaning up session data...")
-        clear_databases()
-        print("Session cleanup complete.")
+        if pipeline and world is None:
+            # Interrupted during warm-up: let it finish so its writes land before any cleanup
+            # and the world and DM it built are closed below
+            try:
+                pipeline.wait()
+            except Exception as e:
+                logger.warning("Warm-up failed", exc_info=e)
+            world, dm = pipeline.results.get("world"), pipeline.results.get("dm")
+        if dm:
+            dm.close()
+            logger.info("Plot parse metrics", extra={"metrics": dm.get_plot_parse_metrics()})
+            if dm.response_cache:
+                logger.info("Response cache metrics", extra={"metrics": dm.get_cache_metrics()})
+            logger.info("World extraction metrics", extra={"metrics": dm.get_world_extraction_metrics()})
+            logger.info("Output budget metrics", extra={"metrics": dm.get_output_budget_metrics()})
+            if dm.retrieval_gate:
+                logger.info("Retrieval gate metrics", extra={"metrics": dm.get_retrieval_metrics()})
+            if dm.speculator:
+                logger.info("Speculation metrics", extra={"metrics": dm.get_speculation_metrics()})
+            for group_by in ("call_site", "provider"):
+                logger.info("LLM usage", extra={"group_by": group_by, "usage": dm.get_usage_summary(group_by)})
+        if world:
+            # Stops consolidation and flushes queued memories before the data is cleared or kept
+            world.close()
+            for sample in world.get_memory_report():
+                logger.info("Episodic memory report", extra={"sample": sample})
+        if get_embedding_pool_metrics():
+            logger.info("Embedding pool metrics", extra={"metrics": get_embedding_pool_metrics()})
+        stop_embedding_pool()
+        
+        if clean_exit or load_checkpoint() is None:
+            # Clean up databases unless there is a checkpoint to resume from
+            print("Cleaning up session data...")
+            clear_databases()
+            print("Session cleanup complete.")
+        else:
+            print("Your session was saved. Run with --resume to continue.")
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
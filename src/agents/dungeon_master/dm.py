@@ -1,32 +1,133 @@
 import json
-from typing import List, Dict, Optional, Any
+import threading
+import time
+from collections import deque
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, List, Dict, Optional, Any, Tuple
 from pathlib import Path
-from src.utils.llm import LLMClient
+from src.utils.llm import LLMClient, estimate_tokens
+from src.utils.usage import UsageTracker, BUDGET_OK, BUDGET_SOFT, BUDGET_HARD
+from src.utils.log import get_logger
+from src.utils.structured import ACTOR_ENTITY_TYPES, PLOT_POINTS_SCHEMA, parse_plot_points, parse_plot_lines
 from src.world.world import World
-from config.configs import BASE_DIR
+from src.world.memory_consolidation import extractive_summary
+from src.world.snapshot import prompts_dir
+from src.agents.dungeon_master.speculation import SpeculativeResponder, extract_options
+from src.agents.dungeon_master.plot_scheduler import PlotAdvanceClassifier, PlotUpdate
+from src.agents.dungeon_master.response_cache import ResponseCache, state_key
+from src.agents.dungeon_master.retrieval_gate import RetrievalGate, SKIP, REUSE
+from src.agents.dungeon_master.output_budget import TURN_TYPE_HINTS, TurnTypeStats, call_site_metrics, classify_turn, scaled_budget
+from src.agents.runtime import AgentGraph, AgentRunner, TurnRun
+from src.agents.turn_agents import PlotPlannerAgent, NpcReactorAgent, MemorySummarizerAgent, WorldExtractorAgent
+from config.configs import (
+    SPECULATIVE_MODE, SPECULATION_MAX_OPTIONS, SPECULATION_TOKEN_BUDGET,
+    SPECULATION_EXPECTED_TOKENS, SPECULATION_MATCH_THRESHOLD,
+    PLOT_LOW_WATERMARK, PLOT_BATCH_SIZE, PLOT_QUEUE_MAX, PLOT_COMPLETED_HISTORY, PLOT_ADVANCE_SIMILARITY,
+    CHECKPOINT_HISTORY_TAIL, AGENT_MAX_WORKERS, AGENT_TURN_DEADLINE, NPC_REACTOR_MAX,
+    STORY_SUMMARY_INTERVAL, RESPONSE_CACHE, RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_VARIATION, RETRIEVAL_GATING, RETRIEVAL_MIN_COLLECTION_SIZE, RETRIEVAL_MIN_INPUT_WORDS,
+    RETRIEVAL_DRIFT_THRESHOLD, RETRIEVAL_AUDIT_EVERY, WORLD_EXTRACTION, WORLD_EXTRACTION_MAX_ITEMS,
+    OUTPUT_TOKEN_BUDGETS, PLOT_POINT_TOKENS, NARRATION_STOP_SEQUENCES
+)
+
+logger = get_logger("dm")
+
+# (world lore, episodic memories) retrieved per turn and history messages sent, by budget level
+CONTEXT_SIZES = {BUDGET_OK: (3, 2), BUDGET_SOFT: (2, 1), BUDGET_HARD: (1, 0)}
+HISTORY_WINDOWS = {BUDGET_OK: 10, BUDGET_SOFT: 6, BUDGET_HARD: 2}
+# Share of each output token budget granted, by budget level
+OUTPUT_BUDGET_SCALES = {BUDGET_OK: 1.0, BUDGET_SOFT: 0.8, BUDGET_HARD: 0.6}
+
+class PreparedTurn:
+    """A DM turn generated ahead of time, not yet committed to history"""
+    
+    def __init__(self, player_input: str, response: str, plot_update: PlotUpdate, turn: int):
+        self.player_input = player_input
+        self.response = response
+        self.plot_update = plot_update
+        self.turn = turn
 
 class DungeonMaster:
-    def __init__(self, world: World, system_prompt_path: Optional[str] = None):
+    def __init__(self, world: World, system_prompt_path: Optional[str] = None, speculative: Optional[bool] = None):
         """Initialize the Dungeon Master with world and system prompt"""
         self.world = world
-        self.llm_client = LLMClient()
+        # Token usage and budgets for this session, shared by every client below
+        self.usage = UsageTracker(session_id=world.session_id)
         
-        # Load system prompt from file
-        system_prompt_path = system_prompt_path or str(BASE_DIR / "prompts" / "system" / "dm_system.txt")
+        # Narration stays on the main model; cheap side tasks can be routed to a smaller/local one
+        self.llm_client = LLMClient(task="narration", usage=self.usage)
+        self.plot_llm_client = LLMClient(task="plot", usage=self.usage)
+        self.summary_llm_client = LLMClient(task="summary", usage=self.usage)
+        
+        # Load system prompt from file (the world snapshot's copy when one is in use)
+        prompts = prompts_dir()
+        system_prompt_path = system_prompt_path or str(prompts / "system" / "dm_system.txt")
         self.system_prompt = self._load_prompt(system_prompt_path)
         
         # Load opening scene prompt
-        opening_prompt_path = str(BASE_DIR / "prompts" / "system" / "opening_scene.txt")
+        opening_prompt_path = str(prompts / "system" / "opening_scene.txt")
         self.opening_scene_prompt = self._load_prompt(opening_prompt_path)
         
         # Load plot generator prompt
-        plot_prompt_path = str(BASE_DIR / "prompts" / "agents" / "plot_generator.txt")
+        plot_prompt_path = str(prompts / "agents" / "plot_generator.txt")
         self.plot_generator_prompt = self._load_prompt(plot_prompt_path)
+        
+        # Load prompts for the per-turn background agents
+        self.npc_reactor_prompt = self._load_prompt(str(prompts / "agents" / "npc_reactor.txt"))
+        self.memory_summarizer_prompt = self._load_prompt(str(prompts / "agents" / "memory_summarizer.txt"))
+        self.world_extractor_prompt = self._load_prompt(str(prompts / "agents" / "world_extractor.txt"))
 
-        # Plot management
-        self.plot_points = []
-        self.current_plot_index = 0
+        # Plot management: upcoming points (head is current) and recently completed ones
+        self.plot_points: Deque[str] = deque(maxlen=PLOT_QUEUE_MAX)
+        self.completed_plot_points: Deque[str] = deque(maxlen=PLOT_COMPLETED_HISTORY)
+        self.current_plot_index = 0  # number of completed plot points
+        self.plot_classifier = PlotAdvanceClassifier(PLOT_ADVANCE_SIMILARITY)
+        self.plot_parse_stats = {"calls": 0, "parsed": 0, "reasked": 0, "reask_parsed": 0, "fallback": 0, "extra_tokens": 0}
         self.conversation_history = []
+        self.turn_count = 0
+        self._background: Optional[ThreadPoolExecutor] = None
+        
+        # Agents run after each reply is shown; their outputs are applied on the next turn
+        self.agent_runner = AgentRunner(AGENT_MAX_WORKERS)
+        self._agent_run: Optional[TurnRun] = None
+        self._agent_run_action = ""
+        self.npc_reactions: Dict[str, str] = {}
+        self.story_summary = ""
+        self.world_extraction_stats = {"runs": 0, "parsed": 0, "locations": 0, "entities": 0, "moves": 0}
+        self._world_extraction_lock = threading.Lock()
+        
+        # Output tokens and latency of generated narration, by turn type
+        self.turn_type_stats = TurnTypeStats()
+        
+        # Optional background pre-generation of likely next responses
+        self.speculator: Optional[SpeculativeResponder] = None
+        if speculative is None:
+            speculative = SPECULATIVE_MODE
+        if speculative:
+            self.speculator = SpeculativeResponder(
+                generate_fn=partial(self._generate_response, call_site="speculation"),
+                max_options=SPECULATION_MAX_OPTIONS,
+                token_budget=SPECULATION_TOKEN_BUDGET,
+                similarity_threshold=SPECULATION_MATCH_THRESHOLD,
+                expected_response_tokens=SPECULATION_EXPECTED_TOKENS
+            )
+        
+        # Near-duplicate inputs in an unchanged state are answered from cache
+        self.response_cache: Optional[ResponseCache] = None
+        if RESPONSE_CACHE:
+            self.response_cache = ResponseCache(RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_MAX_ENTRIES)
+        self._cache_state: Optional[str] = None
+        
+        # Continuations and same-topic inputs reuse the previous turn's retrieval
+        self.retrieval_gate: Optional[RetrievalGate] = None
+        if RETRIEVAL_GATING:
+            self.retrieval_gate = RetrievalGate(
+                RETRIEVAL_MIN_COLLECTION_SIZE, RETRIEVAL_MIN_INPUT_WORDS,
+                RETRIEVAL_DRIFT_THRESHOLD, RETRIEVAL_AUDIT_EVERY
+            )
+        # ((world, episodic) sizes, lore documents, episodic context) of the last full search
+        self._retrieved: Optional[Tuple[Tuple[int, int], List[str], Optional[str]]] = None
         
         # Initialize the scenario
         self._setup_initial_scenario()
@@ -37,10 +138,10 @@ class DungeonMaster:
             with open(prompt_path, 'r') as f:
                 return f.read().strip()
         except FileNotFoundError:
-            print(f"Warning: Prompt file not found at {prompt_path}")
+            logger.warning("Prompt file not found", extra={"path": str(prompt_path)})
             return ""
         except Exception as e:
-            print(f"Error loading prompt from {prompt_path}: {e}")
+            logger.error("Error loading prompt", extra={"path": str(prompt_path)}, exc_info=e)
             return ""
     
     def _setup_initial_scenario(self):
@@ -53,7 +154,7 @@ class DungeonMaster:
             "Uncover clues about the curse or dark forces at work"
         ]
         
-        self.plot_points = initial_plot
+        self.plot_points = deque(initial_plot, maxlen=PLOT_QUEUE_MAX)
         self.current_plot_index = 0
         
         # Store initial plot in world state
@@ -62,113 +163,210 @@ class DungeonMaster:
             world_state={"plot_points": initial_plot, "current_index": 0}
         )
     
-    def _update_plot_progression(self, player_action: str):
+    def _plan_plot_update(self, player_action: str, response: str, extend: bool = True) -> PlotUpdate:
+        """Decide whether the plot advanced and generate a batch of points if the queue runs low"""
+        advanced = self.plot_classifier.advanced(player_action, response, self._current_plot_point())
+        
+        # Only extend the plot once upcoming points fall below the watermark
+        remaining = len(self.plot_points) - (1 if advanced and self.plot_points else 0)
+        if not extend or remaining >= PLOT_LOW_WATERMARK:
+            return PlotUpdate(advanced)
+        
+        # Over budget: extend only when the queue would run dry, and not at all past the hard cap
+        budget = self.usage.budget_level()
+        if budget == BUDGET_HARD or (budget != BUDGET_OK and remaining > 0):
+            return PlotUpdate(advanced)
+        
+        new_points = self._generate_plot_extension(
+            self._plot_situation(), player_action, list(self.plot_points), self._stored_world_state(), PLOT_BATCH_SIZE
+        )
+        return PlotUpdate(advanced, new_points)
+    
+    def _update_plot_progression(self, player_action: str, response: str, plot_update: Optional[PlotUpdate] = None):
         """Update plot progression based on player action"""
-        current_situation = f"Plot point {self.current_plot_index + 1}: {self.plot_points[self.current_plot_index]}"
+        if plot_update is None:
+            plot_update = self._plan_plot_update(player_action, response)
         
-        # Store the completed plot point as episodic memory
-        if self.current_plot_index < len(self.plot_points):
-            completed_plot = self.plot_points[self.current_plot_index]
+        if plot_update.advanced and self.plot_points:
+            # Store the completed plot point as episodic memory
+            completed_plot = self.plot_points.popleft()
             self.world.add_episodic_memory_from_messages([
                 {"role": "system", "content": f"Completed plot point: {completed_plot}"},
                 {"role": "user", "content": player_action},
                 {"role": "assistant", "content": f"Plot point '{completed_plot}' completed through action: {player_action}"}
-            ])
-        
-        # Generate new plot points based on current situation and player action
-        new_points = self._generate_plot_extension(current_situation, player_action)
-        
-        # Update plot points - replace completed ones and add new ones
-        if self.current_plot_index < len(self.plot_points):
-            # Remove the completed plot point
-            self.plot_points.pop(self.current_plot_index)
+            ], metadata={"importance": 2.0, "plot_index": self.current_plot_index})
+            
+            self.completed_plot_points.append(completed_plot)
+            self.current_plot_index += 1
         
-        # Add new plot points at the current position
-        for i, point in enumerate(new_points):
-            self.plot_points.insert(self.current_plot_index + i, point)
+        # Queue newly generated points behind the remaining ones
+        self.plot_points.extend(plot_update.new_points)
         
-        # Move to next plot point (or stay at current if no new points were added)
-        if new_points:
-            self.current_plot_index += 1
+        if not plot_update.advanced and not plot_update.new_points:
+            return
         
         # Update world state
         self.world.update_world_state(
             plot_progress=f"plot_point_{self.current_plot_index}",
             world_state={
-                "plot_points": self.plot_points,
+                "plot_points": list(self.plot_points),
                 "current_index": self.current_plot_index,
                 "last_action": player_action,
-                "completed_plots": self._get_completed_plot_summary()
+                "completed_plots": list(self.completed_plot_points)
             }
         )
     
-    def _get_completed_plot_summary(self) -> str:
-        """Get a summary of completed plot points for episodic memory"""
-        # This would track completed plot points across sessions
-        # For now, return current progress
-        return f"Completed {self.current_plot_index} plot points"
+    def _stored_world_state(self) -> Dict[str, Any]:
+        """The world_state column of the current game state"""
+        return self.world.get_current_world_state().get("world_state", {})
     
-    def _generate_plot_extension(self, current_situation: str, player_action: str) -> List[str]:
-        """Generate new plot points based on current situation and player action"""
+    def _generate_plot_extension(
+        self, current_situation: str, player_action: str, plot_points: List[str], world_state: Dict[str, Any], count: int = 3
+    ) -> List[str]:
+        """Generate new plot points from a snapshot of the queue and world state; also runs on the plot planner's thread"""
         # Get episodic context for plot generation
         episodic_context = self.world.get_episodic_context(f"{current_situation} {player_action}", n_results=3)
         
-        # Get current world state for context
-        world_state = self.world.get_current_world_state()
-        
         prompt = f"""Current situation: {current_situation}
 Player action: {player_action}
-Current plot points: {self.plot_points}
-World state: {world_state.get('world_state', {})}
+Current plot points: {plot_points}
+World state: {world_state}
 
 Episodic memory context: {episodic_context}
 
-Based on the player's action and current situation, generate 2-3 new plot points that are:
+Based on the player's action and current situation, generate {count} new plot points that are:
 1. Relevant to what just happened
 2. Build upon the current story
 3. Provide clear direction for the horror narrative
 
-Generate as a simple list, one per line:"""
+Return JSON: {{"plot_points": [...]}} with {count} short strings."""
 
-        response = self.llm_client.generate(
+        response = self.plot_llm_client.generate_json(
+            schema=PLOT_POINTS_SCHEMA,
+            schema_name="plot_points",
             system_prompt=self.plot_generator_prompt,
             prompt=prompt,
-            temperature=0.8
+            temperature=0.8,
+            max_tokens=count * PLOT_POINT_TOKENS + 30,
+            call_site="plot_extension"
+        )
+        self.plot_parse_stats["calls"] += 1
+        
+        new_points = parse_plot_points(response, count)
+        if new_points is not None:
+            self.plot_parse_stats["parsed"] += 1
+            return new_points
+        
+        if self.usage.budget_level() != BUDGET_OK:
+            self.plot_parse_stats["fallback"] += 1
+            return parse_plot_lines(response, count)
+        
+        # One cheap re-ask that only reformats the previous reply
+        reask_prompt = f"""Rewrite the following as JSON {{"plot_points": [...]}} with at most {count} short strings. Reply with JSON only.
+
+{response[:1000]}"""
+        self.plot_parse_stats["reasked"] += 1
+        retry = self.plot_llm_client.generate_json(
+            schema=PLOT_POINTS_SCHEMA,
+            schema_name="plot_points",
+            prompt=reask_prompt,
+            temperature=0.0,
+            max_tokens=self._output_budget("plot_reask"),
+            call_site="plot_reask"
         )
+        self.plot_parse_stats["extra_tokens"] += estimate_tokens(reask_prompt) + estimate_tokens(retry)
         
-        # Parse response into plot points
-        new_points = [point.strip() for point in response.split('\n') if point.strip()]
-        return new_points[:3]  # Limit to 3 new points
+        new_points = parse_plot_points(retry, count)
+        if new_points is not None:
+            self.plot_parse_stats["reask_parsed"] += 1
+            return new_points
+        
+        self.plot_parse_stats["fallback"] += 1
+        return parse_plot_lines(response, count)
     
-    def _get_relevant_context(self, player_input: str) -> str:
-        """Get relevant world context for the current situation"""
-        # Get world context based on player input
-        context_results = self.world.get_world_context(player_input, n_results=3)
+    def summarize_memories(self, memories: List[str]) -> str:
+        """Summarize a cluster of similar episodic memories into one record"""
+        if self.usage.budget_level() != BUDGET_OK:
+            return extractive_summary(memories)
         
-        # Get episodic context
-        episodic_context = self.world.get_episodic_context(player_input, n_results=2)
+        prompt = "Merge these related memories of the player's journey into one concise record. Keep names, places and consequences:\n\n"
+        prompt += "\n".join(f"- {memory}" for memory in memories)
         
+        return self.summary_llm_client.generate(
+            system_prompt="You condense game memories. Reply with the merged memory only.",
+            prompt=prompt,
+            temperature=0.2,
+            max_tokens=self._output_budget("memory_summary"),
+            call_site="memory_summary"
+        )
+    
+    def _search_context(self, query: str, sizes: Tuple[int, int]) -> Tuple[List[str], Optional[str]]:
+        """Lore documents and episodic context for a query"""
+        world_results, episodic_results = sizes
+        context_results = self.world.get_world_context(query, n_results=world_results)
+        episodic_context = self.world.get_episodic_context(query, n_results=episodic_results) if episodic_results else None
+        return context_results.get("documents") or [], episodic_context
+    
+    def _retrieve_context(self, player_input: str, sizes: Tuple[int, int], gated: bool) -> Tuple[List[str], Optional[str]]:
+        """Search, reuse the previous turn's results or skip retrieval, as the gate decides"""
+        if not gated or not self.retrieval_gate:
+            return self._search_context(player_input, sizes)
+        
+        previous = self._retrieved if self._retrieved and self._retrieved[0] == sizes else None
+        decision = self.retrieval_gate.decide(player_input, self.world.count_memories(), previous is not None)
+        if decision.mode == SKIP:
+            return [], None
+        if decision.mode == REUSE:
+            _, documents, episodic_context = previous
+            if self.retrieval_gate.should_audit():
+                self._get_background().submit(self._audit_retrieval, player_input, sizes, documents)
+            return documents, episodic_context
+        
+        documents, episodic_context = self._search_context(player_input, sizes)
+        self._retrieved = (sizes, documents, episodic_context)
+        return documents, episodic_context
+    
+    def _audit_retrieval(self, player_input: str, sizes: Tuple[int, int], used: List[str]):
+        """Compare reused lore with what a full search returns now"""
+        try:
+            searched, _ = self._search_context(player_input, sizes)
+            self.retrieval_gate.record_audit(used, searched)
+        except Exception as e:
+            logger.warning("Retrieval audit failed", exc_info=e)
+    
+    def _get_relevant_context(self, player_input: str, gated: bool = True) -> str:
+        """Get relevant world context for the current situation"""
         # Get current world state
         world_state = self.world.get_current_world_state()
         
-        # Get current location info if available
+        # The mapped location and what is in it come from indexed lookups, not retrieval
         location_context = ""
-        if world_state.get("session_data", {}).get("current_location_id"):
-            location_id = world_state["session_data"]["current_location_id"]
-            location_info = self.world.get_location_info(location_id)
-            if location_info:
-                location_context = f"Current location: {location_info['location'][1]} - {location_info['location'][2]}"
+        location_id = world_state.get("session_data", {}).get("current_location_id")
+        location_info = self.world.get_location_info(location_id) if location_id else None
+        if location_info:
+            location = location_info['location']
+            location_context = f"Current location: {location.name} - {location.description or 'no description yet'}"
+            if location_info["entities"]:
+                location_context += ". Present: " + ", ".join(f"{entity.name} ({entity.entity_type})" for entity in location_info["entities"])
+        
+        # Retrieve less context as the session approaches its budget, and less lore once the scene is mapped
+        world_results, episodic_results = CONTEXT_SIZES[self.usage.budget_level()]
+        if location_info:
+            world_results = max(1, world_results - 1)
+        documents, episodic_context = self._retrieve_context(player_input, (world_results, episodic_results), gated)
         
         # Combine context
-        context_parts = []
-        if context_results.get("documents"):
-            context_parts.extend(context_results["documents"])
+        context_parts = list(documents)
         if episodic_context and episodic_context != "No relevant episodic memory found":
             context_parts.append(f"Episodic context: {episodic_context}")
         if location_context:
             context_parts.append(location_context)
         if world_state.get("plot_progress"):
             context_parts.append(f"Plot progress: {world_state['plot_progress']}")
+        if self.story_summary:
+            context_parts.append(f"Story so far: {self.story_summary}")
+        if self.npc_reactions:
+            context_parts.append("NPC intentions: " + "; ".join(f"{name}: {reaction}" for name, reaction in self.npc_reactions.items()))
         
         return " | ".join(context_parts) if context_parts else "No specific context available"
     
@@ -185,23 +383,130 @@ Focus on the immediate surroundings and the player's disorientation. End with: S
         response = self.llm_client.generate(
             system_prompt=self.opening_scene_prompt,
             prompt=opening_prompt,
-            temperature=0.8
+            temperature=0.8,
+            max_tokens=self._output_budget("opening_scene"),
+            call_site="opening_scene"
         )
         
         return response
     
-    def respond_to_player(self, player_input: str) -> str:
-        """Generate response to player input with selective options"""
-        # Get relevant context
-        context = self._get_relevant_context(player_input)
+    def _plot_situation(self) -> str:
+        return f"Plot point {self.current_plot_index + 1}: {self._current_plot_point()}"
+    
+    def _build_turn_agents(self) -> AgentGraph:
+        """Agents for the turn that just finished, trimmed to what the budget allows"""
+        budget = self.usage.budget_level()
+        agents = []
+        if budget != BUDGET_HARD:
+            # Over the soft budget the plot is only extended once the queue is empty
+            watermark = PLOT_LOW_WATERMARK if budget == BUDGET_OK else 1
+            agents.append(PlotPlannerAgent(self._generate_plot_extension, PLOT_BATCH_SIZE, watermark))
+        if budget == BUDGET_OK:
+            agents.extend(
+                NpcReactorAgent(npc, self.plot_llm_client, self.npc_reactor_prompt, self._output_budget("npc_reactor"))
+                for npc in self._scene_npcs()
+            )
+            agents.append(MemorySummarizerAgent(
+                self.summary_llm_client, self.memory_summarizer_prompt, STORY_SUMMARY_INTERVAL, self._output_budget("story_summary")
+            ))
+            if WORLD_EXTRACTION:
+                agents.append(WorldExtractorAgent(
+                    self.world, self.plot_llm_client, self.world_extractor_prompt,
+                    WORLD_EXTRACTION_MAX_ITEMS, self._output_budget("world_extractor"), self._record_world_facts
+                ))
+        return AgentGraph(agents, provided=("situation", "player_action", "response", "plot_points", "world_state", "turn", "story_summary", "recent_history"))
+    
+    def _scene_npcs(self) -> List[Any]:
+        """NPC entities at the player's current location"""
+        location_id = self.world.get_current_world_state().get("session_data", {}).get("current_location_id")
+        location_info = self.world.get_location_info(location_id) if location_id else None
+        if not location_info:
+            return []
+        npcs = [entity for entity in location_info["entities"] if entity.entity_type in ACTOR_ENTITY_TYPES]
+        return npcs[:NPC_REACTOR_MAX]
+    
+    def _start_turn_agents(self, player_action: str, response: str):
+        """Run plot planning, NPC reactions and summarization concurrently, off the turn path"""
+        self._agent_run_action = player_action
+        self._agent_run = self.agent_runner.run(
+            self._build_turn_agents(),
+            {
+                "situation": self._plot_situation(),
+                "player_action": player_action,
+                "response": response,
+                "plot_points": list(self.plot_points),
+                "world_state": self._stored_world_state(),
+                "turn": self.turn_count,
+                "story_summary": self.story_summary,
+                "recent_history": self.conversation_history[-2 * STORY_SUMMARY_INTERVAL:]
+            },
+            self.turn_count,
+            AGENT_TURN_DEADLINE
+        )
+    
+    def _collect_turn_agents(self):
+        """Apply what the previous turn's agents produced, cancelling any that are still running"""
+        run, self._agent_run = self._agent_run, None
+        if run is None:
+            return
+        
+        # Only an empty plot queue is worth waiting for; everything else is used if ready
+        if not run.done():
+            planner_pending = "plot_planner" in run.graph.agents and "plot_planner" not in run.status
+            run.wait(timeout=None if planner_pending and not self.plot_points else 0)
+            run.cancel()
+        
+        plot = run.results("plot_planner")
+        if plot and plot["new_plot_points"]:
+            self._update_plot_progression(self._agent_run_action, "", PlotUpdate(False, plot["new_plot_points"]))
+        
+        self.npc_reactions = {}
+        for name, agent in run.graph.agents.items():
+            if isinstance(agent, NpcReactorAgent):
+                reaction = run.results(name)
+                if reaction and reaction[agent.outputs[0]]:
+                    self.npc_reactions[agent.npc.name] = reaction[agent.outputs[0]]
+        
+        summary = run.results("memory_summarizer")
+        if summary and summary["story_summary_update"]:
+            self.story_summary = summary["story_summary_update"]
+    
+    def _record_world_facts(self, facts: Optional[Dict[str, Any]]):
+        """Count one completed world extraction; runs on the agent's thread"""
+        with self._world_extraction_lock:
+            self.world_extraction_stats["runs"] += 1
+            if facts is None:
+                return
+            self.world_extraction_stats["parsed"] += 1
+            self.world_extraction_stats["locations"] += facts["locations"]
+            self.world_extraction_stats["entities"] += facts["entities"]
+            self.world_extraction_stats["moves"] += int(facts["moved"])
+    
+    def _current_plot_point(self) -> str:
+        """Get the plot point the player is currently working through"""
+        return self.plot_points[0] if self.plot_points else "Plot complete"
+    
+    def _output_budget(self, name: str) -> int:
+        """Output token budget for a call site or turn type at the current budget level"""
+        return scaled_budget(OUTPUT_TOKEN_BUDGETS[name], OUTPUT_BUDGET_SCALES[self.usage.budget_level()])
+    
+    def _generate_response(self, player_input: str, call_site: str = "narration") -> str:
+        """Generate the DM's reply from the current state without changing it"""
+        # Get relevant context; speculative generations always search so they leave the gate alone
+        context = self._get_relevant_context(player_input, gated=call_site == "narration")
         
         # Build conversation history for context
-        messages = self.conversation_history[-10:]  # Last 10 messages for context
+        messages = self.conversation_history[-HISTORY_WINDOWS[self.usage.budget_level()]:]
+        
+        # The turn type sets both the length the model is asked for and the hard output cap
+        turn_type = classify_turn(player_input)
         
         # Create simple prompt that relies on the system prompt
         response_prompt = f"""Context: {context}
 
-Current plot point: {self.plot_points[self.current_plot_index] if self.current_plot_index < len(self.plot_points) else "Plot complete"}
+Current plot point: {self._current_plot_point()}
+
+Length: {TURN_TYPE_HINTS[turn_type]}
 
 Player says: {player_input}"""
 
@@ -210,33 +515,209 @@ Player says: {player_input}"""
             system_prompt=self.system_prompt,
             messages=messages,
             prompt=response_prompt,
-            temperature=0.8
+            temperature=0.8,
+            max_tokens=self._output_budget(turn_type),
+            call_site=call_site,
+            stop=NARRATION_STOP_SEQUENCES
         )
-        
+        if call_site == "narration":
+            last_call = self.llm_client.last_call()
+            self.turn_type_stats.record(turn_type, last_call["output_tokens"], last_call["latency_ms"], last_call["truncated"])
+        return response
+    
+    def _commit_turn(self, player_input: str, response: str, plot_update: Optional[PlotUpdate] = None):
+        """Record a completed exchange in history, memory and plot progression"""
         # Update conversation history
         self.conversation_history.append({"role": "user", "content": player_input})
         self.conversation_history.append({"role": "assistant", "content": response})
+        self.turn_count += 1
         
         # Store in episodic memory (will only store after threshold)
         self.world.add_episodic_memory_from_messages([
             {"role": "user", "content": player_input},
             {"role": "assistant", "content": response}
-        ])
+        ], metadata={"plot_index": self.current_plot_index})
         
         # Update plot progression
-        self._update_plot_progression(player_input)
+        self._update_plot_progression(player_input, response, plot_update)
+    
+    def _response_state(self) -> str:
+        """Key for what a response depends on, the current plot point and location; a new key drops the cache"""
+        location_id = self.world.get_current_world_state().get("session_data", {}).get("current_location_id")
+        state = state_key(self._current_plot_point(), location_id)
+        if state != self._cache_state:
+            self.response_cache.invalidate()
+            self._cache_state = state
+        return state
+    
+    def _vary_response(self, response: str) -> str:
+        """Cheap rephrasing pass so a cached reply does not repeat word for word"""
+        varied = self.summary_llm_client.generate(
+            system_prompt="Rephrase the narrator's reply with fresh wording. Keep every fact, option line (starting with '>') and the second person. Reply with the rephrased text only.",
+            prompt=response,
+            temperature=0.9,
+            max_tokens=min(estimate_tokens(response) + 50, self._output_budget("cache_variation")),
+            call_site="cache_variation"
+        )
+        return varied.strip() or response
+    
+    def _cached_response(self, player_input: str, state: str) -> Optional[str]:
+        """Serve a near-duplicate input from cache, optionally through a variation pass"""
+        start = time.perf_counter()
+        entry = self.response_cache.lookup(player_input, state)
+        if entry is None:
+            return None
+        response = entry.response
+        if RESPONSE_CACHE_VARIATION and self.usage.budget_level() == BUDGET_OK:
+            response = self._vary_response(response)
+        self.response_cache.record_saved(entry, time.perf_counter() - start)
+        return response
+    
+    def respond_to_player(self, player_input: str) -> str:
+        """Generate response to player input with selective options"""
+        self._collect_turn_agents()
+        
+        response = None
+        if self.speculator:
+            response = self.speculator.take(self.turn_count, player_input)
+        if response is None and self.response_cache:
+            state = self._response_state()
+            response = self._cached_response(player_input, state)
+            if response is None:
+                start = time.perf_counter()
+                response = self._generate_response(player_input)
+                self.response_cache.store(player_input, state, response, time.perf_counter() - start)
+        if response is None:
+            response = self._generate_response(player_input)
+        
+        # Plot extension is left to the background plot planner
+        self._commit_turn(player_input, response, self._plan_plot_update(player_input, response, extend=False))
+        self._start_turn_agents(player_input, response)
+        
+        # Pre-generate replies to the options just offered, unless over budget
+        if self.speculator and self.usage.budget_level() == BUDGET_OK:
+            self.speculator.speculate(self.turn_count, extract_options(response))
         
         return response
     
+    def prepare_turn(self, player_input: str) -> PreparedTurn:
+        """Generate the response and plot extension for player_input without committing them"""
+        turn = self.turn_count
+        response = self._generate_response(player_input)
+        plot_update = self._plan_plot_update(player_input, response)
+        return PreparedTurn(player_input, response, plot_update, turn)
+    
+    def _get_background(self) -> ThreadPoolExecutor:
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dm-prepare")
+        return self._background
+    
+    def prepare_turn_async(self, player_input: str) -> Future:
+        """Prepare a predictable turn in the background; resolve it with commit_prepared_turn"""
+        return self._get_background().submit(self.prepare_turn, player_input)
+    
+    def commit_prepared_turn(self, prepared: PreparedTurn) -> str:
+        """Commit a prepared turn, regenerating it if the state moved on since it was prepared"""
+        if prepared.turn != self.turn_count:
+            return self.respond_to_player(prepared.player_input)
+        
+        if self.speculator:
+            self.speculator.cancel()
+        self._commit_turn(prepared.player_input, prepared.response, prepared.plot_update)
+        self._start_turn_agents(prepared.player_input, prepared.response)
+        if self.speculator and self.usage.budget_level() == BUDGET_OK:
+            self.speculator.speculate(self.turn_count, extract_options(prepared.response))
+        
+        return prepared.response
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Compact, bounded-size snapshot of the DM's session state"""
+        return {
+            "plot_points": list(self.plot_points),
+            "completed_plot_points": list(self.completed_plot_points),
+            "current_plot_index": self.current_plot_index,
+            "turn_count": self.turn_count,
+            "history_tail": self.conversation_history[-CHECKPOINT_HISTORY_TAIL:],
+            "story_summary": self.story_summary,
+            "summary": self.get_plot_summary()
+        }
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore session state saved by export_state without any LLM calls"""
+        self.plot_points = deque(state.get("plot_points", []), maxlen=PLOT_QUEUE_MAX)
+        self.completed_plot_points = deque(state.get("completed_plot_points", []), maxlen=PLOT_COMPLETED_HISTORY)
+        self.current_plot_index = state.get("current_plot_index", 0)
+        self.turn_count = state.get("turn_count", 0)
+        self.conversation_history = list(state.get("history_tail", []))
+        self.story_summary = state.get("story_summary", "")
+        
+        # The constructor reset the stored plot to the initial scenario; put the restored one back
+        self.world.update_world_state(
+            plot_progress=f"plot_point_{self.current_plot_index}",
+            world_state={
+                "plot_points": list(self.plot_points),
+                "current_index": self.current_plot_index,
+                "completed_plots": list(self.completed_plot_points)
+            }
+        )
+    
+    def get_plot_parse_metrics(self) -> Dict[str, Any]:
+        """Structured plot-generation parse success rate and tokens spent on re-asks"""
+        stats = dict(self.plot_parse_stats)
+        stats["success_rate"] = stats["parsed"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Response cache hit rate and generation time saved"""
+        return self.response_cache.get_metrics() if self.response_cache else {}
+    
+    def get_world_extraction_metrics(self) -> Dict[str, Any]:
+        """World extractor runs, parse rate and what it mapped"""
+        with self._world_extraction_lock:
+            stats = dict(self.world_extraction_stats)
+        stats["parse_rate"] = stats["parsed"] / stats["runs"] if stats["runs"] else 0.0
+        return stats
+    
+    def get_retrieval_metrics(self) -> Dict[str, Any]:
+        """Retrieval skip rate and overlap of reused context with a full search"""
+        return self.retrieval_gate.get_metrics() if self.retrieval_gate else {}
+    
+    def get_output_budget_metrics(self) -> Dict[str, Any]:
+        """Output tokens, latency and truncation rate of narration per turn type and of every other budgeted call site"""
+        metrics = self.turn_type_stats.get_metrics(OUTPUT_TOKEN_BUDGETS)
+        metrics.update(call_site_metrics(self.usage.call_site_stats(), OUTPUT_TOKEN_BUDGETS))
+        return metrics
+    
+    def get_speculation_metrics(self) -> Dict[str, Any]:
+        """Hit rate and wasted tokens of speculative pre-generation"""
+        return self.speculator.get_metrics() if self.speculator else {}
+    
+    def close(self):
+        """Cancel background work owned by the DM"""
+        if self.speculator:
+            self.speculator.shutdown()
+        if self._background:
+            self._background.shutdown(wait=False, cancel_futures=True)
+        if self._agent_run:
+            self._agent_run.cancel()
+        self.agent_runner.shutdown()
+        self.usage.flush()
+    
+    def get_usage_summary(self, group_by: str = "call_site") -> List[Dict[str, Any]]:
+        """Token usage and cost for this session, grouped by call site, provider or model"""
+        return self.usage.summary(group_by)
+    
     def get_current_plot_status(self) -> Dict[str, Any]:
         """Get current plot status and upcoming points"""
+        upcoming = list(self.plot_points)
+        total_points = self.current_plot_index + len(upcoming)
         return {
             "current_index": self.current_plot_index,
-            "current_point": self.plot_points[self.current_plot_index] if self.current_plot_index < len(self.plot_points) else "Complete",
-            "upcoming_points": self.plot_points[self.current_plot_index + 1:self.current_plot_index + 4],
-            "total_points": len(self.plot_points),
+            "current_point": upcoming[0] if upcoming else "Complete",
+            "upcoming_points": upcoming[1:4],
+            "total_points": total_points,
             "completed_points": self.current_plot_index,
-            "plot_progress": f"{self.current_plot_index}/{len(self.plot_points)}"
+            "plot_progress": f"{self.current_plot_index}/{total_points}"
         }
     
     def get_plot_summary(self) -> str:
@@ -248,6 +729,4 @@ Upcoming: {', '.join(status['upcoming_points'])}"""
     
     def get_completed_plot_points(self) -> List[str]:
         """Get a list of completed plot points for episodic memory"""
-        # This would ideally track across sessions, but for now return current progress
-        world_state = self.world.get_current_world_state()
-        return world_state.get('world_state', {}).get('completed_plots', []) 
\ No newline at end of file
+        return list(self.completed_plot_points) 
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Dict
+
+from src.agents.dungeon_master.player_input import (
+    ADVANCING_VERBS, CONTINUATIONS, TRIVIAL_VERBS, is_option_request, normalize_input
+)
+
+# Kinds of DM reply, each with its own output budget (OUTPUT_TOKEN_BUDGETS, alongside the other call sites)
+SCENE_CHANGE = "scene_change"  # the story moves: an option pick, a committed action
+SHORT_REACTION = "short_reaction"  # an observation or stall answered in a line
+OPTION_LIST = "option_list"  # the player asks what they can do
+TURN_TYPES = (SCENE_CHANGE, SHORT_REACTION, OPTION_LIST)
+
+# Appended to the narration prompt so the model aims for the budget instead of running into it
+TURN_TYPE_HINTS = {
+    SCENE_CHANGE: "Move the scene forward in at most 3 sentences; offer options only at a real choice.",
+    SHORT_REACTION: "Reply with one short sentence and no options.",
+    OPTION_LIST: "Give one sentence of setting, then 2-3 options as '> ...?' lines.",
+}
+
+
+def classify_turn(player_input: str) -> str:
+    """Turn type from the player's input alone: option requests, committed actions, observations"""
+    if player_input.strip().isdigit():
+        return SCENE_CHANGE
+    normalized = normalize_input(player_input)
+    words = normalized.split()
+    if not words:
+        return SHORT_REACTION
+    if is_option_request(normalized):
+        return OPTION_LIST
+    if normalized in CONTINUATIONS or any(word in ADVANCING_VERBS for word in words):
+        return SCENE_CHANGE
+    if words[0] in TRIVIAL_VERBS or len(words) <= 2:
+        return SHORT_REACTION
+    return SCENE_CHANGE
+
+
+def scaled_budget(budget: int, scale: float) -> int:
+    """Output budget shrunk for the session's budget level, never below a sentence"""
+    return max(32, int(budget * scale))
+
+
+class TurnTypeStats:
+    """Generated narration per turn type: output tokens, latency and replies cut at the budget"""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {
+            turn_type: {"turns": 0, "output_tokens": 0, "latency_ms": 0.0, "truncated": 0} for turn_type in TURN_TYPES
+        }
+
+    def record(self, turn_type: str, output_tokens: int, latency_ms: float, truncated: bool):
+        stats = self.stats[turn_type]
+        stats["turns"] += 1
+        stats["output_tokens"] += output_tokens
+        stats["latency_ms"] += latency_ms
+        stats["truncated"] += int(truncated)
+
+    def get_metrics(self, budgets: Dict[str, int]) -> Dict[str, Dict]:
+        """Per turn type: count and share of turns, budget, mean output tokens and latency, truncation rate"""
+        total = sum(stats["turns"] for stats in self.stats.values())
+        metrics = {}
+        for turn_type, stats in self.stats.items():
+            turns = stats["turns"]
+            metrics[turn_type] = {
+                "turns": turns,
+                "share": turns / total if total else 0.0,
+                "budget": budgets.get(turn_type),
+                "output_tokens_mean": stats["output_tokens"] / turns if turns else 0.0,
+                "latency_ms_mean": stats["latency_ms"] / turns if turns else 0.0,
+                "truncation_rate": stats["truncated"] / turns if turns else 0.0,
+            }
+        return metrics
+
+
+def call_site_metrics(call_sites: Dict[str, Dict[str, float]], budgets: Dict[str, int]) -> Dict[str, Dict]:
+    """Per budgeted call site other than narration: calls, budget, mean output tokens and latency, truncation rate"""
+    metrics = {}
+    for name, budget in budgets.items():
+        if name in TURN_TYPES:
+            continue
+        stats = call_sites.get(name, {})
+        calls = stats.get("calls", 0)
+        metrics[name] = {
+            "calls": calls,
+            "budget": budget,
+            "output_tokens_mean": stats["output_tokens"] / calls if calls else 0.0,
+            "latency_ms_mean": stats["latency_ms"] / calls if calls else 0.0,
+            "truncation_rate": stats["truncated"] / calls if calls else 0.0,
+        }
+    return metrics
@@ -0,0 +1,49 @@
+import re
+
+# Shared vocabulary for reading player inputs: the plot classifier, retrieval gate,
+# response cache, speculation and output budget all match against these
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+# Actions that only observe or stall; on their own they never move the plot
+TRIVIAL_VERBS = frozenset("""
+look listen wait stare watch glance peek observe check inspect examine sniff smell feel touch
+think ponder rest sit stand breathe hide shiver pause hesitate
+""".split())
+
+# Actions that commit the player to something
+ADVANCING_VERBS = frozenset("""
+go enter open take grab attack fight flee run climb descend ascend read use speak talk ask
+answer follow unlock break light pray cast drink eat push pull jump cross leave escape
+kill stab burn destroy free call shout accept refuse give throw search chase
+""".split())
+
+# Inputs that only continue the current scene
+CONTINUATIONS = frozenset([
+    "yes", "no", "yeah", "yep", "nope", "ok", "okay", "sure", "continue", "next", "more", "again",
+    "start", "begin", "proceed", "go on", "go ahead", "keep going", "carry on", "and then", "then what",
+    "what else", "what next"
+])
+
+# Inputs asking the DM for choices rather than acting, matched against normalize_input()
+_OPTION_REQUEST = re.compile(r"""^(?:
+    help(?:\s+me)? | hints? | options | choices | what\s+now | now\s+what | which\s+way\b.*
+  | (?:what|where|which)\s+(?:can|could|should|do|shall)\s+i\s+(?:do|go|try|choose|pick)\b.*
+  | what\s+(?:are|were)\s+(?:my|the|our)\s+(?:options|choices)\b.*
+  | (?:give|show|list|tell)\s+me\s+(?:my\s+|the\s+|some\s+)?(?:options|choices)\b.*
+  | (?:m\s+|am\s+)?stuck | (?:don\s+t|do\s+not)\s+know\s+what\s+to\s+do
+  | any\s+(?:ideas|options|hints)
+)$""", re.VERBOSE)
+
+
+def normalize_input(text: str) -> str:
+    """Lowercase, strip punctuation and a leading "I" so phrasing variants compare equal"""
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    if words and words[0] == "i":
+        words = words[1:]
+    return " ".join(words)
+
+
+def is_option_request(normalized: str) -> bool:
+    """Whether a normalized input asks what the player can do"""
+    return bool(_OPTION_REQUEST.match(normalized))
@@ -0,0 +1,55 @@
+import re
+from typing import Dict, List, Optional
+
+from src.db.embeddings import embed_text, cosine_similarity
+from src.agents.dungeon_master.player_input import ADVANCING_VERBS, TRIVIAL_VERBS
+
+_WORD_PATTERN = re.compile(r"[a-z']+")
+
+# DM replies that mean nothing happened
+_REJECTION_MARKERS = ("you cannot do that here",)
+
+
+class PlotUpdate:
+    """Outcome of a turn for the plot: whether the current point completed and any new points"""
+
+    def __init__(self, advanced: bool, new_points: Optional[List[str]] = None):
+        self.advanced = advanced
+        self.new_points = new_points or []
+
+
+class PlotAdvanceClassifier:
+    """Cheap local decision of whether a turn actually moved the plot forward"""
+
+    def __init__(self, similarity_threshold: float):
+        self.similarity_threshold = similarity_threshold
+        self._plot_embeddings: Dict[str, List[float]] = {}
+
+    def advanced(self, player_action: str, response: str, current_point: str) -> bool:
+        """Keyword heuristic first; embedding similarity to the plot point when inconclusive"""
+        if any(marker in response.lower() for marker in _REJECTION_MARKERS):
+            return False
+
+        # Picking one of the offered options is always a decision
+        if player_action.strip().isdigit():
+            return True
+
+        words = _WORD_PATTERN.findall(player_action.lower())
+        if any(word in ADVANCING_VERBS for word in words):
+            return True
+        verb = words[1] if words[:1] == ["i"] and len(words) > 1 else (words[0] if words else "")
+        if verb in TRIVIAL_VERBS:
+            return False
+
+        return self._realizes_plot_point(response, current_point)
+
+    def _realizes_plot_point(self, response: str, current_point: str) -> bool:
+        """Whether the DM's reply is about the current plot point"""
+        try:
+            point_embedding = self._plot_embeddings.get(current_point)
+            if point_embedding is None:
+                point_embedding = embed_text(current_point)
+                self._plot_embeddings = {current_point: point_embedding}
+            return cosine_similarity(embed_text(response), point_embedding) >= self.similarity_threshold
+        except Exception:
+            return False
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.db.embeddings import embed_text, cosine_similarity
+from src.agents.dungeon_master.player_input import normalize_input
+
+
+def state_key(*parts) -> str:
+    """Hash of the state a response depends on (plot point, location, ...)"""
+    return hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class CachedResponse:
+    """A generated response and what it cost to produce"""
+
+    def __init__(self, player_input: str, response: str, state: str, latency: float):
+        self.player_input = player_input
+        self.normalized = normalize_input(player_input)
+        self.response = response
+        self.state = state
+        self.latency = latency
+        self.embedding: Optional[List[float]] = None
+        self.hits = 0
+
+
+class ResponseCache:
+    """Answers near-duplicate player inputs in an unchanged state without a full generation"""
+
+    def __init__(self, similarity_threshold: float, max_entries: int):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0, "invalidations": 0, "latency_saved": 0.0}
+
+    @staticmethod
+    def cacheable(player_input: str) -> bool:
+        """Option numbers refer to the previous response, so they are never cached"""
+        stripped = player_input.strip()
+        return bool(stripped) and not stripped.isdigit()
+
+    def lookup(self, player_input: str, state: str) -> Optional[CachedResponse]:
+        """Find a cached response for an equivalent input in the same state"""
+        if not self.cacheable(player_input):
+            return None
+        with self._lock:
+            self.metrics["lookups"] += 1
+            candidates = [entry for entry in self._entries.values() if entry.state == state]
+
+        entry, kind = self._match(player_input, candidates)
+        with self._lock:
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+            self.metrics[kind] += 1
+            entry.hits += 1
+            self._entries.move_to_end(self._key(entry))
+        return entry
+
+    def _match(self, player_input: str, candidates: List[CachedResponse]):
+        normalized = normalize_input(player_input)
+        for entry in candidates:
+            if entry.normalized == normalized:
+                return entry, "exact_hits"
+        if not candidates:
+            return None, None
+
+        try:
+            query = embed_text(player_input)
+            best, best_score = None, self.similarity_threshold
+            for entry in candidates:
+                if entry.embedding is None:
+                    entry.embedding = embed_text(entry.player_input)
+                score = cosine_similarity(query, entry.embedding)
+                if score >= best_score:
+                    best, best_score = entry, score
+            return best, "semantic_hits"
+        except Exception:
+            return None, None
+
+    def store(self, player_input: str, state: str, response: str, latency: float):
+        """Cache a freshly generated response"""
+        if not self.cacheable(player_input) or not response:
+            return
+        entry = CachedResponse(player_input, response, state, latency)
+        with self._lock:
+            key = self._key(entry)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_saved(self, entry: CachedResponse, serve_latency: float):
+        """Count the generation time a hit avoided"""
+        with self._lock:
+            self.metrics["latency_saved"] += max(0.0, entry.latency - serve_latency)
+
+    def invalidate(self):
+        """Drop every entry; called when the plot point or location changes"""
+        with self._lock:
+            if self._entries:
+                self.metrics["invalidations"] += 1
+            self._entries.clear()
+
+    @staticmethod
+    def _key(entry: CachedResponse) -> str:
+        return f"{entry.state}:{entry.normalized}"
+
+    def get_metrics(self) -> Dict:
+        """Hit rate and generation time saved so far"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics["entries"] = len(self._entries)
+        hits = metrics["exact_hits"] + metrics["semantic_hits"]
+        metrics["hit_rate"] = hits / metrics["lookups"] if metrics["lookups"] else 0.0
+        return metrics
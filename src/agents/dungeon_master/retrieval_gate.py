@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, List, Optional
+
+from src.db.embeddings import embed_text, cosine_similarity
+from src.agents.dungeon_master.player_input import CONTINUATIONS, normalize_input
+
+# Per-turn retrieval modes
+SEARCH = "search"  # full lore + episodic search
+REUSE = "reuse"  # previous turn's results
+SKIP = "skip"  # no retrieved context
+
+
+class RetrievalDecision:
+    """How the DM gets its retrieved context for one turn, and why"""
+
+    def __init__(self, mode: str, reason: str, embedding: Optional[List[float]] = None):
+        self.mode = mode
+        self.reason = reason
+        self.embedding = embedding
+
+
+class RetrievalGate:
+    """Decides per turn between no retrieval, reusing last turn's results and a full search"""
+
+    def __init__(self, min_collection_size: int, min_input_words: int, drift_threshold: float, audit_every: int):
+        self.min_collection_size = min_collection_size
+        self.min_input_words = min_input_words
+        self.drift_threshold = drift_threshold
+        self.audit_every = audit_every
+        self._last_embedding: Optional[List[float]] = None
+        self._gated_turns = 0
+        self._lock = threading.Lock()
+        self.metrics = {SEARCH: 0, REUSE: 0, SKIP: 0, "audits": 0, "audit_overlap": 0.0}
+        self.reasons: Dict[str, int] = {}
+
+    def decide(self, player_input: str, collection_size: int, has_previous: bool) -> RetrievalDecision:
+        """Cheapest signals first: empty store, option numbers, continuations, small store, topic drift"""
+        if collection_size == 0:
+            return self._record(RetrievalDecision(SKIP, "empty_collection"))
+
+        normalized = normalize_input(player_input)
+        if has_previous:
+            if player_input.strip().isdigit():
+                return self._record(RetrievalDecision(REUSE, "option_number"))
+            if normalized in CONTINUATIONS:
+                return self._record(RetrievalDecision(REUSE, "continuation"))
+            if len(normalized.split()) < self.min_input_words:
+                return self._record(RetrievalDecision(REUSE, "short_input"))
+            if collection_size < self.min_collection_size:
+                # A handful of chunks: the previous search already returned most of them
+                return self._record(RetrievalDecision(REUSE, "small_collection"))
+
+        try:
+            embedding = embed_text(player_input)
+        except Exception:
+            return self._record(RetrievalDecision(SEARCH, "embedding_failed"))
+
+        if has_previous and self._last_embedding is not None:
+            if cosine_similarity(embedding, self._last_embedding) >= self.drift_threshold:
+                return self._record(RetrievalDecision(REUSE, "same_topic", embedding))
+            return self._record(RetrievalDecision(SEARCH, "topic_drift", embedding))
+        return self._record(RetrievalDecision(SEARCH, "no_previous", embedding))
+
+    def _record(self, decision: RetrievalDecision) -> RetrievalDecision:
+        with self._lock:
+            self.metrics[decision.mode] += 1
+            self.reasons[decision.reason] = self.reasons.get(decision.reason, 0) + 1
+            if decision.mode == SEARCH:
+                # Drift is measured against the last query that was actually searched
+                if decision.embedding is not None:
+                    self._last_embedding = decision.embedding
+            else:
+                self._gated_turns += 1
+        return decision
+
+    def should_audit(self) -> bool:
+        """Every audit_every-th gated turn also runs the full search to measure what was missed"""
+        with self._lock:
+            return self.audit_every > 0 and self._gated_turns > 0 and self._gated_turns % self.audit_every == 0
+
+    def record_audit(self, used: List[str], searched: List[str]):
+        """Overlap between the context used and what a full search would have returned"""
+        used_set, searched_set = set(used), set(searched)
+        union = used_set | searched_set
+        overlap = len(used_set & searched_set) / len(union) if union else 1.0
+        with self._lock:
+            self.metrics["audits"] += 1
+            self.metrics["audit_overlap"] += overlap
+
+    def get_metrics(self) -> Dict:
+        """Skip rate, decisions by reason and mean audit overlap"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics["reasons"] = dict(self.reasons)
+        decisions = metrics[SEARCH] + metrics[REUSE] + metrics[SKIP]
+        metrics["skip_rate"] = (metrics[REUSE] + metrics[SKIP]) / decisions if decisions else 0.0
+        metrics["audit_overlap"] = metrics["audit_overlap"] / metrics["audits"] if metrics["audits"] else None
+        return metrics
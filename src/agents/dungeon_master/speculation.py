@@ -0,0 +1,166 @@
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.db.embeddings import embed_text, cosine_similarity
+from src.utils.llm import estimate_tokens
+from src.agents.dungeon_master.player_input import normalize_input
+
+# Option lines as emitted by the DM system prompt: "> Take the left passage?"
+_OPTION_PATTERN = re.compile(r"^\s*>\s*(.+?)\s*$", re.MULTILINE)
+
+
+def extract_options(response: str) -> List[str]:
+    """Pull the player options ("> ..." lines) out of a DM response"""
+    options = []
+    for match in _OPTION_PATTERN.finditer(response):
+        option = match.group(1).strip().rstrip("?").strip()
+        if option and not option.lower().startswith("what do you do"):
+            options.append(option)
+    return options
+
+
+class Speculation:
+    """A background generation for one offered option"""
+
+    def __init__(self, option: str, estimated_tokens: int):
+        self.option = option
+        self.normalized = normalize_input(option)
+        self.future: Optional[Future] = None
+        self.estimated_tokens = estimated_tokens
+        self.embedding: Optional[List[float]] = None
+
+
+class SpeculativeResponder:
+    """Pre-generates DM responses for the options offered to the player"""
+
+    def __init__(
+        self,
+        generate_fn: Callable[[str], str],
+        max_options: int,
+        token_budget: int,
+        similarity_threshold: float,
+        expected_response_tokens: int,
+        max_workers: int = 3
+    ):
+        self.generate_fn = generate_fn
+        self.max_options = max_options
+        self.token_budget = token_budget
+        self.similarity_threshold = similarity_threshold
+        self.expected_response_tokens = expected_response_tokens
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dm-speculation")
+        self._lock = threading.Lock()
+        self._turn: Optional[int] = None
+        self._speculations: List[Speculation] = []
+        self.metrics = {"rounds": 0, "speculated": 0, "hits": 0, "misses": 0, "used_tokens": 0, "wasted_tokens": 0}
+
+    def speculate(self, turn: int, options: List[str]):
+        """Start generating responses for options, within the per-round token budget"""
+        self.cancel()
+        if not options:
+            return
+
+        speculations = []
+        budget = self.token_budget
+        for option in options[:self.max_options]:
+            cost = estimate_tokens(option) + self.expected_response_tokens
+            if cost > budget:
+                break
+            budget -= cost
+            speculation = Speculation(option, cost)
+            speculation.future = self._executor.submit(self._generate, speculation)
+            speculations.append(speculation)
+
+        with self._lock:
+            self._turn = turn
+            self._speculations = speculations
+            self.metrics["rounds"] += 1
+            self.metrics["speculated"] += len(speculations)
+
+    def _generate(self, speculation: Speculation) -> str:
+        # Embed the option up front so matching the player's input stays cheap
+        try:
+            speculation.embedding = embed_text(speculation.option)
+        except Exception:
+            pass
+        return self.generate_fn(speculation.option)
+
+    def take(self, turn: int, player_input: str) -> Optional[str]:
+        """Return the speculated response matching player_input, if any; discards the rest"""
+        with self._lock:
+            speculations = self._speculations if self._turn == turn else []
+            self._speculations = []
+            self._turn = None
+
+        match = self._match(player_input, speculations) if speculations else None
+        response = None
+        if match is not None:
+            try:
+                response = match.future.result()
+            except Exception:
+                response = None
+
+        with self._lock:
+            if response is not None:
+                self.metrics["hits"] += 1
+                self.metrics["used_tokens"] += match.estimated_tokens
+            elif speculations:
+                self.metrics["misses"] += 1
+        self._discard([s for s in speculations if s is not match or response is None])
+        return response
+
+    def _match(self, player_input: str, speculations: List[Speculation]) -> Optional[Speculation]:
+        """Match by option number, normalized text, then embedding similarity"""
+        stripped = player_input.strip()
+        if stripped.isdigit():
+            index = int(stripped) - 1
+            return speculations[index] if 0 <= index < len(speculations) else None
+
+        normalized = normalize_input(player_input)
+        for speculation in speculations:
+            if speculation.normalized == normalized:
+                return speculation
+
+        try:
+            query = embed_text(player_input)
+            best, best_score = None, self.similarity_threshold
+            for speculation in speculations:
+                if speculation.embedding is None:
+                    speculation.embedding = embed_text(speculation.option)
+                score = cosine_similarity(query, speculation.embedding)
+                if score >= best_score:
+                    best, best_score = speculation, score
+            return best
+        except Exception:
+            return None
+
+    def _discard(self, speculations: List[Speculation]):
+        """Cancel pending speculations and count the tokens spent on started ones"""
+        wasted = 0
+        for speculation in speculations:
+            if not speculation.future.cancel():
+                wasted += speculation.estimated_tokens
+        with self._lock:
+            self.metrics["wasted_tokens"] += wasted
+
+    def cancel(self):
+        """Drop all outstanding speculations (the state they were built on is stale)"""
+        with self._lock:
+            speculations = self._speculations
+            self._speculations = []
+            self._turn = None
+        self._discard(speculations)
+
+    def get_metrics(self) -> Dict:
+        """Hit rate and token usage of speculation so far"""
+        with self._lock:
+            metrics = dict(self.metrics)
+        attempts = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / attempts if attempts else 0.0
+        return metrics
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the worker threads"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,215 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.log import get_logger
+
+logger = get_logger("agents.runtime")
+
+# Final state of each agent in a turn run
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class AgentCancelled(Exception):
+    """Raised inside an agent when its turn was cancelled or ran past the deadline"""
+
+
+class TurnContext:
+    """Per-turn deadline and cancellation shared by every agent in a run"""
+
+    def __init__(self, turn: int, deadline: float):
+        self.turn = turn
+        self.deadline = time.monotonic() + deadline
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or self.remaining() == 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Stop the calling agent if the turn is cancelled; call between expensive steps"""
+        if self.cancelled:
+            raise AgentCancelled()
+
+
+class Agent(ABC):
+    """A unit of turn work with declared inputs and outputs"""
+
+    name: str = "agent"
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+    def should_run(self, inputs: Dict[str, Any]) -> bool:
+        """Skip the agent (and its dependents) when there is nothing for it to do"""
+        return True
+
+    @abstractmethod
+    def run(self, inputs: Dict[str, Any], ctx: TurnContext) -> Dict[str, Any]:
+        """Produce this agent's outputs from its inputs"""
+
+
+class AgentGraph:
+    """A DAG of agents wired together by matching output and input names"""
+
+    def __init__(self, agents: List[Agent], provided: Tuple[str, ...] = ()):
+        self.agents = {agent.name: agent for agent in agents}
+        if len(self.agents) != len(agents):
+            raise ValueError("Agent names must be unique")
+
+        self.producers: Dict[str, str] = {}
+        for agent in agents:
+            for output in agent.outputs:
+                if output in self.producers or output in provided:
+                    raise ValueError(f"Output {output!r} is produced more than once")
+                self.producers[output] = agent.name
+
+        # Upstream agents each agent waits for; inputs must come from the caller or another agent
+        self.dependencies: Dict[str, List[str]] = {}
+        for agent in agents:
+            upstream = []
+            for name in agent.inputs:
+                if name in self.producers:
+                    upstream.append(self.producers[name])
+                elif name not in provided:
+                    raise ValueError(f"Input {name!r} of agent {agent.name!r} has no producer")
+            self.dependencies[agent.name] = upstream
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Agent graph has a cycle through {name!r}")
+            visiting.add(name)
+            for upstream in self.dependencies[name]:
+                visit(upstream)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.agents:
+            visit(name)
+
+
+class TurnRun:
+    """One in-flight execution of an agent graph"""
+
+    def __init__(self, graph: AgentGraph, values: Dict[str, Any], ctx: TurnContext, executor: ThreadPoolExecutor):
+        self.graph = graph
+        self.ctx = ctx
+        self.values = dict(values)
+        self.status: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self._executor = executor
+        self._futures: Dict[str, Future] = {}
+        # Reentrant: a future that is already done runs its callback inside add_done_callback
+        self._lock = threading.RLock()
+        self._finished = threading.Event()
+
+    def start(self) -> "TurnRun":
+        with self._lock:
+            self._schedule_ready()
+        return self
+
+    def _schedule_ready(self):
+        """Start every agent whose upstream agents have all settled; call with the lock held"""
+        progressed = True
+        while progressed:
+            progressed = False
+            for name, agent in self.graph.agents.items():
+                if name in self.status or name in self._futures:
+                    continue
+                upstream = self.graph.dependencies[name]
+                if any(dep not in self.status for dep in upstream):
+                    continue
+                if self.ctx.cancelled:
+                    self.status[name] = CANCELLED
+                elif any(self.status[dep] != DONE for dep in upstream):
+                    self.status[name] = SKIPPED
+                else:
+                    inputs = {key: self.values.get(key) for key in agent.inputs}
+                    if agent.should_run(inputs):
+                        future = self._executor.submit(self._run_agent, agent, inputs)
+                        self._futures[name] = future
+                        future.add_done_callback(lambda f, name=name: self._on_done(name, f))
+                        continue
+                    self.status[name] = SKIPPED
+                # A settled agent may unblock (or skip) its dependents
+                progressed = True
+        if len(self.status) == len(self.graph.agents):
+            self._finished.set()
+
+    def _run_agent(self, agent: Agent, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.ctx.check()
+        start = time.perf_counter()
+        try:
+            return agent.run(inputs, self.ctx)
+        finally:
+            self.timings[agent.name] = time.perf_counter() - start
+
+    def _on_done(self, name: str, future: Future):
+        with self._lock:
+            self._futures.pop(name, None)
+            if future.cancelled() or self.ctx.cancelled:
+                self.status[name] = CANCELLED
+            elif future.exception() is not None:
+                error = future.exception()
+                self.status[name] = CANCELLED if isinstance(error, AgentCancelled) else FAILED
+                if self.status[name] == FAILED:
+                    logger.error("Agent failed", extra={"agent": name}, exc_info=error)
+            else:
+                outputs = future.result() or {}
+                agent = self.graph.agents[name]
+                self.values.update({key: outputs.get(key) for key in agent.outputs})
+                self.status[name] = DONE
+            self._schedule_ready()
+
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every agent to settle, at most until the deadline; True if all settled"""
+        limit = self.ctx.remaining() if timeout is None else min(timeout, self.ctx.remaining())
+        return self._finished.wait(limit)
+
+    def cancel(self):
+        """Cancel agents that have not finished; their outputs are discarded"""
+        self.ctx.cancel()
+        with self._lock:
+            for future in list(self._futures.values()):
+                future.cancel()
+            self._schedule_ready()
+
+    def results(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Outputs of an agent that finished, or None"""
+        if self.status.get(agent_name) != DONE:
+            return None
+        return {key: self.values.get(key) for key in self.graph.agents[agent_name].outputs}
+
+
+class AgentRunner:
+    """Runs agent graphs on a shared thread pool, independent agents concurrently"""
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+
+    def run(self, graph: AgentGraph, values: Dict[str, Any], turn: int, deadline: float) -> TurnRun:
+        """Start a graph for a turn without blocking; values feed the graph's provided inputs"""
+        return TurnRun(graph, values, TurnContext(turn, deadline), self._executor).start()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
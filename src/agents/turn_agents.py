@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.runtime import Agent, TurnContext
+from src.db.models import Entity
+from src.utils.llm import LLMClient
+from src.utils.structured import WORLD_FACTS_SCHEMA, parse_world_facts
+
+
+class PlotPlannerAgent(Agent):
+    """Extends the plot queue once the upcoming points run low
+
+    Plans only from the queue and world state snapshotted into the graph inputs; the turn
+    keeps changing the live ones while this runs.
+    """
+
+    name = "plot_planner"
+    inputs = ("situation", "player_action", "plot_points", "world_state")
+    outputs = ("new_plot_points",)
+
+    def __init__(self, extend_fn: Callable[[str, str, List[str], Dict[str, Any], int], List[str]], batch_size: int, low_watermark: int):
+        self.extend_fn = extend_fn
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+
+    def should_run(self, inputs: Dict[str, Any]) -> bool:
+        return len(inputs["plot_points"]) < self.low_watermark
+
+    def run(self, inputs: Dict[str, Any], ctx: TurnContext) -> Dict[str, Any]:
+        return {"new_plot_points": self.extend_fn(
+            inputs["situation"], inputs["player_action"], list(inputs["plot_points"]), inputs["world_state"], self.batch_size
+        )}
+
+
+class NpcReactorAgent(Agent):
+    """Decides what one NPC in the scene intends to do after the latest exchange"""
+
+    inputs = ("player_action", "response")
+
+    def __init__(self, npc: Entity, llm_client: LLMClient, system_prompt: str, max_tokens: int):
+        self.npc = npc
+        self.llm_client = llm_client
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.name = f"npc_reactor:{npc.id}"
+        self.outputs = (f"npc_reaction:{npc.id}",)
+
+    def run(self, inputs: Dict[str, Any], ctx: TurnContext) -> Dict[str, Any]:
+        prompt = f"""You are {self.npc.name}, {self.npc.entity_type}: {self.npc.description}
+
+Player action: {inputs["player_action"]}
+What the player saw: {inputs["response"]}"""
+
+        reaction = self.llm_client.generate(
+            system_prompt=self.system_prompt,
+            prompt=prompt,
+            temperature=0.7,
+            max_tokens=self.max_tokens,
+            call_site="npc_reactor"
+        )
+        return {self.outputs[0]: reaction.strip()}
+
+
+class MemorySummarizerAgent(Agent):
+    """Folds recent exchanges into the running story summary every few turns"""
+
+    name = "memory_summarizer"
+    inputs = ("turn", "story_summary", "recent_history")
+    outputs = ("story_summary_update",)
+
+    def __init__(self, llm_client: LLMClient, system_prompt: str, interval: int, max_tokens: int):
+        self.llm_client = llm_client
+        self.system_prompt = system_prompt
+        self.interval = max(1, interval)
+        self.max_tokens = max_tokens
+
+    def should_run(self, inputs: Dict[str, Any]) -> bool:
+        return inputs["turn"] % self.interval == 0 and bool(inputs["recent_history"])
+
+    def run(self, inputs: Dict[str, Any], ctx: TurnContext) -> Dict[str, Any]:
+        exchanges = "\n".join(
+            f"{'Player' if msg['role'] == 'user' else 'Dungeon Master'}: {msg['content']}"
+            for msg in inputs["recent_history"]
+        )
+        prompt = f"""Previous summary: {inputs["story_summary"] or "None yet"}
+
+Latest exchanges:
+{exchanges}"""
+
+        summary = self.llm_client.generate(
+            system_prompt=self.system_prompt,
+            prompt=prompt,
+            temperature=0.2,
+            max_tokens=self.max_tokens,
+            call_site="story_summary"
+        )
+        return {"story_summary_update": summary.strip()}
+
+
+class WorldExtractorAgent(Agent):
+    """Records the locations, entities and player position a DM response mentions
+
+    Facts are applied here rather than on the next turn: they describe a response the player
+    has already seen, so they stay valid even when the next turn cancels this run.
+    """
+
+    name = "world_extractor"
+    inputs = ("player_action", "response")
+    outputs = ("world_facts",)
+
+    def __init__(
+        self, world, llm_client: LLMClient, system_prompt: str, max_items: int, max_tokens: int,
+        on_extracted: Callable[[Optional[Dict[str, Any]]], None]
+    ):
+        self.world = world
+        self.llm_client = llm_client
+        self.system_prompt = system_prompt
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.on_extracted = on_extracted
+
+    def run(self, inputs: Dict[str, Any], ctx: TurnContext) -> Dict[str, Any]:
+        # Known names keep the model from inventing a new place for every rephrasing
+        known = ", ".join(location.name for location in self.world.get_all_locations()) or "None yet"
+        prompt = f"""Known locations: {known}
+
+Player action: {inputs["player_action"]}
+Dungeon Master: {inputs["response"]}"""
+
+        text = self.llm_client.generate_json(
+            schema=WORLD_FACTS_SCHEMA,
+            schema_name="world_facts",
+            system_prompt=self.system_prompt,
+            prompt=prompt,
+            temperature=0.0,
+            max_tokens=self.max_tokens,
+            call_site="world_extractor"
+        )
+        facts = parse_world_facts(text, self.max_items)
+        summary = None
+        if facts is not None:
+            player_location_id = self.world.apply_world_facts(facts)
+            summary = {
+                "locations": len(facts["locations"]),
+                "entities": len(facts["entities"]),
+                "player_location_id": player_location_id,
+                "moved": bool(player_location_id) and self.world.set_player_location(player_location_id)
+            }
+        self.on_extracted(summary)
+        return {"world_facts": summary}
@@ -1,7 +1,21 @@
 import json
 import sqlite3
+import time
+import uuid
+from collections import Counter, deque
 from typing import List, Dict, Optional, Any
-from src.db.database import get_sqlite_connection, get_chromadb_client
+from config.configs import HYBRID_RETRIEVAL, LEXICAL_FAST_PATH_MAX_TERMS, LEXICAL_FAST_PATH_MARGIN
+from src.db.database import get_sqlite_connection
+from src.db.vector_store import get_vector_store
+from src.db.embeddings import embed_texts
+from src.db.lexical_index import BM25Index, tokenize, reciprocal_rank_fusion
+from src.db.models import (
+    GameState, Location, Entity,
+    game_state_factory, location_factory, entity_factory
+)
+from src.utils.log import get_logger
+
+logger = get_logger("db.crud")
 
 # Game State Operations
 def create_game_state(plot_progress: str, session_data: Dict, world_state: Dict):
@@ -17,13 +31,14 @@ def create_game_state(plot_progress: str, session_data: Dict, world_state: Dict)
     conn.commit()
     conn.close()
 
-def get_current_game_state():
+def get_current_game_state() -> Optional[GameState]:
     """Get the most recent game state"""
     conn = get_sqlite_connection()
     cursor = conn.cursor()
+    cursor.row_factory = game_state_factory
     
-    cursor.execute("""
-        SELECT * FROM game_states 
+    cursor.execute(f"""
+        SELECT {GameState.COLUMNS} FROM game_states 
         ORDER BY created_at DESC 
         LIMIT 1
     """)
@@ -32,19 +47,46 @@ def get_current_game_state():
     conn.close()
     return result
 
-def update_game_state(plot_progress: str, session_data: Dict, world_state: Dict):
-    """Update the current game state"""
+def update_game_state(plot_progress: Optional[str] = None, session_data: Optional[Dict] = None, world_state: Optional[Dict] = None):
+    """Update the given columns of the current game state, leaving the others as stored"""
+    columns = {"plot_progress": plot_progress, "session_data": session_data, "world_state": world_state}
+    values = {
+        column: value if column == "plot_progress" else json.dumps(value)
+        for column, value in columns.items() if value is not None
+    }
+    if not values:
+        return
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    cursor.execute(f"""
         UPDATE game_states 
-        SET plot_progress = ?, session_data = ?, world_state = ?
+        SET {assignments}
         WHERE id = (SELECT id FROM game_states ORDER BY created_at DESC LIMIT 1)
-    """, (plot_progress, json.dumps(session_data), json.dumps(world_state)))
+    """, tuple(values.values()))
+    
+    conn.commit()
+    conn.close()
+
+def set_session_value(key: str, value: Any) -> bool:
+    """Set one scalar session_data field of the current game state in place; True if it changed"""
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    
+    # A single statement, so concurrent writers of other fields or columns are never overwritten
+    path = f"$.{key}"
+    cursor.execute("""
+        UPDATE game_states
+        SET session_data = json_set(COALESCE(session_data, '{}'), ?, ?)
+        WHERE id = (SELECT id FROM game_states ORDER BY created_at DESC LIMIT 1)
+          AND json_extract(COALESCE(session_data, '{}'), ?) IS NOT ?
+    """, (path, value, path, value))
+    changed = cursor.rowcount > 0
     
     conn.commit()
     conn.close()
+    return changed
 
 # Location Operations
 def create_location(name: str, description: str, properties: Optional[Dict] = None) -> int:
@@ -62,22 +104,24 @@ def create_location(name: str, description: str, properties: Optional[Dict] = No
     conn.close()
     return location_id
 
-def get_location(location_id: int):
+def get_location(location_id: int) -> Optional[Location]:
     """Get location by ID"""
     conn = get_sqlite_connection()
     cursor = conn.cursor()
+    cursor.row_factory = location_factory
     
-    cursor.execute("SELECT * FROM locations WHERE id = ?", (location_id,))
+    cursor.execute(f"SELECT {Location.COLUMNS} FROM locations WHERE id = ?", (location_id,))
     result = cursor.fetchone()
     conn.close()
     return result
 
-def get_all_locations():
+def get_all_locations() -> List[Location]:
     """Get all locations"""
     conn = get_sqlite_connection()
     cursor = conn.cursor()
+    cursor.row_factory = location_factory
     
-    cursor.execute("SELECT * FROM locations")
+    cursor.execute(f"SELECT {Location.COLUMNS} FROM locations")
     results = cursor.fetchall()
     conn.close()
     return results
@@ -98,58 +142,346 @@ def create_entity(name: str, entity_type: str, description: str, location_id: in
     conn.close()
     return entity_id
 
-def get_entities_by_location(location_id: int):
+def get_entities_by_location(location_id: int) -> List[Entity]:
     """Get entities at a specific location"""
     conn = get_sqlite_connection()
     cursor = conn.cursor()
+    cursor.row_factory = entity_factory
     
-    cursor.execute("SELECT * FROM entities WHERE location_id = ?", (location_id,))
+    cursor.execute(f"SELECT {Entity.COLUMNS} FROM entities WHERE location_id = ?", (location_id,))
     results = cursor.fetchall()
     conn.close()
     return results
 
-def get_entities_by_type(entity_type: str):
+def get_entities_by_type(entity_type: str) -> List[Entity]:
     """Get entities by type"""
     conn = get_sqlite_connection()
     cursor = conn.cursor()
+    cursor.row_factory = entity_factory
     
-    cursor.execute("SELECT * FROM entities WHERE entity_type = ?", (entity_type,))
+    cursor.execute(f"SELECT {Entity.COLUMNS} FROM entities WHERE entity_type = ?", (entity_type,))
     results = cursor.fetchall()
     conn.close()
     return results
 
+def upsert_world_facts(locations: List[Dict], entities: List[Dict]) -> Dict[str, int]:
+    """Insert or update extracted locations and entities in one transaction; returns location ids by lowercased name"""
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    
+    # New descriptions replace old ones; missing fields keep what is stored
+    cursor.executemany("""
+        INSERT INTO locations (name, description) VALUES (?, ?)
+        ON CONFLICT (name COLLATE NOCASE) DO UPDATE SET
+            description = COALESCE(excluded.description, locations.description)
+    """, [(location["name"], location.get("description")) for location in locations])
+    
+    names = {location["name"] for location in locations} | {entity["location"] for entity in entities if entity.get("location")}
+    location_ids = {}
+    if names:
+        placeholders = ", ".join("?" for _ in names)
+        cursor.execute(f"SELECT id, name FROM locations WHERE name COLLATE NOCASE IN ({placeholders})", tuple(names))
+        location_ids = {name.lower(): location_id for location_id, name in cursor.fetchall()}
+    
+    cursor.executemany("""
+        INSERT INTO entities (name, entity_type, description, location_id) VALUES (?, ?, ?, ?)
+        ON CONFLICT (name COLLATE NOCASE) DO UPDATE SET
+            description = COALESCE(excluded.description, entities.description),
+            location_id = COALESCE(excluded.location_id, entities.location_id)
+    """, [
+        (entity["name"], entity["type"], entity.get("description"), location_ids.get((entity.get("location") or "").lower()))
+        for entity in entities
+    ])
+    
+    conn.commit()
+    conn.close()
+    return location_ids
+
+# LLM Usage Operations
+USAGE_COLUMNS = ("session_id", "call_site", "provider", "model", "input_tokens", "output_tokens", "cost_usd", "latency_ms", "estimated")
+USAGE_GROUPS = ("session_id", "call_site", "provider", "model")
+
+def record_llm_usage(records: List[Dict]):
+    """Insert a batch of LLM usage records"""
+    if not records:
+        return
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    
+    cursor.executemany(f"""
+        INSERT INTO llm_usage ({", ".join(USAGE_COLUMNS)})
+        VALUES ({", ".join("?" for _ in USAGE_COLUMNS)})
+    """, [tuple(record.get(column) for column in USAGE_COLUMNS) for record in records])
+    
+    conn.commit()
+    conn.close()
+
+def get_llm_usage_summary(group_by: str = "call_site", session_id: Optional[str] = None) -> List[Dict]:
+    """Aggregate LLM usage per session, call site, provider or model, most expensive first"""
+    if group_by not in USAGE_GROUPS:
+        raise ValueError(f"Cannot group LLM usage by {group_by!r}")
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    
+    where, params = ("WHERE session_id = ?", (session_id,)) if session_id is not None else ("", ())
+    cursor.execute(f"""
+        SELECT {group_by}, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd), AVG(latency_ms)
+        FROM llm_usage {where}
+        GROUP BY {group_by}
+        ORDER BY SUM(cost_usd) DESC, SUM(input_tokens) + SUM(output_tokens) DESC
+    """, params)
+    
+    results = [
+        {group_by: key, "calls": calls, "input_tokens": input_tokens, "output_tokens": output_tokens,
+         "cost_usd": cost_usd, "avg_latency_ms": avg_latency_ms}
+        for key, calls, input_tokens, output_tokens, cost_usd, avg_latency_ms in cursor.fetchall()
+    ]
+    conn.close()
+    return results
+
+def get_llm_usage_totals(session_id: Optional[str] = None) -> Dict[str, float]:
+    """Total tokens and cost recorded, optionally for one session"""
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    
+    where, params = ("WHERE session_id = ?", (session_id,)) if session_id is not None else ("", ())
+    cursor.execute(f"""
+        SELECT COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0), COALESCE(SUM(cost_usd), 0)
+        FROM llm_usage {where}
+    """, params)
+    
+    input_tokens, output_tokens, cost_usd = cursor.fetchone()
+    conn.close()
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "cost_usd": cost_usd}
+
 # Episodic Memory Operations
-def add_episodic_memory(content: str, metadata: Optional[Dict] = None):
+
+# In-process retrieval statistics, read by the memory consolidator
+_memory_access_counts: Counter = Counter()
+_memory_query_latencies: deque = deque(maxlen=1000)
+
+# Local BM25 index mirroring the episodic memory collection, built on first use
+_lexical_index = BM25Index()
+_lexical_index_loaded = False
+_lexical_index_store = None  # the store the index was loaded from; a reopened store reloads it
+
+# Memories queued for a background write, visible to hybrid search until committed
+_pending_memories: Dict[str, tuple] = {}
+
+def _get_lexical_index() -> BM25Index:
+    """Get the lexical index, loading existing documents from the vector store the first time"""
+    global _lexical_index_loaded, _lexical_index_store
+    store = get_vector_store()
+    if not _lexical_index_loaded or store is not _lexical_index_store:
+        _lexical_index.clear()
+        existing = store.get(include=["documents", "metadatas"])
+        for memory_id, document, metadata in zip(existing["ids"], existing["documents"], existing["metadatas"]):
+            _lexical_index.add(memory_id, document, metadata)
+        for memory_id, (document, metadata) in list(_pending_memories.items()):
+            _lexical_index.add(memory_id, document, metadata)
+        _lexical_index_loaded = True
+        _lexical_index_store = store
+    return _lexical_index
+
+def add_episodic_memory(content: str, metadata: Optional[Dict] = None) -> Optional[str]:
     """Add content to episodic memory"""
     try:
-        client = get_chromadb_client()
-        collection = client.get_collection("episodic_memory")
+        store = get_vector_store()
         
         # Generate a simple ID
-        import uuid
         memory_id = str(uuid.uuid4())
         
-        # Add to collection
-        collection.add(
+        # Add to the vector store
+        store.add(
+            ids=[memory_id],
             documents=[content],
-            metadatas=[metadata or {}],
-            ids=[memory_id]
+            metadatas=[metadata or {}]
         )
+        if _lexical_index_loaded:
+            _lexical_index.add(memory_id, content, metadata)
+        return memory_id
     except Exception as e:
-        print(f"Error adding episodic memory: {e}")
+        logger.error("Error adding episodic memory", exc_info=e)
+        return None
 
-def search_episodic_memory(query: str, n_results: int = 5):
-    """Search episodic memory"""
+def add_episodic_memories(
+    contents: List[str],
+    metadatas: Optional[List[Dict]] = None,
+    ids: Optional[List[str]] = None,
+    embeddings: Optional[List[List[float]]] = None
+) -> List[str]:
+    """Embed and add a batch of memories in one call; precomputed embeddings skip the embedding"""
+    if not contents:
+        return []
+    metadatas = metadatas or [{} for _ in contents]
+    ids = ids or [str(uuid.uuid4()) for _ in contents]
     try:
-        client = get_chromadb_client()
-        collection = client.get_collection("episodic_memory")
+        store = get_vector_store()
         
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
+        store.add(
+            ids=ids,
+            documents=contents,
+            metadatas=metadatas,
+            embeddings=embeddings if embeddings is not None else embed_texts(contents)
         )
+        if _lexical_index_loaded:
+            for memory_id, content, metadata in zip(ids, contents, metadatas):
+                _lexical_index.add(memory_id, content, metadata)
+        return ids
+    except Exception as e:
+        logger.error("Error adding episodic memories", extra={"count": len(contents)}, exc_info=e)
+        return []
+
+def stage_episodic_memory(memory_id: str, content: str, metadata: Dict):
+    """Make a memory searchable through the lexical index before it is written to the vector store"""
+    _pending_memories[memory_id] = (content, metadata)
+    if _lexical_index_loaded:
+        _lexical_index.add(memory_id, content, metadata)
+
+def unstage_episodic_memories(ids: List[str], committed: bool = True):
+    """Forget staged memories once their write has committed, dropping them from the index if it failed"""
+    for memory_id in ids:
+        _pending_memories.pop(memory_id, None)
+        if not committed:
+            _lexical_index.remove(memory_id)
+
+def build_memory_filter(
+    memory_type: Optional[Any] = None,
+    session_id: Optional[str] = None,
+    plot_index: Optional[int] = None,
+    since: Optional[float] = None
+) -> Optional[Dict]:
+    """Build a ChromaDB where filter from memory metadata constraints"""
+    clauses = []
+    if memory_type is not None:
+        if isinstance(memory_type, (list, tuple, set)):
+            clauses.append({"type": {"$in": list(memory_type)}})
+        else:
+            clauses.append({"type": memory_type})
+    if session_id is not None:
+        clauses.append({"session_id": session_id})
+    if plot_index is not None:
+        clauses.append({"plot_index": plot_index})
+    if since is not None:
+        clauses.append({"timestamp": {"$gte": since}})
+    
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def search_episodic_memory(query: str, n_results: int = 5, hybrid: bool = HYBRID_RETRIEVAL, where: Optional[Dict] = None):
+    """Search episodic memory, fusing BM25 and vector results when hybrid is enabled"""
+    try:
+        store = get_vector_store()
+        
+        start = time.perf_counter()
+        # Staged memories only exist in the lexical index, so include it while any are pending
+        if hybrid or _pending_memories:
+            results = _hybrid_search(store, query, n_results, where)
+        else:
+            results = store.query(query, n_results, where)
+        _memory_query_latencies.append(time.perf_counter() - start)
+        
+        # Track which memories are actually being retrieved
+        if results.get("ids"):
+            _memory_access_counts.update(results["ids"][0])
         
         return results
     except Exception as e:
-        print(f"Error searching episodic memory: {e}")
-        return {"documents": [], "metadatas": []} 
\ No newline at end of file
+        logger.error("Error searching episodic memory", exc_info=e)
+        return {"documents": [], "metadatas": []}
+
+def _is_confident_lexical_match(index: BM25Index, query: str, lexical: List) -> bool:
+    """Short query whose terms all hit one clear top document"""
+    if not lexical or len(tokenize(query)) > LEXICAL_FAST_PATH_MAX_TERMS:
+        return False
+    top_id, top_score = lexical[0]
+    runner_up = lexical[1][1] if len(lexical) > 1 else 0.0
+    if runner_up and top_score / runner_up < LEXICAL_FAST_PATH_MARGIN:
+        return False
+    return index.matched_terms(query, top_id) == 1.0
+
+def _hybrid_search(store, query: str, n_results: int, where: Optional[Dict] = None) -> Dict:
+    """BM25 + vector search fused by reciprocal rank, skipping embedding on confident lexical matches"""
+    index = _get_lexical_index()
+    lexical = index.search(query, n_results * 2, where)
+    
+    if _is_confident_lexical_match(index, query, lexical):
+        ranked = lexical[:n_results]
+        vector_docs = {}
+    else:
+        vector = store.query(query, n_results * 2, where)
+        vector_ids = vector["ids"][0] if vector.get("ids") else []
+        vector_docs = {
+            doc_id: (document, metadata)
+            for doc_id, document, metadata in zip(vector_ids, vector["documents"][0], vector["metadatas"][0])
+        }
+        ranked = reciprocal_rank_fusion([vector_ids, [doc_id for doc_id, _ in lexical]])[:n_results]
+    
+    ids, documents, metadatas, scores = [], [], [], []
+    for doc_id, score in ranked:
+        stored = vector_docs.get(doc_id) or index.get(doc_id)
+        if stored is None:
+            continue
+        ids.append(doc_id)
+        documents.append(stored[0])
+        metadatas.append(stored[1])
+        scores.append(score)
+    
+    # Same nested-list shape as a ChromaDB query result
+    return {"ids": [ids], "documents": [documents], "metadatas": [metadatas], "scores": [scores]}
+
+def get_episodic_memories(where: Optional[Dict] = None, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict:
+    """Get episodic memories by filter or IDs without a similarity query"""
+    try:
+        store = get_vector_store()
+        
+        return store.get(ids=ids, where=where, include=include)
+    except Exception as e:
+        logger.error("Error getting episodic memories", exc_info=e)
+        return {"ids": [], "documents": [], "metadatas": []}
+
+def delete_episodic_memories(ids: List[str]):
+    """Delete episodic memories by ID"""
+    if not ids:
+        return
+    try:
+        store = get_vector_store()
+        store.delete(ids)
+        
+        for memory_id in ids:
+            _memory_access_counts.pop(memory_id, None)
+            _lexical_index.remove(memory_id)
+    except Exception as e:
+        logger.error("Error deleting episodic memories", exc_info=e)
+
+def clear_episodic_memory():
+    """Delete every episodic memory and reset the local lexical index"""
+    global _lexical_index_loaded
+    try:
+        get_vector_store().clear()
+    except Exception as e:
+        logger.error("Error clearing episodic memory", exc_info=e)
+    finally:
+        _lexical_index.clear()
+        _memory_access_counts.clear()
+        _pending_memories.clear()
+        _lexical_index_loaded = False
+
+def count_episodic_memories() -> int:
+    """Count records in the episodic memory store"""
+    try:
+        return get_vector_store().count()
+    except Exception as e:
+        logger.error("Error counting episodic memories", exc_info=e)
+        return 0
+
+def get_memory_access_count(memory_id: str) -> int:
+    """Number of times a memory was returned by search in this process"""
+    return _memory_access_counts.get(memory_id, 0)
+
+def drain_memory_query_latencies() -> List[float]:
+    """Return and clear query latencies (seconds) recorded since the last call"""
+    latencies = list(_memory_query_latencies)
+    _memory_query_latencies.clear()
+    return latencies
@@ -2,22 +2,25 @@ import sqlite3
 import json
 from pathlib import Path
 from typing import Optional
-import chromadb
 from config.configs import SQLITE_DB_PATH, CHROMADB_PATH
 
-def get_sqlite_connection():
-    """Get SQLite database connection"""
-    SQLITE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(str(SQLITE_DB_PATH))
+def get_sqlite_connection(db_path: Optional[Path] = None):
+    """Get SQLite database connection, to the game database unless db_path is given"""
+    db_path = db_path or SQLITE_DB_PATH
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(str(db_path))
 
 def get_chromadb_client():
     """Get ChromaDB client"""
+    # Imported here so the default NumPy vector store never pays for loading chromadb
+    import chromadb
+    
     CHROMADB_PATH.mkdir(parents=True, exist_ok=True)
     return chromadb.PersistentClient(path=str(CHROMADB_PATH))
 
-def create_sqlite_schema():
+def create_sqlite_schema(db_path: Optional[Path] = None):
     """Create SQLite database schema"""
-    conn = get_sqlite_connection()
+    conn = get_sqlite_connection(db_path)
     cursor = conn.cursor()
     
     # Create tables
@@ -52,6 +55,28 @@ def create_sqlite_schema():
         )
     """)
     
+    # Names identify extracted locations and entities, so upserts key on them
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_locations_name ON locations (name COLLATE NOCASE)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entities_name ON entities (name COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_location ON entities (location_id)")
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            call_site TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            model TEXT,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            cost_usd REAL NOT NULL,
+            latency_ms REAL,
+            estimated INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_session ON llm_usage (session_id)")
+    
     conn.commit()
     conn.close()
 
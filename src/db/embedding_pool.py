@@ -0,0 +1,212 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.log import get_logger
+
+logger = get_logger("db.embedding_pool")
+
+
+def _worker_main(requests, results, slot_names: List[str], slot_floats: int):
+    """Embed batches from the request queue into the shared buffer named by each request"""
+    from src.db.embeddings import get_embedding_function
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    embed = get_embedding_function()
+    # Load the model before reporting ready; until every worker is, jobs are embedded inline
+    embed(["warm up"])
+    results.put((None, 0, 0, None))
+    try:
+        while True:
+            job = requests.get()
+            if job is None:
+                return
+            request_id, slot, texts = job
+            try:
+                vectors = np.asarray(embed(texts), dtype=np.float32)
+                rows, dim = vectors.shape
+                if rows * dim > slot_floats:
+                    raise ValueError(f"{rows}x{dim} embeddings do not fit a {slot_floats}-float buffer")
+                out = np.ndarray((rows, dim), dtype=np.float32, buffer=slots[slot].buf)
+                out[:] = vectors
+                del out
+                results.put((request_id, rows, dim, None))
+            except Exception as e:
+                results.put((request_id, 0, 0, repr(e)))
+    finally:
+        for shm in slots:
+            shm.close()
+
+
+class EmbeddingPool:
+    """Worker processes that embed batches into shared-memory buffers
+
+    Each in-flight batch holds one of max_pending preallocated buffers; callers block
+    for a free buffer (backpressure) and only the texts and a small header are pickled.
+    """
+
+    def __init__(self, workers: int, batch_size: int, max_pending: int, max_dim: int, sync_threshold: int, timeout: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_dim = max_dim
+        self.sync_threshold = sync_threshold
+        self.timeout = timeout
+
+        self._slots: List[shared_memory.SharedMemory] = []
+        self._free: "queue.Queue[int]" = queue.Queue()
+        self._inflight: Dict[int, Tuple[Future, int]] = {}
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._processes = []
+        self._collector: Optional[threading.Thread] = None
+        self._requests = None
+        self._results = None
+        self._ready = 0  # workers that finished loading the model
+        self.running = False
+        self.metrics = {"pool_batches": 0, "inline_batches": 0, "texts": 0, "backpressure_waits": 0, "failures": 0}
+
+    def start(self) -> "EmbeddingPool":
+        """Allocate the shared buffers and spawn the workers"""
+        if self.running:
+            return self
+        context = multiprocessing.get_context("spawn")
+        slot_floats = self.batch_size * self.max_dim
+        self._slots = [shared_memory.SharedMemory(create=True, size=slot_floats * 4) for _ in range(self.max_pending)]
+        for slot in range(self.max_pending):
+            self._free.put(slot)
+
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        slot_names = [shm.name for shm in self._slots]
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(self._requests, self._results, slot_names, slot_floats),
+                name=f"embedder-{i}",
+                daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, name="embedding-collector", daemon=True)
+        self._collector.start()
+        self.running = True
+        return self
+
+    def _collect(self):
+        """Copy finished batches out of their buffers, free the buffers and resolve the futures"""
+        while True:
+            message = self._results.get()
+            if message is None:
+                return
+            request_id, rows, dim, error = message
+            if request_id is None:
+                with self._lock:
+                    self._ready += 1
+                continue
+            with self._lock:
+                future, slot = self._inflight.pop(request_id)
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                view = np.ndarray((rows, dim), dtype=np.float32, buffer=self._slots[slot].buf)
+                vectors = view.copy()
+                del view
+                future.set_result(vectors)
+            self._free.put(slot)
+
+    def _submit(self, texts: List[str]) -> Future:
+        """Queue one batch, waiting for a free buffer when max_pending batches are in flight"""
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self._count("backpressure_waits")
+            slot = self._free.get(timeout=self.timeout)
+
+        future: Future = Future()
+        request_id = next(self._request_ids)
+        with self._lock:
+            self._inflight[request_id] = (future, slot)
+        self._requests.put((request_id, slot, texts))
+        return future
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches on the workers, inline when the job is tiny or the pool is not ready"""
+        self._count("texts", len(texts))
+        if not self.running or len(texts) < self.sync_threshold or not self._workers_ready():
+            return self._embed_inline(texts)
+
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        pending = []
+        for batch in batches:
+            try:
+                pending.append((batch, self._submit(batch)))
+            except queue.Empty:
+                pending.append((batch, None))
+
+        vectors: List[np.ndarray] = []
+        for batch, future in pending:
+            try:
+                if future is None:
+                    raise TimeoutError("No embedding buffer freed up in time")
+                vectors.append(future.result(timeout=self.timeout))
+                self._count("pool_batches")
+            except Exception as e:
+                self._count("failures")
+                logger.warning("Embedding worker batch failed, embedding inline", exc_info=e)
+                vectors.append(self._embed_inline(batch))
+        return np.concatenate(vectors)
+
+    def _embed_inline(self, texts: List[str]) -> np.ndarray:
+        from src.db.embeddings import get_embedding_function
+
+        self._count("inline_batches")
+        return np.asarray(get_embedding_function()(texts), dtype=np.float32)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.metrics[key] += amount
+
+    def _workers_ready(self) -> bool:
+        """Every worker loaded its model and is still alive"""
+        with self._lock:
+            ready = self._ready
+        return ready >= len(self._processes) and all(process.is_alive() for process in self._processes)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers and release the shared buffers"""
+        if not self.running:
+            return
+        self.running = False
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        self._collector.join(timeout)
+
+        with self._lock:
+            for future, _ in self._inflight.values():
+                future.cancel()
+            self._inflight.clear()
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+        self._free = queue.Queue()
+        self._processes = []
+        self._ready = 0
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.metrics, workers=self.workers, ready=self._ready, in_flight=len(self._inflight))
@@ -0,0 +1,81 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from config.configs import (
+    EMBEDDING_WORKERS, EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_PENDING,
+    EMBEDDING_MAX_DIM, EMBEDDING_SYNC_THRESHOLD, EMBEDDING_TIMEOUT
+)
+
+# Same model ChromaDB uses for the episodic memory collection, loaded once per process
+_embedding_function = None
+_embedding_lock = threading.Lock()
+
+# Worker process pool for large jobs, started by start_embedding_pool()
+_pool = None
+
+
+def get_embedding_function():
+    """Get the shared default embedding function"""
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_lock:
+            if _embedding_function is None:
+                # Deferred to the first embedding so importing this module does not load chromadb
+                from chromadb.utils import embedding_functions
+                _embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+def start_embedding_pool(workers: int = EMBEDDING_WORKERS):
+    """Move large embedding jobs to worker processes; no-op when workers is 0"""
+    global _pool
+    if workers <= 0 or _pool is not None:
+        return _pool
+    from src.db.embedding_pool import EmbeddingPool
+    _pool = EmbeddingPool(
+        workers=workers,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_pending=EMBEDDING_MAX_PENDING,
+        max_dim=EMBEDDING_MAX_DIM,
+        sync_threshold=EMBEDDING_SYNC_THRESHOLD,
+        timeout=EMBEDDING_TIMEOUT
+    ).start()
+    return _pool
+
+
+def stop_embedding_pool():
+    """Stop the worker processes; later jobs are embedded in this process"""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop()
+
+
+def get_embedding_pool_metrics() -> Optional[dict]:
+    return _pool.get_metrics() if _pool is not None else None
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed texts as a float32 matrix, on the worker pool when it is running and the job is large enough"""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    pool = _pool
+    if pool is not None and len(texts) >= pool.sync_threshold:
+        return pool.embed(texts)
+    return np.asarray(get_embedding_function()(texts), dtype=np.float32)
+
+
+def embed_text(text: str) -> Optional[np.ndarray]:
+    """Embed a single text"""
+    vectors = embed_texts([text])
+    return vectors[0] if len(vectors) else None
+
+
+def cosine_similarity(a, b) -> float:
+    """Cosine similarity of two vectors"""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / norm if norm else 0.0
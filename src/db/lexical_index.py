@@ -0,0 +1,152 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Words too common to carry lexical signal in player input or narration
+_STOPWORDS = frozenset("""
+a an and are as at be but by do for from go had has have i in into is it its me my
+of on or so that the their then there this to up was we what with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+_COMPARATORS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """Evaluate a ChromaDB-style where filter against a metadata dict"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            try:
+                if not all(_COMPARATORS[op](value, target) for op, target in condition.items()):
+                    return False
+            except TypeError:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring, updated incrementally"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, Dict]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict] = None):
+        """Index a document, replacing any previous version with the same ID"""
+        with self._lock:
+            if doc_id in self._doc_lengths:
+                self.remove(doc_id)
+            tokens = tokenize(text)
+            for term, count in Counter(tokens).items():
+                self._postings[term][doc_id] = count
+            self._doc_lengths[doc_id] = len(tokens)
+            self._documents[doc_id] = (text, metadata or {})
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        """Remove a document from the index"""
+        with self._lock:
+            if doc_id not in self._doc_lengths:
+                return
+            text, _ = self._documents.pop(doc_id)
+            for term in set(tokenize(text)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def clear(self):
+        """Remove all documents"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_lengths.clear()
+            self._documents.clear()
+            self._total_length = 0
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict]]:
+        """Get the (document, metadata) stored for an ID"""
+        return self._documents.get(doc_id)
+
+    def search(self, query: str, n_results: int = 5, where: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """Return up to n_results (doc_id, score) pairs matching where, best first"""
+        terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not terms or not doc_count:
+                return []
+            avg_length = self._total_length / doc_count
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if where and not matches_where(self._documents[doc_id][1], where):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n_results]
+
+    def matched_terms(self, query: str, doc_id: str) -> float:
+        """Fraction of the query's terms that occur in a document"""
+        terms = set(tokenize(query))
+        if not terms:
+            return 0.0
+        with self._lock:
+            hits = sum(1 for term in terms if doc_id in self._postings.get(term, {}))
+        return hits / len(terms)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked ID lists into one, best first"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
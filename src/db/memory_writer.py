@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from src.db.crud import add_episodic_memories, stage_episodic_memory, unstage_episodic_memories
+from src.utils.log import get_logger
+from config.configs import MEMORY_WRITE_BATCH_SIZE, MEMORY_WRITE_FLUSH_INTERVAL
+
+logger = get_logger("db.memory_writer")
+
+
+class EpisodicMemoryWriter:
+    """Write-behind queue that batches episodic memories and commits them off the turn path"""
+
+    def __init__(self, batch_size: int = MEMORY_WRITE_BATCH_SIZE, flush_interval: float = MEMORY_WRITE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.batches_written = 0
+        self.memories_written = 0
+
+    def start(self):
+        """Run the writer on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run_loop, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, content: str, metadata: Optional[Dict] = None) -> str:
+        """Queue a memory for writing; it is searchable through the lexical index right away"""
+        memory_id = str(uuid.uuid4())
+        metadata = metadata or {}
+        stage_episodic_memory(memory_id, content, metadata)
+        self._queue.put((memory_id, content, metadata))
+        return memory_id
+
+    def flush(self):
+        """Block until every queued memory has been written"""
+        if self._thread and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Write whatever is still queued, then stop the background thread"""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "batches_written": self.batches_written,
+            "memories_written": self.memories_written,
+            "pending": self._queue.unfinished_tasks
+        }
+
+    def _run_loop(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[tuple] = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+
+            # Gather more memories until the batch is full or the flush interval passes
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            # On stop, drain anything that was queued behind the sentinel
+            while stopping:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+                else:
+                    self._queue.task_done()
+
+            self._write(batch)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+    def _write(self, batch: List[tuple]):
+        if not batch:
+            return
+        ids = [memory_id for memory_id, _, _ in batch]
+        written = add_episodic_memories(
+            [content for _, content, _ in batch],
+            [metadata for _, _, metadata in batch],
+            ids
+        )
+        unstage_episodic_memories(ids, committed=bool(written))
+        if written:
+            self.batches_written += 1
+            self.memories_written += len(written)
+        else:
+            logger.warning("Dropped episodic memory batch", extra={"count": len(batch)})
@@ -0,0 +1,92 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# Sentinel for JSON columns that have not been decoded yet
+_UNDECODED = object()
+
+
+def _decode_json(raw: Optional[str]) -> Dict:
+    """Decode a JSON column, treating NULL/empty as an empty dict"""
+    return json.loads(raw) if raw else {}
+
+
+@dataclass(slots=True)
+class GameState:
+    """Row of the game_states table"""
+    id: int
+    plot_progress: Optional[str]
+    session_data_json: Optional[str]
+    world_state_json: Optional[str]
+    created_at: Optional[str]
+    _session_data: Any = field(default=_UNDECODED, repr=False, compare=False)
+    _world_state: Any = field(default=_UNDECODED, repr=False, compare=False)
+
+    COLUMNS = "id, plot_progress, session_data, world_state, created_at"
+
+    @property
+    def session_data(self) -> Dict:
+        """Session data, decoded on first access"""
+        if self._session_data is _UNDECODED:
+            self._session_data = _decode_json(self.session_data_json)
+        return self._session_data
+
+    @property
+    def world_state(self) -> Dict:
+        """World state, decoded on first access"""
+        if self._world_state is _UNDECODED:
+            self._world_state = _decode_json(self.world_state_json)
+        return self._world_state
+
+
+@dataclass(slots=True)
+class Location:
+    """Row of the locations table"""
+    id: int
+    name: str
+    description: Optional[str]
+    properties_json: Optional[str]
+    _properties: Any = field(default=_UNDECODED, repr=False, compare=False)
+
+    COLUMNS = "id, name, description, properties"
+
+    @property
+    def properties(self) -> Dict:
+        """Location properties, decoded on first access"""
+        if self._properties is _UNDECODED:
+            self._properties = _decode_json(self.properties_json)
+        return self._properties
+
+
+@dataclass(slots=True)
+class Entity:
+    """Row of the entities table"""
+    id: int
+    name: str
+    entity_type: str
+    description: Optional[str]
+    location_id: Optional[int]
+    properties_json: Optional[str]
+    _properties: Any = field(default=_UNDECODED, repr=False, compare=False)
+
+    COLUMNS = "id, name, entity_type, description, location_id, properties"
+
+    @property
+    def properties(self) -> Dict:
+        """Entity properties, decoded on first access"""
+        if self._properties is _UNDECODED:
+            self._properties = _decode_json(self.properties_json)
+        return self._properties
+
+
+# Row factories for sqlite3 cursors. Queries must select the model's COLUMNS in order.
+def game_state_factory(cursor, row) -> GameState:
+    return GameState(*row)
+
+
+def location_factory(cursor, row) -> Location:
+    return Location(*row)
+
+
+def entity_factory(cursor, row) -> Entity:
+    return Entity(*row)
@@ -0,0 +1,420 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.db.embeddings import embed_texts
+from src.db.lexical_index import matches_where
+from config.configs import VECTOR_STORE_BACKEND, VECTOR_STORE_PATH
+
+class VectorStore(ABC):
+    """Storage for episodic memory documents, their metadata and embeddings"""
+
+    @abstractmethod
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings: Optional[List[List[float]]] = None):
+        """Insert documents, embedding them unless embeddings are given"""
+
+    @abstractmethod
+    def query(self, query_text: str, n_results: int, where: Optional[Dict] = None) -> Dict:
+        """Nearest documents to query_text, shaped like a ChromaDB query result"""
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None, include: Optional[List[str]] = None) -> Dict:
+        """Documents by id and/or filter, shaped like a ChromaDB get result"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Remove documents by id"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored documents"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every document"""
+
+
+class ChromaVectorStore(VectorStore):
+    """The ChromaDB persistent collection"""
+
+    def __init__(self):
+        from src.db.database import setup_chromadb
+        self.collection = setup_chromadb()
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        if isinstance(embeddings, np.ndarray):
+            embeddings = embeddings.tolist()
+        self.collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def query(self, query_text, n_results, where=None):
+        return self.collection.query(query_texts=[query_text], n_results=n_results, where=where)
+
+    def get(self, ids=None, where=None, include=None):
+        return self.collection.get(ids=ids, where=where, include=include or ["documents", "metadatas"])
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def count(self):
+        return self.collection.count()
+
+    def clear(self):
+        existing = self.collection.get()
+        if existing.get("ids"):
+            self.collection.delete(ids=existing["ids"])
+
+
+class NumpyVectorStore(VectorStore):
+    """Contiguous float32 matrix with vectorized cosine top-k, memory-mapped on disk
+
+    Layout under path:
+      vectors.f32   rows of unit-length embeddings (np.memmap, grown by doubling)
+      sidecar.jsonl one line per added row (id, document, metadata) or deleted id
+    Deleted rows are masked out and reclaimed by compaction once they outnumber live ones.
+    A read-only store (a world snapshot) maps the matrix without write access.
+    """
+
+    def __init__(self, path: Path = VECTOR_STORE_PATH, initial_capacity: int = 256, read_only: bool = False):
+        self.path = Path(path)
+        self.read_only = read_only
+        if not read_only:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.path / "vectors.f32"
+        self.sidecar_path = self.path / "sidecar.jsonl"
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._rows = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict]] = []
+        self._row_of: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        """Replay the sidecar and map the matrix"""
+        if not self.read_only:
+            self._recover()
+        if not self.sidecar_path.exists():
+            return
+        with open(self.sidecar_path, "r") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "delete" in entry:
+                    row = self._row_of.pop(entry["delete"], None)
+                    if row is not None:
+                        self._ids[row] = self._documents[row] = self._metadatas[row] = None
+                    continue
+                self.dim = entry.get("dim", self.dim)
+                self._ids.append(entry["id"])
+                self._documents.append(entry["document"])
+                self._metadatas.append(entry["metadata"])
+                self._row_of[entry["id"]] = len(self._ids) - 1
+        self._rows = len(self._ids)
+        self._alive = np.array([memory_id is not None for memory_id in self._ids], dtype=bool)
+        if self.dim and self.vectors_path.exists():
+            capacity = self.vectors_path.stat().st_size // (4 * self.dim)
+            mode = "r" if self.read_only else "r+"
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self._matrix.shape[0] if self._matrix is not None else 0
+        if rows > capacity:
+            new_capacity = max(self.initial_capacity, capacity)
+            while new_capacity < rows:
+                new_capacity *= 2
+            if self._matrix is not None:
+                self._matrix.flush()
+                del self._matrix
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(new_capacity * self.dim * 4)
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+            capacity = new_capacity
+        if len(self._alive) < capacity:
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:len(self._alive)] = self._alive
+            self._alive = alive
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"Vector store at {self.path} is read-only")
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        self._check_writable()
+        if not ids:
+            return
+        vectors = np.asarray(embeddings if embeddings is not None else embed_texts(documents), dtype=np.float32)
+        vectors = self._normalize(vectors)
+        with self._lock:
+            existing = [memory_id for memory_id in ids if memory_id in self._row_of]
+            if existing:
+                self.delete(existing)
+            first_entry = self.dim is None
+            self.dim = self.dim or vectors.shape[1]
+            start = self._rows
+            self._ensure_capacity(start + len(ids))
+            self._matrix[start:start + len(ids)] = vectors
+            self._matrix.flush()
+
+            with open(self.sidecar_path, "a") as f:
+                for offset, (memory_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                    entry = {"id": memory_id, "document": document, "metadata": metadata or {}}
+                    if first_entry and offset == 0:
+                        entry["dim"] = self.dim
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                    self._ids.append(memory_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata or {})
+                    self._row_of[memory_id] = start + offset
+            self._alive[start:start + len(ids)] = True
+            self._rows += len(ids)
+
+    def _candidate_mask(self, where: Optional[Dict]) -> np.ndarray:
+        mask = self._alive[:self._rows].copy()
+        if where:
+            for row in np.flatnonzero(mask):
+                if not matches_where(self._metadatas[row], where):
+                    mask[row] = False
+        return mask
+
+    def query(self, query_text, n_results, where=None):
+        return self.query_by_vector(np.asarray(embed_texts([query_text])[0], dtype=np.float32), n_results, where)
+
+    def query_by_vector(self, vector: np.ndarray, n_results: int, where: Optional[Dict] = None) -> Dict:
+        """Nearest documents to an already embedded query"""
+        query = self._normalize(vector.reshape(1, -1))[0]
+        with self._lock:
+            if self._matrix is None or not self._rows:
+                return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+            mask = self._candidate_mask(where)
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+            scores = self._matrix[candidates] @ query
+            k = min(n_results, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            rows = candidates[top]
+            # Squared L2 distance between unit vectors, as ChromaDB's default space reports
+            distances = (2.0 - 2.0 * scores[top]).tolist()
+            return {
+                "ids": [[self._ids[row] for row in rows]],
+                "documents": [[self._documents[row] for row in rows]],
+                "metadatas": [[self._metadatas[row] for row in rows]],
+                "distances": [distances]
+            }
+
+    def get(self, ids=None, where=None, include=None):
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[memory_id] for memory_id in ids if memory_id in self._row_of]
+                if where:
+                    rows = [row for row in rows if matches_where(self._metadatas[row], where)]
+            else:
+                rows = np.flatnonzero(self._candidate_mask(where)).tolist()
+
+            result: Dict[str, Any] = {"ids": [self._ids[row] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [self._documents[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = [self._matrix[row].tolist() for row in rows]
+            return result
+
+    def delete(self, ids):
+        self._check_writable()
+        with self._lock:
+            deleted = []
+            for memory_id in ids:
+                row = self._row_of.pop(memory_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                self._ids[row] = self._documents[row] = self._metadatas[row] = None
+                deleted.append(memory_id)
+            if not deleted:
+                return
+            with open(self.sidecar_path, "a") as f:
+                for memory_id in deleted:
+                    f.write(json.dumps({"delete": memory_id}) + "\n")
+
+            dead = self._rows - len(self._row_of)
+            if dead > max(64, len(self._row_of)):
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the matrix and sidecar without deleted rows, swapping the new files in atomically"""
+        live = np.flatnonzero(self._alive[:self._rows])
+        if not len(live):
+            self._reset_files()
+            return
+        capacity = max(self.initial_capacity, 1)
+        while capacity < len(live):
+            capacity *= 2
+
+        tmp_vectors, tmp_sidecar = self._compaction_paths()
+        matrix = np.memmap(tmp_vectors, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        matrix[:len(live)] = self._matrix[live]
+        matrix.flush()
+        del matrix
+
+        ids = [self._ids[row] for row in live]
+        documents = [self._documents[row] for row in live]
+        metadatas = [self._metadatas[row] for row in live]
+        with open(tmp_sidecar, "w") as f:
+            for offset, (memory_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                entry = {"id": memory_id, "document": document, "metadata": metadata}
+                if offset == 0:
+                    entry["dim"] = self.dim
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Matrix first: a sidecar .tmp left without a matrix .tmp means the swap was half done (see _recover)
+        del self._matrix
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_sidecar, self.sidecar_path)
+
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids, self._documents, self._metadatas = ids, documents, metadatas
+        self._row_of = {memory_id: row for row, memory_id in enumerate(ids)}
+        self._rows = len(ids)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:self._rows] = True
+
+    def _compaction_paths(self):
+        return (
+            self.vectors_path.with_name(self.vectors_path.name + ".tmp"),
+            self.sidecar_path.with_name(self.sidecar_path.name + ".tmp")
+        )
+
+    def _recover(self):
+        """Finish or roll back a compaction interrupted by a crash"""
+        tmp_vectors, tmp_sidecar = self._compaction_paths()
+        if tmp_vectors.exists():
+            # Interrupted before the swap: the old files are intact
+            for path in (tmp_vectors, tmp_sidecar):
+                if path.exists():
+                    os.remove(path)
+        elif tmp_sidecar.exists():
+            # The matrix was swapped in; its sidecar was complete before the swap started
+            os.replace(tmp_sidecar, self.sidecar_path)
+
+    def _reset_files(self):
+        if self._matrix is not None:
+            del self._matrix
+        self._matrix = None
+        for path in (self.vectors_path, self.sidecar_path):
+            if path.exists():
+                os.remove(path)
+        self.dim = None
+        self._rows = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids, self._documents, self._metadatas, self._row_of = [], [], [], {}
+
+    def count(self):
+        with self._lock:
+            return len(self._row_of)
+
+    def clear(self):
+        self._check_writable()
+        with self._lock:
+            self._reset_files()
+
+
+class LayeredVectorStore(VectorStore):
+    """A read-only base (the world snapshot's lore) under a writable store for session memories"""
+
+    def __init__(self, base: NumpyVectorStore, top: NumpyVectorStore):
+        self.base = base
+        self.top = top
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        self.top.add(ids, documents, metadatas, embeddings)
+
+    def query(self, query_text, n_results, where=None):
+        vector = np.asarray(embed_texts([query_text])[0], dtype=np.float32)
+        layers = [store.query_by_vector(vector, n_results, where) for store in (self.base, self.top)]
+        merged = sorted(
+            (distance, memory_id, document, metadata)
+            for layer in layers
+            for memory_id, document, metadata, distance in zip(
+                layer["ids"][0], layer["documents"][0], layer["metadatas"][0], layer["distances"][0]
+            )
+        )[:n_results]
+        return {
+            "ids": [[row[1] for row in merged]],
+            "documents": [[row[2] for row in merged]],
+            "metadatas": [[row[3] for row in merged]],
+            "distances": [[row[0] for row in merged]]
+        }
+
+    def get(self, ids=None, where=None, include=None):
+        base = self.base.get(ids=ids, where=where, include=include)
+        top = self.top.get(ids=ids, where=where, include=include)
+        return {key: base[key] + top[key] for key in base}
+
+    def delete(self, ids):
+        # Snapshot lore is never deleted; only session memories are
+        self.top.delete(ids)
+
+    def count(self):
+        return self.base.count() + self.top.count()
+
+    def clear(self):
+        self.top.clear()
+
+
+_store: Optional[VectorStore] = None
+_store_base: Optional[Path] = None  # snapshot lore layered under _store, if any
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """The process-wide episodic memory store for the configured backend"""
+    if _store is None:
+        return open_vector_store()
+    return _store
+
+
+def open_vector_store(snapshot_vectors: Optional[Path] = None) -> VectorStore:
+    """The process-wide store, reopened if needed so it is layered over exactly the given snapshot lore
+
+    A World passes its snapshot's vectors only when it runs on that snapshot's lore; a World built
+    from another lore file passes None and gets a store without the default lore in it.
+    """
+    global _store, _store_base
+    if VECTOR_STORE_BACKEND == "chroma":
+        # Chroma has no layers; a World copies snapshot lore into it instead
+        snapshot_vectors = None
+    with _store_lock:
+        if _store is None or snapshot_vectors != _store_base:
+            _store = _create_store(snapshot_vectors)
+            _store_base = snapshot_vectors
+        return _store
+
+
+def _create_store(snapshot_vectors: Optional[Path]) -> VectorStore:
+    if VECTOR_STORE_BACKEND == "chroma":
+        return ChromaVectorStore()
+    # Lore from an up-to-date world snapshot is mapped in read-only rather than re-ingested
+    if snapshot_vectors is not None:
+        return LayeredVectorStore(NumpyVectorStore(snapshot_vectors, read_only=True), NumpyVectorStore(VECTOR_STORE_PATH))
+    return NumpyVectorStore(VECTOR_STORE_PATH)
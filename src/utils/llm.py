@@ -1,16 +1,50 @@
+import json
+import re
+import threading
+import time
 import openai
 import anthropic
 import google.generativeai as genai
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
+from src.utils.log import get_logger
+from src.utils.stub_llm import StubLLM
+from src.utils.usage import UsageTracker
 from config.configs import (
-    LLM_PROVIDER, OPENAI_API_KEY, ANTHROPIC_API_KEY, GEMINI_API_KEY, LLM_MODELS
+    LLM_PROVIDER, OPENAI_API_KEY, ANTHROPIC_API_KEY, GEMINI_API_KEY, LLM_MODELS,
+    STUB_LATENCY, STUB_TOKENS_PER_SECOND, STUB_RESPONSES_PATH,
+    LOCAL_LLM_BASE_URL, LOCAL_LLM_API_KEY, LLM_TASK_ROUTES
 )
 
+logger = get_logger("llm")
+
+# (input_tokens, output_tokens) reported by the provider, or None if it did not say
+Usage = Optional[Tuple[int, int]]
+
+def resolve_task_route(task: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Map a task name to (provider, model) from LLM_TASK_ROUTES; (None, None) if unrouted"""
+    route = LLM_TASK_ROUTES.get(task) if task else None
+    if not route:
+        return None, None
+    provider, _, model = route.partition(":")
+    return provider.strip().lower(), (model.strip() or None)
+
 class LLMClient:
-    def __init__(self, provider: Optional[str] = None):
-        self.provider = provider or LLM_PROVIDER
+    def __init__(self, provider: Optional[str] = None, task: Optional[str] = None, model: Optional[str] = None, usage: Optional[UsageTracker] = None):
+        route_provider, route_model = resolve_task_route(task)
+        self.task = task
+        self.usage = usage
+        self.provider = provider or route_provider or LLM_PROVIDER
         self.model = LLM_MODELS.get(self.provider)
+        requested_provider = self.provider
         self._setup_client()
+        
+        # An explicit model only applies if setup did not fall back to another provider
+        requested_model = model or (route_model if not provider else None)
+        if requested_model and self.provider == requested_provider:
+            self.model = requested_model
+        
+        # Output size of the calling thread's last generate(); speculation shares this client
+        self._local = threading.local()
     
     def _setup_client(self):
         """Initialize the appropriate LLM client"""
@@ -21,16 +55,16 @@ class LLMClient:
                     self.provider = "anthropic"
                     self.model = LLM_MODELS.get("anthropic")
                     self.client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-                    print(f"OpenAI key not found, switching to Anthropic")
+                    logger.warning("OpenAI key not found, switching to Anthropic")
                     return
                 elif GEMINI_API_KEY:
                     self.provider = "gemini"
                     self.model = LLM_MODELS.get("gemini")
                     genai.configure(api_key=GEMINI_API_KEY)
-                    print(f"OpenAI key not found, switching to Gemini")
+                    logger.warning("OpenAI key not found, switching to Gemini")
                     return
                 else:
-                    raise ValueError("No API keys found for any provider")
+                    raise ValueError("No API keys found for any provider (set LLM_PROVIDER=stub to run offline)")
             self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
         elif self.provider == "anthropic":
             if not ANTHROPIC_API_KEY:
@@ -39,16 +73,16 @@ class LLMClient:
                     self.provider = "openai"
                     self.model = LLM_MODELS.get("openai")
                     self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                    print(f"Anthropic key not found, switching to OpenAI")
+                    logger.warning("Anthropic key not found, switching to OpenAI")
                     return
                 elif GEMINI_API_KEY:
                     self.provider = "gemini"
                     self.model = LLM_MODELS.get("gemini")
                     genai.configure(api_key=GEMINI_API_KEY)
-                    print(f"Anthropic key not found, switching to Gemini")
+                    logger.warning("Anthropic key not found, switching to Gemini")
                     return
                 else:
-                    raise ValueError("No API keys found for any provider")
+                    raise ValueError("No API keys found for any provider (set LLM_PROVIDER=stub to run offline)")
             self.client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
         elif self.provider == "gemini":
             if not GEMINI_API_KEY:
@@ -57,17 +91,22 @@ class LLMClient:
                     self.provider = "openai"
                     self.model = LLM_MODELS.get("openai")
                     self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                    print(f"Gemini key not found, switching to OpenAI")
+                    logger.warning("Gemini key not found, switching to OpenAI")
                     return
                 elif ANTHROPIC_API_KEY:
                     self.provider = "anthropic"
                     self.model = LLM_MODELS.get("anthropic")
                     self.client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-                    print(f"Gemini key not found, switching to Anthropic")
+                    logger.warning("Gemini key not found, switching to Anthropic")
                     return
                 else:
-                    raise ValueError("No API keys found for any provider")
+                    raise ValueError("No API keys found for any provider (set LLM_PROVIDER=stub to run offline)")
             genai.configure(api_key=GEMINI_API_KEY)
+        elif self.provider == "local":
+            # OpenAI-compatible server on localhost; no key or network round-trip to a remote API
+            self.client = openai.OpenAI(base_url=LOCAL_LLM_BASE_URL, api_key=LOCAL_LLM_API_KEY)
+        elif self.provider == "stub":
+            self.client = StubLLM(STUB_LATENCY, STUB_TOKENS_PER_SECOND, STUB_RESPONSES_PATH)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
     
@@ -77,17 +116,94 @@ class LLMClient:
         messages: Optional[List[Dict[str, str]]] = None,
         prompt: str = "",
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None,
+        stop: Optional[List[str]] = None
     ) -> str:
-        """Generate text using the configured LLM provider"""
-        if self.provider == "openai":
-            return self._generate_openai(system_prompt, messages, prompt, temperature, max_tokens)
+        """Generate text using the configured LLM provider; a reply cut at max_tokens ends at its last full sentence"""
+        start = time.perf_counter()
+        usage = None
+        if self.provider in ("openai", "local"):
+            text, usage = self._generate_openai(system_prompt, messages, prompt, temperature, max_tokens, stop)
         elif self.provider == "anthropic":
-            return self._generate_anthropic(system_prompt, messages, prompt, temperature, max_tokens)
+            text, usage = self._generate_anthropic(system_prompt, messages, prompt, temperature, max_tokens, stop)
         elif self.provider == "gemini":
-            return self._generate_gemini(system_prompt, messages, prompt, temperature, max_tokens)
+            text, usage = self._generate_gemini(system_prompt, messages, prompt, temperature, max_tokens, stop)
+        elif self.provider == "stub":
+            text = self.client.generate(system_prompt, messages, prompt, temperature, max_tokens, stop)
+        
+        output_tokens = usage[1] if usage else estimate_tokens(text or "")
+        truncated = bool(max_tokens) and output_tokens >= max_tokens
+        self._record_usage(call_site, usage, start, text, system_prompt, messages, prompt, truncated)
+        if truncated:
+            text = trim_to_sentence(text)
+        self._local.last_call = {
+            "output_tokens": output_tokens,
+            "truncated": truncated,
+            "latency_ms": (time.perf_counter() - start) * 1000
+        }
+        return text
     
-    def _generate_openai(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int]) -> str:
+    def last_call(self) -> Dict[str, Any]:
+        """Output tokens, truncation and latency of this thread's last generate()"""
+        return getattr(self._local, "last_call", {})
+    
+    def generate_json(
+        self,
+        schema: Dict[str, Any],
+        schema_name: str,
+        system_prompt: Optional[str] = None,
+        prompt: str = "",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None
+    ) -> str:
+        """Generate a JSON document constrained to schema using the provider's structured-output mode"""
+        start = time.perf_counter()
+        usage = None
+        if self.provider in ("openai", "local"):
+            text, usage = self._generate_json_openai(schema, schema_name, system_prompt, prompt, temperature, max_tokens)
+        elif self.provider == "anthropic":
+            text, usage = self._generate_json_anthropic(schema, schema_name, system_prompt, prompt, temperature, max_tokens)
+        elif self.provider == "gemini":
+            text, usage = self._generate_json_gemini(schema, system_prompt, prompt, temperature, max_tokens)
+        elif self.provider == "stub":
+            text = self.client.generate_json(schema, schema_name, system_prompt, prompt, temperature, max_tokens)
+        
+        output_tokens = usage[1] if usage else estimate_tokens(text or "")
+        self._record_usage(call_site, usage, start, text, system_prompt, None, prompt, bool(max_tokens) and output_tokens >= max_tokens)
+        return text
+    
+    def _record_usage(
+        self,
+        call_site: Optional[str],
+        usage: Usage,
+        start: float,
+        text: str,
+        system_prompt: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        prompt: str,
+        truncated: bool
+    ):
+        """Record a call's token usage, estimating it when the provider did not report any"""
+        if self.usage is None:
+            return
+        estimated = usage is None
+        if estimated:
+            sent = [system_prompt or "", prompt] + [msg.get("content", "") for msg in messages or []]
+            usage = (estimate_tokens("".join(sent)), estimate_tokens(text or ""))
+        self.usage.record(
+            call_site or self.task or "default",
+            self.provider,
+            self.model,
+            usage[0],
+            usage[1],
+            latency_ms=(time.perf_counter() - start) * 1000,
+            estimated=estimated,
+            truncated=truncated
+        )
+    
+    def _generate_openai(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int], stop: Optional[List[str]]) -> Tuple[str, Usage]:
         all_messages = []
         
         if system_prompt:
@@ -103,11 +219,12 @@ class LLMClient:
             model=self.model,
             messages=all_messages,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stop=stop
         )
-        return response.choices[0].message.content
+        return response.choices[0].message.content, _openai_usage(response)
     
-    def _generate_anthropic(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int]) -> str:
+    def _generate_anthropic(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int], stop: Optional[List[str]]) -> Tuple[str, Usage]:
         all_messages = []
         
         if messages:
@@ -116,17 +233,24 @@ class LLMClient:
         if prompt:
             all_messages.append({"role": "user", "content": prompt})
         
+        extra = {"stop_sequences": stop} if stop else {}
         response = self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens or 1000,
             temperature=temperature,
             system=system_prompt,
-            messages=all_messages
+            messages=all_messages,
+            **extra
         )
-        return response.content[0].text
+        return response.content[0].text, _anthropic_usage(response)
     
-    def _generate_gemini(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int]) -> str:
+    def _generate_gemini(self, system_prompt: Optional[str], messages: Optional[List[Dict[str, str]]], prompt: str, temperature: float, max_tokens: Optional[int], stop: Optional[List[str]]) -> Tuple[str, Usage]:
         model = genai.GenerativeModel(self.model)
+        generation_config = genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            stop_sequences=stop
+        )
         
         if messages:
             chat = model.start_chat(history=[])
@@ -138,24 +262,116 @@ class LLMClient:
                     pass
             
             if prompt:
-                response = chat.send_message(prompt)
+                response = chat.send_message(prompt, generation_config=generation_config)
             else:
-                response = chat.send_message("Continue")
+                response = chat.send_message("Continue", generation_config=generation_config)
         else:
             # No history, use simple generation
             full_prompt = prompt
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
             
-            response = model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens
-                )
+            response = model.generate_content(full_prompt, generation_config=generation_config)
+        
+        return response.text, _gemini_usage(response)
+
+    def _generate_json_openai(self, schema: Dict[str, Any], schema_name: str, system_prompt: Optional[str], prompt: str, temperature: float, max_tokens: Optional[int]) -> Tuple[str, Usage]:
+        all_messages = []
+        
+        if system_prompt:
+            all_messages.append({"role": "system", "content": system_prompt})
+        all_messages.append({"role": "user", "content": prompt})
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=all_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": schema_name, "schema": schema, "strict": True}
+                }
             )
+        except openai.BadRequestError:
+            # Older models only support plain JSON mode
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=all_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        return response.choices[0].message.content, _openai_usage(response)
+    
+    def _generate_json_anthropic(self, schema: Dict[str, Any], schema_name: str, system_prompt: Optional[str], prompt: str, temperature: float, max_tokens: Optional[int]) -> Tuple[str, Usage]:
+        # Forcing a single tool call makes the tool input the structured output
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens or 1000,
+            temperature=temperature,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}],
+            tools=[{"name": schema_name, "description": f"Record the {schema_name}", "input_schema": schema}],
+            tool_choice={"type": "tool", "name": schema_name}
+        )
+        for block in response.content:
+            if block.type == "tool_use":
+                return json.dumps(block.input), _anthropic_usage(response)
+        return (response.content[0].text if response.content else ""), _anthropic_usage(response)
+    
+    def _generate_json_gemini(self, schema: Dict[str, Any], system_prompt: Optional[str], prompt: str, temperature: float, max_tokens: Optional[int]) -> Tuple[str, Usage]:
+        model = genai.GenerativeModel(self.model)
+        
+        full_prompt = prompt
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\n{prompt}"
         
-        return response.text
+        response = model.generate_content(
+            full_prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                response_mime_type="application/json",
+                response_schema=_gemini_schema(schema)
+            )
+        )
+        return response.text, _gemini_usage(response)
+
+def _gemini_schema(schema: Any) -> Any:
+    """Drop JSON-schema keywords Gemini's response_schema does not accept"""
+    if isinstance(schema, dict):
+        return {key: _gemini_schema(value) for key, value in schema.items() if key != "additionalProperties"}
+    if isinstance(schema, list):
+        return [_gemini_schema(item) for item in schema]
+    return schema
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+# End of a sentence or option line: terminal punctuation, closing quotes, then whitespace or the end
+_SENTENCE_END = re.compile(r"[.!?\u2026][\"'\u201d\u2019)\]]*(?=\s|$)")
+
+def trim_to_sentence(text: str) -> str:
+    """Cut a reply that ran into its token limit back to its last complete sentence"""
+    text = (text or "").rstrip()
+    ends = [match.end() for match in _SENTENCE_END.finditer(text)]
+    if not ends:
+        return text
+    return text[:ends[-1]]
+
+def _openai_usage(response) -> Usage:
+    usage = getattr(response, "usage", None)
+    return (usage.prompt_tokens, usage.completion_tokens) if usage else None
+
+def _anthropic_usage(response) -> Usage:
+    usage = getattr(response, "usage", None)
+    return (usage.input_tokens, usage.output_tokens) if usage else None
+
+def _gemini_usage(response) -> Usage:
+    usage = getattr(response, "usage_metadata", None)
+    return (usage.prompt_token_count, usage.candidates_token_count) if usage else None
 
 # Convenience function
 def llm_generate(
@@ -164,8 +380,10 @@ def llm_generate(
     prompt: str = "",
     provider: Optional[str] = None,
     temperature: float = 0.7,
-    max_tokens: Optional[int] = None
+    max_tokens: Optional[int] = None,
+    task: Optional[str] = None,
+    stop: Optional[List[str]] = None
 ) -> str:
     """Convenience function for quick LLM calls"""
-    client = LLMClient(provider)
-    return client.generate(system_prompt, messages, prompt, temperature, max_tokens) 
\ No newline at end of file
+    client = LLMClient(provider, task=task)
+    return client.generate(system_prompt, messages, prompt, temperature, max_tokens, stop=stop) 
\ No newline at end of file
@@ -0,0 +1,151 @@
+import copy
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.configs import LOG_PATH, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_SECONDS
+
+ROOT_LOGGER = "bhootai"
+
+# Session and turn ids stamped on every record
+_context: Dict[str, Any] = {"session_id": None, "turn": None}
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+def set_log_context(session_id: Optional[str] = None, turn: Optional[int] = None):
+    """Set the session and turn ids attached to subsequent log records"""
+    if session_id is not None:
+        _context["session_id"] = session_id
+    if turn is not None:
+        _context["turn"] = turn
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp records with the session and turn ids at the time they are logged"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = _context["session_id"]
+        record.turn = _context["turn"]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "session_id": getattr(record, "session_id", None),
+            "turn": getattr(record, "turn", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _JsonQueueHandler(QueueHandler):
+    """Enqueue records without folding the traceback into the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_started_at(path: Path) -> float:
+    """When a log file was started: its first record's timestamp, else its creation time, else its mtime"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return time.time()
+    if stat.st_size == 0:
+        return time.time()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return float(json.loads(f.readline())["ts"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return getattr(stat, "st_birthtime", None) or stat.st_mtime
+
+
+class RotatingJsonFileHandler(RotatingFileHandler):
+    """Rotate when the file exceeds max_bytes or is older than rotate_seconds"""
+
+    def __init__(self, path: Path, max_bytes: int, backup_count: int, rotate_seconds: float):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_seconds = rotate_seconds
+        # Appending after a restart keeps the age of the existing file, so restarts do not reset the clock
+        self.opened_at = _file_started_at(path)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rotate_seconds > 0 and time.time() - self.opened_at >= self.rotate_seconds:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+
+def setup_logging(path: Path = LOG_PATH, level: str = LOG_LEVEL) -> logging.Logger:
+    """Route all bhootai loggers through a queue to a background file writer"""
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return logger
+
+    file_handler = RotatingJsonFileHandler(path, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_SECONDS)
+    file_handler.setFormatter(JsonFormatter())
+
+    # The turn loop only enqueues; formatting and disk I/O happen on the listener thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = _JsonQueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    logger.setLevel(level.upper())
+    logger.addHandler(queue_handler)
+    # Keep records away from the root logger so nothing is printed into the game UI
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the bhootai namespace, e.g. get_logger("db.crud")"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
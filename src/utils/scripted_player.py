@@ -0,0 +1,81 @@
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from src.db.crud import drain_memory_query_latencies
+
+# A mix of trivial actions, option requests and picks, and plot-moving actions
+DEFAULT_SCRIPT = [
+    "look around",
+    "1",
+    "open the heavy door",
+    "listen",
+    "what are my options?",
+    "climb the stairs",
+    "check my pockets",
+    "2",
+    "read the journal",
+    "look around",
+    "follow the whisper into the hall",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scripted_session(dm, turns: int, script: Optional[List[str]] = None) -> Dict:
+    """Drive a DungeonMaster headlessly for a number of turns and report latency and memory"""
+    script = script or DEFAULT_SCRIPT
+    drain_memory_query_latencies()
+
+    tracemalloc.start()
+    memory_start, _ = tracemalloc.get_traced_memory()
+
+    turn_latencies = []
+    retrieval_time = 0.0
+    memory_samples = []
+
+    # The first turn is always "begin", as in main.main
+    inputs = ["begin"] + [script[i % len(script)] for i in range(turns - 1)]
+    for player_input in inputs:
+        start = time.perf_counter()
+        dm.respond_to_player(player_input)
+        turn_latencies.append(time.perf_counter() - start)
+        retrieval_time += sum(drain_memory_query_latencies())
+        memory_samples.append(tracemalloc.get_traced_memory()[0])
+
+    _, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies_ms = [latency * 1000 for latency in turn_latencies]
+    return {
+        "turns": len(inputs),
+        "turn_latency_ms": {
+            "p50": percentile(latencies_ms, 50),
+            "p90": percentile(latencies_ms, 90),
+            "p99": percentile(latencies_ms, 99),
+            "mean": statistics.fmean(latencies_ms) if latencies_ms else 0.0,
+        },
+        "retrieval_ms_total": retrieval_time * 1000,
+        "retrieval_ms_per_turn": retrieval_time * 1000 / len(inputs) if inputs else 0.0,
+        "memory_kib": {
+            "start": memory_start / 1024,
+            "end": memory_samples[-1] / 1024 if memory_samples else 0.0,
+            "peak": memory_peak / 1024,
+            "growth_per_turn": (memory_samples[-1] - memory_samples[0]) / 1024 / max(len(memory_samples) - 1, 1)
+            if memory_samples else 0.0,
+        },
+        "response_cache": dm.get_cache_metrics(),
+        "retrieval": dm.get_retrieval_metrics(),
+        "world_extraction": dm.get_world_extraction_metrics(),
+        "output_budget": dm.get_output_budget_metrics(),
+        "plot_status": dm.get_current_plot_status(),
+    }
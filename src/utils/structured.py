@@ -0,0 +1,152 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Compact schema for plot generation: a single array of short strings
+PLOT_POINTS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "plot_points": {
+            "type": "array",
+            "items": {"type": "string"}
+        }
+    },
+    "required": ["plot_points"],
+    "additionalProperties": False
+}
+
+# Leading list markers: "1.", "2)", "-", "*", "•"
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+MAX_PLOT_POINT_LENGTH = 300
+
+
+def _load_json_object(text: str) -> Optional[Dict]:
+    """Parse text as a JSON object, tolerating prose or code fences around it"""
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        start = text.find("{") if text else -1
+        end = text.rfind("}") if text else -1
+        if start < 0 or end <= start:
+            return None
+        try:
+            value = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_plot_points(text: str, max_points: int) -> Optional[List[str]]:
+    """Validate a structured plot-point reply; None if it does not match the schema"""
+    data = _load_json_object(text)
+    if data is None:
+        return None
+    points = data.get("plot_points")
+    if not isinstance(points, list):
+        return None
+
+    cleaned = []
+    for point in points:
+        if not isinstance(point, str):
+            return None
+        point = _LIST_MARKER.sub("", point).strip()
+        if point:
+            cleaned.append(point[:MAX_PLOT_POINT_LENGTH])
+        if len(cleaned) == max_points:
+            break
+    return cleaned or None
+
+
+def parse_plot_lines(text: str, max_points: int) -> List[str]:
+    """Last-resort parser for free-text lists: strips numbering, skips preambles and blanks"""
+    points = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.endswith(":"):
+            continue
+        point = _LIST_MARKER.sub("", stripped).strip()
+        if point:
+            points.append(point[:MAX_PLOT_POINT_LENGTH])
+            if len(points) == max_points:
+                break
+    return points
+
+
+# Kinds of entity the world extractor records; the actor types get an NPC reactor agent
+ACTOR_ENTITY_TYPES = ("npc", "creature")
+ENTITY_TYPES = ACTOR_ENTITY_TYPES + ("item", "feature")
+
+_NAMED_DESCRIPTION = {
+    "name": {"type": "string"},
+    "description": {"type": "string"}
+}
+
+# Locations, entities and the player's position mentioned in one DM response; "" means unknown
+WORLD_FACTS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "locations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": dict(_NAMED_DESCRIPTION),
+                "required": ["name", "description"],
+                "additionalProperties": False
+            }
+        },
+        "entities": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": dict(
+                    _NAMED_DESCRIPTION,
+                    type={"type": "string", "enum": list(ENTITY_TYPES)},
+                    location={"type": "string"}
+                ),
+                "required": ["name", "type", "description", "location"],
+                "additionalProperties": False
+            }
+        },
+        "player_location": {"type": "string"}
+    },
+    "required": ["locations", "entities", "player_location"],
+    "additionalProperties": False
+}
+
+MAX_NAME_LENGTH = 80
+MAX_DESCRIPTION_LENGTH = 300
+
+
+def _clean_field(value: Any, max_length: int) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return value[:max_length] or None
+
+
+def parse_world_facts(text: str, max_items: int) -> Optional[Dict[str, Any]]:
+    """Validate a structured world-facts reply; None if it does not match the schema"""
+    data = _load_json_object(text)
+    if data is None:
+        return None
+    locations, entities = data.get("locations"), data.get("entities")
+    if not isinstance(locations, list) or not isinstance(entities, list):
+        return None
+
+    facts: Dict[str, Any] = {"locations": [], "entities": [], "player_location": None}
+    for item in locations[:max_items]:
+        name = _clean_field(item.get("name"), MAX_NAME_LENGTH) if isinstance(item, dict) else None
+        if name:
+            facts["locations"].append({"name": name, "description": _clean_field(item.get("description"), MAX_DESCRIPTION_LENGTH)})
+    for item in entities[:max_items]:
+        name = _clean_field(item.get("name"), MAX_NAME_LENGTH) if isinstance(item, dict) else None
+        if name:
+            facts["entities"].append({
+                "name": name,
+                "type": item.get("type") if item.get("type") in ENTITY_TYPES else "feature",
+                "description": _clean_field(item.get("description"), MAX_DESCRIPTION_LENGTH),
+                "location": _clean_field(item.get("location"), MAX_NAME_LENGTH)
+            })
+    facts["player_location"] = _clean_field(data.get("player_location"), MAX_NAME_LENGTH)
+    return facts
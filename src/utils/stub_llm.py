@@ -0,0 +1,101 @@
+import json
+import re
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+# Canned outputs per kind of call; "{player_input}" is filled in for narration
+DEFAULT_RESPONSES: Dict[str, Any] = {
+    "opening_scene": [
+        "Cold stone presses against your cheek as you wake beneath the iron gates of Castle Dracula. "
+        "Torchlight gutters in the wind. Say 'start' to begin your nightmare."
+    ],
+    "narration": [
+        "You {player_input}. The shadows lengthen and something unseen shifts in the dark.",
+        "As you {player_input}, a chill crawls up your spine and the candles flicker.\n\n"
+        "> Follow the whisper into the hall?\n> Climb the north tower stairs?\n> Hide behind the tapestry?",
+        "You {player_input}, but the castle answers only with the slow drip of water.",
+        "You cannot do that here.\n\n> Search the library?\n> Return to the courtyard?",
+    ],
+    "plot_points": [
+        "A hidden door reveals a passage beneath the chapel.",
+        "The count's servant begins to follow the player.",
+        "A journal hints at a way to break the curse.",
+        "Wolves gather at the castle gates as night deepens.",
+    ],
+    "summary": [
+        "The player wandered the castle, uncovering fragments of its curse.",
+    ],
+    # Structured outputs that are a single object rather than a list of items
+    "world_facts": {
+        "locations": [{"name": "Castle Gates", "description": "Iron gates beneath the walls of Castle Dracula."}],
+        "entities": [{"name": "The Coachman", "type": "npc", "description": "A silent driver in a black cloak.", "location": "Castle Gates"}],
+        "player_location": "Castle Gates",
+    },
+}
+
+_PLAYER_SAYS = re.compile(r"Player says:\s*(.+)", re.DOTALL)
+
+
+class StubLLM:
+    """Deterministic offline LLM with configurable latency and token rate"""
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0, responses_path: Optional[str] = None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.responses = dict(DEFAULT_RESPONSES)
+        if responses_path:
+            with open(responses_path, "r") as f:
+                self.responses.update(json.load(f))
+
+    def _pick(self, kind: str, seed: str) -> str:
+        """Pick a canned response deterministically from the prompt text"""
+        options = self.responses[kind]
+        return options[zlib.crc32(seed.encode("utf-8")) % len(options)]
+
+    def _simulate(self, output: str) -> str:
+        """Sleep for the configured first-token latency plus generation time"""
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += max(1, len(output) // 4) / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+        return output
+
+    def _kind(self, system_prompt: Optional[str], prompt: str) -> str:
+        text = f"{system_prompt or ''}\n{prompt}".lower()
+        if "opening scene" in text:
+            return "opening_scene"
+        if "memories" in text and "merge" in text:
+            return "summary"
+        return "narration"
+
+    def generate(
+        self,
+        system_prompt: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        stop: Optional[List[str]] = None
+    ) -> str:
+        kind = self._kind(system_prompt, prompt)
+        output = self._pick(kind, prompt)
+        if kind == "narration":
+            match = _PLAYER_SAYS.search(prompt)
+            player_input = match.group(1).strip() if match else "hesitate"
+            output = output.format(player_input=player_input.rstrip(".!?"))
+        # Stop where a provider would: at a stop sequence or after max_tokens
+        for sequence in stop or []:
+            output = output.split(sequence, 1)[0]
+        if max_tokens:
+            output = output[:max_tokens * 4]
+        return self._simulate(output)
+
+    def generate_json(self, schema: Dict[str, Any], schema_name: str, system_prompt: Optional[str], prompt: str, temperature: float, max_tokens: Optional[int]) -> str:
+        canned = self.responses.get(schema_name, {})
+        if isinstance(canned, list):
+            # Rotate through canned items so repeated calls stay varied but reproducible
+            start = zlib.crc32(prompt.encode("utf-8")) % len(canned)
+            canned = {schema_name: [canned[(start + i) % len(canned)] for i in range(min(3, len(canned)))]}
+        return self._simulate(json.dumps(canned))
@@ -1,7 +1,7 @@
 import time
 import os
 import sys
-from typing import Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 class TerminalUI:
@@ -30,30 +30,15 @@ class TerminalUI:
         """Print a separator line"""
         print(char * self.terminal_width)
     
+    def _box_content_width(self) -> int:
+        """Content width of a box: 80% of terminal width, max 80 chars, minus borders and padding"""
+        return min(int(self.terminal_width * 0.8), 80) - 4
+    
     def print_box(self, text: str, title: Optional[str] = None):
         """Print text in a box with optional title"""
-        # Calculate maximum box width (80% of terminal width, max 80 chars)
-        max_box_width = min(int(self.terminal_width * 0.8), 80)
-        content_width = max_box_width - 4  # Account for borders and padding
-        
         # Split text into lines that fit within content width
-        lines = []
-        for paragraph in text.split('\n'):
-            if len(paragraph) <= content_width:
-                lines.append(paragraph)
-            else:
-                # Word wrap the paragraph
-                words = paragraph.split()
-                current_line = ""
-                for word in words:
-                    if len(current_line + " " + word) <= content_width:
-                        current_line += (" " + word) if current_line else word
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                if current_line:
-                    lines.append(current_line)
+        wrapper = IncrementalWrapper(self._box_content_width())
+        lines = wrapper.feed(text) + wrapper.finish()
         
         # Calculate actual box width based on content
         max_line_width = max(len(line) for line in lines) if lines else 0
@@ -76,38 +61,66 @@ class TerminalUI:
         # Bottom border
         print("└" + "─" * (box_width - 2) + "┘")
     
-    def show_loading_screen(self):
-        """Show animated loading screen"""
-        self.clear_screen()
-        
-        loading_frames = [
-            "🌙 Initializing the cursed realm...",
-            "🌙 Loading ancient memories...",
-            "🌙 Summoning the Dungeon Master...",
-            "🌙 Preparing your nightmare...",
-            "🌙 The realm is ready..."
-        ]
-        
-        for i, frame in enumerate(loading_frames):
-            self.clear_screen()
-            print("\n" * 3)
-            self.print_centered("🌙 BHOOT AI - HORROR TEXT RPG 🌙")
-            print()
-            self.print_centered("Welcome to the cursed realm where nightmares take form...")
-            print()
-            self.print_centered(frame)
-            print()
+    def stream_box(self, chunks: Iterable[str], title: Optional[str] = None, fps: float = 30) -> str:
+        """Draw text in a fixed-width box as chunks arrive; returns the full text"""
+        renderer = StreamingBoxRenderer(max(self._box_content_width() + 4, 60), title, fps)
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            renderer.feed(chunk)
+        renderer.finish()
+        return "".join(parts)
+    
+    def show_loading_screen(
+        self,
+        progress_fn: Optional[Callable[[], Tuple[float, str]]] = None,
+        until: Optional[Callable[[], bool]] = None,
+        fps: float = 10
+    ):
+        """Show loading screen with real progress until the given condition holds"""
+        last_frame = None
+        while True:
+            progress, label = progress_fn() if progress_fn else (1.0, "The realm is ready...")
             
-            # Progress bar
-            progress = (i + 1) / len(loading_frames)
-            bar_width = 40
-            filled = int(bar_width * progress)
-            bar = "█" * filled + "░" * (bar_width - filled)
-            self.print_centered(f"[{bar}] {int(progress * 100)}%")
+            # Only redraw when something changed
+            frame = (int(progress * 100), label)
+            if frame != last_frame:
+                self._draw_loading_frame(progress, label)
+                last_frame = frame
             
-            time.sleep(0.8)
+            if until is None or until():
+                break
+            time.sleep(1 / fps)
+    
+    def _draw_loading_frame(self, progress: float, label: str):
+        """Draw a single frame of the loading screen"""
+        self.clear_screen()
+        print("\n" * 3)
+        self.print_centered("🌙 BHOOT AI - HORROR TEXT RPG 🌙")
+        print()
+        self.print_centered("Welcome to the cursed realm where nightmares take form...")
+        print()
+        self.print_centered(f"🌙 {label}")
+        print()
         
-        time.sleep(1)
+        # Progress bar
+        bar_width = 40
+        filled = int(bar_width * progress)
+        bar = "█" * filled + "░" * (bar_width - filled)
+        self.print_centered(f"[{bar}] {int(progress * 100)}%")
+    
+    def wait_with_progress(self, progress_fn: Callable[[], Tuple[float, str]], until: Callable[[], bool], fps: float = 10):
+        """Show a single-line progress indicator until the given condition holds"""
+        last_line = ""
+        while not until():
+            progress, label = progress_fn()
+            line = f"🌙 {label} {int(progress * 100)}%"
+            if line != last_line:
+                print("\r" + line.ljust(len(last_line)), end="", flush=True)
+                last_line = line
+            time.sleep(1 / fps)
+        if last_line:
+            print()
     
     def show_title_screen(self):
         """Show the main title screen"""
@@ -186,10 +199,11 @@ class TerminalUI:
         print(f"\n💀 {player_name}: {message}")
         print("-" * 40)
     
-    def show_dm_response(self, response: str):
-        """Show DM's response"""
+    def show_dm_response(self, response: str, delay: float = 0.01):
+        """Show DM's response, typed into its box at 1/delay characters per second on a terminal"""
         print("\n🌙 DUNGEON MASTER:")
-        self.print_box(response)
+        chunks = self._paced_chunks(response, delay) if sys.stdout.isatty() else [response]
+        self.stream_box(chunks)
         print()
     
     def show_progress(self, interaction_count: int, plot_status: dict):
@@ -234,9 +248,165 @@ The nightmare fades... until next time.
         print("The Dungeon Master stutters, trying to recover...")
         input("Press Enter to continue...")
     
-    def animate_text(self, text: str, delay: float = 0.03):
-        """Animate text appearing character by character"""
-        for char in text:
-            print(char, end='', flush=True)
-            time.sleep(delay)
-        print() 
\ No newline at end of file
+    def animate_text(self, text: str, delay: float = 0.03, fps: float = 30):
+        """Animate text appearing at 1/delay characters per second, redrawn at most fps times a second"""
+        if not sys.stdout.isatty():
+            print(text)
+            return
+        
+        for chunk in self._paced_chunks(text, delay, fps):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        print()
+    
+    def _paced_chunks(self, text: str, delay: float, fps: float = 30) -> Iterator[str]:
+        """Slices of text due at 1/delay characters per second, one per frame"""
+        if delay <= 0:
+            yield text
+            return
+        
+        start = time.perf_counter()
+        shown = 0
+        while shown < len(text):
+            time.sleep(1 / fps)
+            target = min(len(text), int((time.perf_counter() - start) / delay))
+            if target > shown:
+                yield text[shown:target]
+                shown = target
+
+
+class IncrementalWrapper:
+    """Word-wraps text fed in arbitrary chunks, returning lines as soon as they are complete
+    
+    Spacing between words is kept as written; only the spaces where a line wraps are dropped.
+    """
+    
+    def __init__(self, width: int):
+        self.width = max(width, 1)
+        self._parts: List[str] = []  # words and gaps of the line being built
+        self._length = 0
+        self._gap = ""  # whitespace since the last word
+        self._pending = ""  # trailing fragment that may be the start of a longer word
+        self._wrapped = False  # the line being built continues a wrapped paragraph
+    
+    @property
+    def current_line(self) -> str:
+        """The incomplete line being built, including any partial word"""
+        line = "".join(self._parts)
+        if self._pending:
+            line += self._gap + self._pending if line else self._pending
+        return line[:self.width]
+    
+    def feed(self, chunk: str) -> List[str]:
+        """Add text and return the lines it completed"""
+        lines: List[str] = []
+        text = self._pending + chunk
+        self._pending = ""
+        
+        start = 0
+        for index, char in enumerate(text):
+            if char.isspace():
+                if index > start:
+                    self._add_word(text[start:index], lines)
+                if char == "\n":
+                    lines.append(self._take_line(wrapped=False))
+                else:
+                    self._gap += char
+                start = index + 1
+        self._pending = text[start:]
+        return lines
+    
+    def finish(self) -> List[str]:
+        """Flush whatever is left as final lines"""
+        lines: List[str] = []
+        if self._pending:
+            self._add_word(self._pending, lines)
+            self._pending = ""
+        if self._parts:
+            lines.append(self._take_line(wrapped=False))
+        self._gap = ""
+        return lines
+    
+    def _add_word(self, word: str, lines: List[str]):
+        # Indentation at the start of a paragraph is kept; after a wrap it is dropped
+        gap = "" if self._wrapped and not self._parts else self._gap
+        self._gap = ""
+        if self._length + len(gap) + len(word) > self.width and self._parts:
+            lines.append(self._take_line(wrapped=True))
+            gap = ""
+        
+        # Hard-split words longer than a full line
+        while self._length + len(gap) + len(word) > self.width:
+            room = max(self.width - self._length - len(gap), 0)
+            self._parts.extend((gap, word[:room]))
+            lines.append(self._take_line(wrapped=True))
+            word, gap = word[room:], ""
+        
+        if word:
+            self._parts.extend((gap, word))
+            self._length += len(gap) + len(word)
+    
+    def _take_line(self, wrapped: bool) -> str:
+        line = "".join(self._parts)
+        self._parts = []
+        self._length = 0
+        self._gap = ""
+        self._wrapped = wrapped
+        return line
+
+
+class StreamingBoxRenderer:
+    """Draws a fixed-width box as text streams in, at most fps frames a second; plain output when not a TTY"""
+    
+    def __init__(self, box_width: int, title: Optional[str] = None, fps: float = 30, stream=None):
+        self.stream = stream or sys.stdout
+        self.box_width = box_width
+        self.is_tty = self.stream.isatty()
+        self.frame_interval = 1 / fps if fps > 0 else 0
+        self.wrapper = IncrementalWrapper(box_width - 4)
+        self._ready: List[str] = []  # completed lines not drawn yet
+        self._last_frame = float("-inf")
+        
+        if self.is_tty:
+            self._write("┌" + "─" * (box_width - 2) + "┐\n")
+            if title:
+                self._write(f"│ {title.center(box_width - 4)} │\n")
+                self._write("├" + "─" * (box_width - 2) + "┤\n")
+    
+    def _write(self, text: str):
+        self.stream.write(text)
+    
+    def feed(self, chunk: str):
+        """Take a chunk of streamed text; it is drawn with the next frame"""
+        if not self.is_tty:
+            self._write(chunk)
+            self.stream.flush()
+            return
+        
+        self._ready.extend(self.wrapper.feed(chunk))
+        now = time.perf_counter()
+        if now - self._last_frame >= self.frame_interval:
+            self._draw_frame(self.wrapper.current_line)
+            self._last_frame = now
+    
+    def finish(self):
+        """Draw the remaining text and close the box"""
+        if not self.is_tty:
+            self._write("\n")
+            self.stream.flush()
+            return
+        
+        self._ready.extend(self.wrapper.finish())
+        self._draw_frame("")
+        self._write("└" + "─" * (self.box_width - 2) + "┘\n")
+        self.stream.flush()
+    
+    def _draw_frame(self, partial: str):
+        """One write: the lines completed since the last frame over the old partial line, then the new one"""
+        frame = "".join(f"\r│ {line.ljust(self.box_width - 4)} │\n" for line in self._ready)
+        self._ready = []
+        if partial:
+            frame += f"\r│ {partial.ljust(self.box_width - 4)} │"
+        if frame:
+            self._write(frame)
+            self.stream.flush()
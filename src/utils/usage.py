@@ -0,0 +1,130 @@
+import threading
+from typing import Dict, List, Optional
+
+from src.db.crud import record_llm_usage, get_llm_usage_summary, get_llm_usage_totals
+from src.utils.log import get_logger
+from config.configs import (
+    LLM_PRICING, LLM_SOFT_BUDGET_TOKENS, LLM_HARD_BUDGET_TOKENS,
+    LLM_SOFT_BUDGET_USD, LLM_HARD_BUDGET_USD, LLM_USAGE_FLUSH_EVERY
+)
+
+logger = get_logger("usage")
+
+# Budget levels, from least to most constrained
+BUDGET_OK = "ok"
+BUDGET_SOFT = "soft"
+BUDGET_HARD = "hard"
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """Cost in USD from LLM_PRICING; 0 for unpriced models (local, stub)"""
+    input_price, output_price = LLM_PRICING.get(model or "", (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _over(value: float, limit: float) -> bool:
+    return limit > 0 and value >= limit
+
+
+class UsageTracker:
+    """Collects per-call token usage for a session, persists it to SQLite and tracks budgets"""
+
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        soft_budget_tokens: int = LLM_SOFT_BUDGET_TOKENS,
+        hard_budget_tokens: int = LLM_HARD_BUDGET_TOKENS,
+        soft_budget_usd: float = LLM_SOFT_BUDGET_USD,
+        hard_budget_usd: float = LLM_HARD_BUDGET_USD,
+        flush_every: int = LLM_USAGE_FLUSH_EVERY
+    ):
+        self.session_id = session_id
+        self.soft_budget_tokens = soft_budget_tokens
+        self.hard_budget_tokens = hard_budget_tokens
+        self.soft_budget_usd = soft_budget_usd
+        self.hard_budget_usd = hard_budget_usd
+        self.flush_every = max(1, flush_every)
+
+        self._lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self._level = BUDGET_OK
+        # In-memory per call site totals for this process: calls, output tokens, latency, truncations
+        self.call_sites: Dict[str, Dict[str, float]] = {}
+
+        # Usage already recorded for this session (e.g. before a resume) counts toward the budget
+        self.totals = get_llm_usage_totals(session_id) if session_id is not None else {
+            "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0
+        }
+
+    def record(
+        self,
+        call_site: str,
+        provider: str,
+        model: Optional[str],
+        input_tokens: int,
+        output_tokens: int,
+        latency_ms: Optional[float] = None,
+        estimated: bool = False,
+        truncated: bool = False
+    ):
+        """Record one LLM call; truncated means the reply ran into its max_tokens"""
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._lock:
+            self._pending.append({
+                "session_id": self.session_id,
+                "call_site": call_site,
+                "provider": provider,
+                "model": model,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost_usd": cost,
+                "latency_ms": latency_ms,
+                "estimated": int(estimated)
+            })
+            self.totals["input_tokens"] += input_tokens
+            self.totals["output_tokens"] += output_tokens
+            self.totals["cost_usd"] += cost
+            calls = self.call_sites.setdefault(call_site, {"calls": 0, "output_tokens": 0, "latency_ms": 0.0, "truncated": 0})
+            calls["calls"] += 1
+            calls["output_tokens"] += output_tokens
+            calls["latency_ms"] += latency_ms or 0.0
+            calls["truncated"] += int(truncated)
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+        self._check_level()
+
+    def flush(self):
+        """Write buffered usage records to SQLite"""
+        with self._lock:
+            records, self._pending = self._pending, []
+        try:
+            record_llm_usage(records)
+        except Exception as e:
+            logger.error("Error recording LLM usage", extra={"count": len(records)}, exc_info=e)
+
+    def budget_level(self) -> str:
+        """BUDGET_OK, BUDGET_SOFT or BUDGET_HARD for the session so far"""
+        tokens = self.totals["input_tokens"] + self.totals["output_tokens"]
+        cost = self.totals["cost_usd"]
+        if _over(tokens, self.hard_budget_tokens) or _over(cost, self.hard_budget_usd):
+            return BUDGET_HARD
+        if _over(tokens, self.soft_budget_tokens) or _over(cost, self.soft_budget_usd):
+            return BUDGET_SOFT
+        return BUDGET_OK
+
+    def _check_level(self):
+        level = self.budget_level()
+        if level != self._level:
+            self._level = level
+            logger.warning("LLM budget level changed", extra={"budget_level": level, "totals": dict(self.totals)})
+
+    def call_site_stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls, output tokens, latency and truncations per call site recorded by this tracker"""
+        with self._lock:
+            return {call_site: dict(stats) for call_site, stats in self.call_sites.items()}
+
+    def summary(self, group_by: str = "call_site") -> List[Dict]:
+        """Aggregated usage for this session from SQLite"""
+        self.flush()
+        return get_llm_usage_summary(group_by, self.session_id)
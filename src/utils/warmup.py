@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class WarmupStage:
+    """A named unit of startup work; fn receives the results of earlier stages"""
+
+    def __init__(self, name: str, label: str, fn: Callable[[Dict[str, Any]], Any]):
+        self.name = name
+        self.label = label
+        self.fn = fn
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class WarmupPipeline:
+    """Runs startup stages in order on a background thread while the UI stays interactive"""
+
+    def __init__(self):
+        self.stages: List[WarmupStage] = []
+        self.results: Dict[str, Any] = {}
+        self.error: Optional[BaseException] = None
+        self._current: Optional[WarmupStage] = None
+        self._done = threading.Event()
+        self._stage_done = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_stage(self, name: str, label: str, fn: Callable[[Dict[str, Any]], Any]) -> "WarmupPipeline":
+        """Append a stage; must be called before start()"""
+        self.stages.append(WarmupStage(name, label, fn))
+        return self
+
+    def start(self) -> "WarmupPipeline":
+        """Begin running stages in the background"""
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for stage in self.stages:
+                self._current = stage
+                stage.started_at = time.perf_counter()
+                result = stage.fn(self.results)
+                stage.finished_at = time.perf_counter()
+                with self._stage_done:
+                    self.results[stage.name] = result
+                    self._stage_done.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._current = None
+            self._done.set()
+            with self._stage_done:
+                self._stage_done.notify_all()
+
+    def progress(self) -> Tuple[float, str]:
+        """Fraction of stages finished and the label of the running stage"""
+        finished = sum(1 for stage in self.stages if stage.finished_at is not None)
+        current = self._current
+        label = current.label if current else ("Ready" if not self.error else "Failed")
+        return (finished / len(self.stages) if self.stages else 1.0), label
+
+    def is_done(self, name: Optional[str] = None) -> bool:
+        """Whether a stage (or the whole pipeline) has finished, successfully or not"""
+        if name is None or self.error is not None:
+            return self._done.is_set()
+        return name in self.results
+
+    def wait(self, name: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+        """Block until a stage (or the whole pipeline) finishes and return its result"""
+        with self._stage_done:
+            self._stage_done.wait_for(lambda: self.is_done(name), timeout)
+        if self.error is not None:
+            raise self.error
+        if name is None:
+            return self.results
+        return self.results.get(name)
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        """Duration of each stage in seconds"""
+        return {stage.name: stage.duration for stage in self.stages}
@@ -0,0 +1,49 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.configs import CHECKPOINT_PATH
+
+# Bump when the checkpoint layout changes; older checkpoints are ignored
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(dm, player_name: str, interaction_count: int, path: Path = CHECKPOINT_PATH):
+    """Atomically write a compact checkpoint of the DM and world session state"""
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "saved_at": time.time(),
+        "player_name": player_name,
+        "interaction_count": interaction_count,
+        "dm": dm.export_state(),
+        "world": dm.world.export_state(),
+    }
+
+    # Write to a temp file and rename so a crash never leaves a torn checkpoint
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Path = CHECKPOINT_PATH) -> Optional[Dict[str, Any]]:
+    """Load the last checkpoint, or None if missing, unreadable or from another version"""
+    try:
+        with open(path, "r") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+
+def delete_checkpoint(path: Path = CHECKPOINT_PATH):
+    """Remove the checkpoint after a clean exit"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,123 @@
+import hashlib
+import re
+from typing import IO, Iterator, List, Optional
+
+from config.configs import LORE_CHUNK_MAX_TOKENS, LORE_CHUNK_MIN_TOKENS, LORE_READ_SIZE
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]]*\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_WORD = re.compile(r"\S+")
+
+
+def _tokens(text: str) -> int:
+    """Rough token count, same heuristic as src.utils.llm.estimate_tokens"""
+    return max(1, len(text) // 4)
+
+
+def iter_paragraphs(stream: IO[str], read_size: int = LORE_READ_SIZE, max_chars: Optional[int] = None) -> Iterator[str]:
+    """Yield paragraphs from a text stream, reading it in fixed-size blocks"""
+    # A paragraph longer than max_chars is cut at its last sentence end so the buffer stays bounded
+    max_chars = max_chars or read_size * 4
+    buffer = ""
+    while True:
+        block = stream.read(read_size)
+        buffer += block
+        parts = _PARAGRAPH_BREAK.split(buffer)
+        buffer = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+
+        if len(buffer) > max_chars:
+            cut = max((m.end() for m in _SENTENCE_END.finditer(buffer, 0, max_chars)), default=0)
+            if not cut:
+                cut = buffer.rfind(" ", 0, max_chars) + 1 or max_chars
+            yield buffer[:cut].strip()
+            buffer = buffer[cut:]
+
+        if not block:
+            if buffer.strip():
+                yield buffer.strip()
+            return
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """Split a paragraph into sentences, keeping their punctuation and closing quotes"""
+    sentences, start = [], 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start:match.end()].strip())
+        start = match.end()
+    sentences.append(paragraph[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def _split_long(sentence: str, max_tokens: int) -> Iterator[str]:
+    """Split a run-on sentence over the budget at word boundaries"""
+    current, length = [], 0
+    for match in _WORD.finditer(sentence):
+        word = match.group()
+        if current and (length + len(word)) // 4 > max_tokens:
+            yield " ".join(current)
+            current, length = [], 0
+        current.append(word)
+        length += len(word) + 1
+    if current:
+        yield " ".join(current)
+
+
+def iter_chunks(
+    stream: IO[str],
+    max_tokens: int = LORE_CHUNK_MAX_TOKENS,
+    min_tokens: int = LORE_CHUNK_MIN_TOKENS,
+    read_size: int = LORE_READ_SIZE
+) -> Iterator[str]:
+    """Yield sentence-aligned chunks of up to max_tokens, skipping exact duplicates"""
+    seen = set()
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush() -> Optional[str]:
+        nonlocal current, current_tokens
+        chunk = " ".join(current)
+        current, current_tokens = [], 0
+        digest = hashlib.blake2b(" ".join(chunk.lower().split()).encode("utf-8"), digest_size=16).digest()
+        if not chunk or digest in seen:
+            return None
+        seen.add(digest)
+        return chunk
+
+    for paragraph in iter_paragraphs(stream, read_size):
+        for sentence in split_sentences(paragraph):
+            pieces = _split_long(sentence, max_tokens) if _tokens(sentence) > max_tokens else [sentence]
+            for piece in pieces:
+                piece_tokens = _tokens(piece)
+                if current and current_tokens + piece_tokens > max_tokens:
+                    chunk = flush()
+                    if chunk:
+                        yield chunk
+                current.append(piece)
+                current_tokens += piece_tokens
+
+        # Paragraphs end a chunk unless it is still too small to stand on its own
+        if current_tokens >= min_tokens:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    if current:
+        chunk = flush()
+        if chunk:
+            yield chunk
+
+
+def iter_chunk_batches(stream: IO[str], batch_size: int, **kwargs) -> Iterator[List[str]]:
+    """Group chunks into batches for a single embed + write each"""
+    batch = []
+    for chunk in iter_chunks(stream, **kwargs):
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from src.db.embeddings import cosine_similarity
+from src.utils.log import get_logger
+from src.db.crud import (
+    add_episodic_memory, get_episodic_memories, delete_episodic_memories,
+    count_episodic_memories, get_memory_access_count, drain_memory_query_latencies
+)
+from config.configs import (
+    EPISODIC_MEMORY_MAX_RECORDS, MEMORY_CONSOLIDATION_INTERVAL, MEMORY_CONSOLIDATION_BATCH_SIZE,
+    MEMORY_DUPLICATE_THRESHOLD, MEMORY_CONSOLIDATION_MIN_AGE, MEMORY_MAX_AGE
+)
+
+logger = get_logger("world.memory_consolidation")
+
+# Only conversation memories are consolidated; static world lore is left alone
+CONSOLIDATION_FILTER = {"type": "conversation"}
+
+# Age (seconds) at which a memory's retention score is halved
+RETENTION_HALF_LIFE = 3600.0
+
+
+def extractive_summary(documents: List[str]) -> str:
+    """Extractive summary: keep each distinct narrative part once"""
+    seen = set()
+    parts = []
+    for doc in documents:
+        for part in doc.split(" | "):
+            key = part.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                parts.append(part.strip())
+    return " | ".join(parts)
+
+
+class MemoryConsolidator:
+    """Merges near-duplicate episodic memories and evicts low-value ones in the background"""
+
+    def __init__(
+        self,
+        summarize_fn: Optional[Callable[[List[str]], str]] = None,
+        max_records: int = EPISODIC_MEMORY_MAX_RECORDS,
+        batch_size: int = MEMORY_CONSOLIDATION_BATCH_SIZE,
+        similarity_threshold: float = MEMORY_DUPLICATE_THRESHOLD,
+        min_age: float = MEMORY_CONSOLIDATION_MIN_AGE,
+        max_age: float = MEMORY_MAX_AGE,
+        interval: float = MEMORY_CONSOLIDATION_INTERVAL
+    ):
+        self.summarize_fn = summarize_fn or extractive_summary
+        self.max_records = max_records
+        self.batch_size = batch_size
+        self.similarity_threshold = similarity_threshold
+        self.min_age = min_age
+        self.max_age = max_age
+        self.interval = interval
+
+        # Collection size and query latency samples, one per pass
+        self.report = deque(maxlen=500)
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Run consolidation passes on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="memory-consolidator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run_loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Memory consolidation pass failed", exc_info=e)
+                self.report.append({"timestamp": time.time(), "error": str(e)})
+
+    def run_once(self) -> Dict:
+        """Run a single incremental pass: merge old duplicate clusters, then enforce caps"""
+        now = time.time()
+        records = self._load_records(now)
+
+        # Incremental: only the oldest batch is clustered each pass
+        batch = sorted(records, key=lambda r: r["timestamp"])[:self.batch_size]
+        merged = self._merge_duplicates(batch, now)
+
+        # Records removed by merging no longer take part in eviction
+        if merged:
+            records = self._load_records(now)
+        evicted = self._evict(records, now)
+
+        latencies = drain_memory_query_latencies()
+        sample = {
+            "timestamp": now,
+            "collection_size": count_episodic_memories(),
+            "merged": merged,
+            "evicted": evicted,
+            "queries": len(latencies),
+            "avg_query_latency_ms": (sum(latencies) / len(latencies) * 1000) if latencies else None
+        }
+        self.report.append(sample)
+        return sample
+
+    def _load_records(self, now: float) -> List[Dict]:
+        """Load metadata for all conversation memories"""
+        results = get_episodic_memories(where=CONSOLIDATION_FILTER, include=["metadatas"])
+        records = []
+        for memory_id, metadata in zip(results.get("ids") or [], results.get("metadatas") or []):
+            metadata = metadata or {}
+            timestamp = metadata.get("timestamp")
+            records.append({
+                "id": memory_id,
+                "metadata": metadata,
+                "timestamp": timestamp if isinstance(timestamp, (int, float)) else now,
+                "importance": float(metadata.get("importance", 1.0)),
+                "access_count": int(metadata.get("access_count", 0)) + get_memory_access_count(memory_id)
+            })
+        return records
+
+    def _merge_duplicates(self, batch: List[Dict], now: float) -> int:
+        """Cluster near-duplicate memories in batch and replace old clusters with a summary"""
+        candidates = [r for r in batch if now - r["timestamp"] >= self.min_age]
+        if len(candidates) < 2:
+            return 0
+
+        results = get_episodic_memories(
+            ids=[r["id"] for r in candidates],
+            include=["documents", "embeddings"]
+        )
+        by_id = {r["id"]: r for r in candidates}
+        embeddings = results.get("embeddings")
+        if embeddings is None:
+            return 0
+        for memory_id, document, embedding in zip(results["ids"], results["documents"], embeddings):
+            by_id[memory_id]["document"] = document
+            by_id[memory_id]["embedding"] = list(embedding)
+
+        # Greedy clustering against the first member of each cluster
+        clusters: List[List[Dict]] = []
+        for record in candidates:
+            if "embedding" not in record:
+                continue
+            for cluster in clusters:
+                if cosine_similarity(cluster[0]["embedding"], record["embedding"]) >= self.similarity_threshold:
+                    cluster.append(record)
+                    break
+            else:
+                clusters.append([record])
+
+        merged = 0
+        for cluster in clusters:
+            if len(cluster) < 2:
+                continue
+            summary = self.summarize_fn([r["document"] for r in cluster])
+            metadata = dict(cluster[-1]["metadata"])
+            metadata.update({
+                "timestamp": max(r["timestamp"] for r in cluster),
+                "importance": max(r["importance"] for r in cluster),
+                "access_count": sum(r["access_count"] for r in cluster),
+                "consolidated_from": len(cluster)
+            })
+            if add_episodic_memory(summary, metadata):
+                delete_episodic_memories([r["id"] for r in cluster])
+                merged += len(cluster)
+        return merged
+
+    def _retention_score(self, record: Dict, now: float) -> float:
+        """Higher is more worth keeping: importance and use, decayed by age"""
+        age = max(now - record["timestamp"], 0.0)
+        decay = 0.5 ** (age / RETENTION_HALF_LIFE)
+        return record["importance"] * (1 + record["access_count"]) * decay
+
+    def _evict(self, records: List[Dict], now: float) -> int:
+        """Drop expired memories, then the lowest-scoring ones above the record cap"""
+        doomed = []
+        if self.max_age > 0:
+            doomed = [
+                r for r in records
+                if now - r["timestamp"] > self.max_age and r["access_count"] == 0 and r["importance"] <= 1.0
+            ]
+        doomed_ids = {r["id"] for r in doomed}
+        remaining = [r for r in records if r["id"] not in doomed_ids]
+
+        overflow = len(remaining) - self.max_records
+        if overflow > 0:
+            remaining.sort(key=lambda r: self._retention_score(r, now))
+            doomed.extend(remaining[:overflow])
+
+        delete_episodic_memories([r["id"] for r in doomed])
+        return len(doomed)
+
+    def get_report(self) -> List[Dict]:
+        """Collection size and query latency samples over time"""
+        return list(self.report)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.utils.log import get_logger
+from config.configs import (
+    BASE_DIR, LORE_PATH, PROMPTS_DIR, SQLITE_DB_PATH, WORLD_SNAPSHOT, WORLD_SNAPSHOT_DIR,
+    LORE_CHUNK_MAX_TOKENS, LORE_CHUNK_MIN_TOKENS, LORE_READ_SIZE, LORE_INGEST_BATCH_SIZE
+)
+
+logger = get_logger("world.snapshot")
+
+# Bump when the snapshot layout changes; older snapshots no longer match
+SNAPSHOT_FORMAT = 1
+
+# Code whose output is baked into a snapshot: the SQLite schema and the lore chunker
+CODE_SOURCES = (BASE_DIR / "src" / "db" / "database.py", BASE_DIR / "src" / "world" / "chunker.py")
+
+
+class WorldSnapshot:
+    """A built world: seeded SQLite database, lore vectors and prompts, named by content hash"""
+
+    def __init__(self, path: Path, manifest: Dict):
+        self.path = path
+        self.manifest = manifest
+        self.content_hash = manifest["hash"]
+        self.db_path = path / "game.db"
+        self.vectors_path = path / "vectors"
+        self.prompts_path = path / "prompts"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_digests(lore_path: Path = LORE_PATH, prompts_dir: Path = PROMPTS_DIR) -> Dict[str, str]:
+    """Digest of every file a snapshot is built from"""
+    digests = {"lore": _file_digest(lore_path)}
+    for path in sorted(prompts_dir.rglob("*")):
+        if path.is_file():
+            digests[f"prompts/{path.relative_to(prompts_dir).as_posix()}"] = _file_digest(path)
+    for path in CODE_SOURCES:
+        digests[path.relative_to(BASE_DIR).as_posix()] = _file_digest(path)
+    return digests
+
+
+def content_hash(digests: Dict[str, str]) -> str:
+    """Snapshot name: hash of the sources, chunking settings and snapshot format"""
+    key = {
+        "format": SNAPSHOT_FORMAT,
+        "chunking": [LORE_CHUNK_MAX_TOKENS, LORE_CHUNK_MIN_TOKENS, LORE_READ_SIZE],
+        "sources": digests,
+    }
+    return hashlib.blake2b(json.dumps(key, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_snapshot(path: Path) -> Optional[WorldSnapshot]:
+    """Open a built snapshot, or None if it is missing, incomplete or from another format"""
+    try:
+        with open(path / "manifest.json", "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return WorldSnapshot(path, manifest)
+
+
+def find_snapshot(lore_path: Path = LORE_PATH, snapshot_dir: Path = WORLD_SNAPSHOT_DIR) -> Optional[WorldSnapshot]:
+    """The snapshot built from the current sources, if there is one"""
+    try:
+        digest = content_hash(source_digests(lore_path))
+    except FileNotFoundError:
+        return None
+    snapshot = load_snapshot(snapshot_dir / digest)
+    return snapshot if snapshot and snapshot.content_hash == digest else None
+
+
+_active: Optional[WorldSnapshot] = None
+_resolved = False
+_resolve_lock = threading.Lock()
+
+
+def active_snapshot() -> Optional[WorldSnapshot]:
+    """The snapshot this process runs on, resolved once; None falls back to live ingestion"""
+    global _active, _resolved
+    if not WORLD_SNAPSHOT:
+        return None
+    with _resolve_lock:
+        if not _resolved:
+            _active = find_snapshot()
+            _resolved = True
+            if _active is None:
+                logger.info("No world snapshot for the current sources, ingesting lore at startup (run build_world.py)")
+            else:
+                logger.info("Using world snapshot", extra={"hash": _active.content_hash, "chunks": _active.manifest.get("chunks")})
+    return _active
+
+
+def prompts_dir() -> Path:
+    """Prompt files of the active snapshot, or the source prompts without one"""
+    snapshot = active_snapshot()
+    return snapshot.prompts_path if snapshot else PROMPTS_DIR
+
+
+def install_sqlite(snapshot: WorldSnapshot, db_path: Path = SQLITE_DB_PATH) -> bool:
+    """Bring the game database up to the snapshot; True if the seeded database was copied in"""
+    from src.db.database import create_sqlite_schema
+
+    marker = db_path.with_name(db_path.name + ".snapshot")
+    if db_path.exists() and marker.exists() and marker.read_text().strip() == snapshot.content_hash:
+        return False
+
+    copied = False
+    if not db_path.exists() or db_path.stat().st_size == 0:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(snapshot.db_path, db_path)
+        copied = True
+    else:
+        # Keep existing rows (LLM usage history); the schema is created idempotently
+        create_sqlite_schema(db_path)
+    marker.write_text(snapshot.content_hash)
+    return copied
+
+
+def build_snapshot(
+    lore_path: Path = LORE_PATH,
+    snapshot_dir: Path = WORLD_SNAPSHOT_DIR,
+    force: bool = False,
+    keep: int = 2
+) -> Tuple[WorldSnapshot, bool]:
+    """Build the snapshot for the current sources unless it exists; returns it and whether it was built"""
+    from src.db.database import create_sqlite_schema
+    from src.db.embeddings import embed_texts
+    from src.db.vector_store import NumpyVectorStore
+    from src.world.chunker import iter_chunk_batches
+
+    digests = source_digests(lore_path)
+    digest = content_hash(digests)
+    final_path = snapshot_dir / digest
+    existing = load_snapshot(final_path)
+    if existing and not force:
+        return existing, False
+
+    # Build next to the final location and rename so a failed build never looks complete
+    tmp_path = snapshot_dir / f".{digest}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    create_sqlite_schema(tmp_path / "game.db")
+
+    store = NumpyVectorStore(tmp_path / "vectors")
+    chunk_index = 0
+    with open(lore_path, "r") as f:
+        for batch in iter_chunk_batches(f, LORE_INGEST_BATCH_SIZE):
+            ids = [f"lore-{chunk_index + i}" for i in range(len(batch))]
+            metadatas = [
+                {"type": "world_context", "chunk_index": chunk_index + i, "source": "initial_context"}
+                for i in range(len(batch))
+            ]
+            store.add(ids, batch, metadatas, embeddings=embed_texts(batch))
+            chunk_index += len(batch)
+    dim = store.dim
+    del store
+
+    shutil.copytree(PROMPTS_DIR, tmp_path / "prompts")
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "hash": digest,
+        "built_at": time.time(),
+        "chunks": chunk_index,
+        "dim": dim,
+        "sources": digests,
+    }
+    with open(tmp_path / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(final_path, ignore_errors=True)
+    os.replace(tmp_path, final_path)
+    _prune(snapshot_dir, keep, digest)
+    return load_snapshot(final_path), True
+
+
+def _prune(snapshot_dir: Path, keep: int, current: str):
+    """Delete all but the newest keep snapshots, never the current one"""
+    built = sorted(
+        (path for path in snapshot_dir.iterdir() if (path / "manifest.json").exists() and path.name != current),
+        key=lambda path: (path / "manifest.json").stat().st_mtime,
+        reverse=True
+    )
+    for path in built[max(0, keep - 1):]:
+        shutil.rmtree(path, ignore_errors=True)
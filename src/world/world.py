@@ -1,28 +1,42 @@
 import json
 import re
-from typing import List, Dict, Optional, Any
+import time
+import uuid
+from typing import Callable, List, Dict, Optional, Any
 from pathlib import Path
 
-from src.db.database import get_sqlite_connection, get_chromadb_client
-from src.db.schema import create_sqlite_schema, setup_chromadb
+from src.db.database import get_sqlite_connection
+from src.db.schema import create_sqlite_schema
+from src.db.vector_store import open_vector_store, LayeredVectorStore, NumpyVectorStore
+from src.db.models import Location, Entity
 from src.db.crud import (
     create_location, get_location, get_all_locations,
     create_entity, get_entities_by_location, get_entities_by_type,
-    create_game_state, get_current_game_state, update_game_state,
-    add_episodic_memory, search_episodic_memory
+    create_game_state, get_current_game_state, update_game_state, set_session_value,
+    add_episodic_memories, search_episodic_memory, build_memory_filter, count_episodic_memories,
+    upsert_world_facts
 )
-from config.configs import BASE_DIR
+from src.db.memory_writer import EpisodicMemoryWriter
+from src.world.memory_consolidation import MemoryConsolidator
+from src.world.chunker import iter_chunk_batches
+from src.world.snapshot import active_snapshot, install_sqlite
+from config.configs import LORE_PATH, RECENCY_WEIGHT, RECENCY_HALF_LIFE, LORE_INGEST_BATCH_SIZE
 
 class World:
-    def __init__(self, initial_context_path: Optional[str] = None):
+    def __init__(self, initial_context_path: Optional[str] = None, load_initial_context: bool = True):
         """Initialize the world with context and database connections"""
-        self.initial_context_path = initial_context_path or str(BASE_DIR / "initial_world_context.txt")
+        self.initial_context_path = initial_context_path or str(LORE_PATH)
         
         # Setup databases
         self._setup_databases()
         
-        # Initialize world context
-        self._initialize_world_context()
+        # Conversation memories are embedded and written in the background
+        self.memory_writer = EpisodicMemoryWriter()
+        self.memory_writer.start()
+        
+        # Initialize world context (skipped on resume: the lore is already embedded on disk)
+        if load_initial_context:
+            self._initialize_world_context()
         
         # Initialize game state
         self._initialize_game_state()
@@ -30,53 +44,63 @@ class World:
         # Interaction counter for episodic memory
         self.interaction_count = 0
         self.episodic_memory_threshold = 20
+        
+        # Background consolidation of episodic memory (started on demand)
+        self.memory_consolidator: Optional[MemoryConsolidator] = None
     
     def _setup_databases(self):
-        """Setup SQLite and ChromaDB connections"""
-        # Create SQLite schema
-        create_sqlite_schema()
+        """Setup SQLite and the episodic memory vector store"""
+        # A snapshot built from the default lore seeds the database and already holds the lore vectors
+        self.snapshot = active_snapshot() if self.initial_context_path == str(LORE_PATH) else None
+        if self.snapshot:
+            install_sqlite(self.snapshot)
+        else:
+            create_sqlite_schema()
         
-        # Setup ChromaDB
-        self.chromadb_collection = setup_chromadb()
+        # Setup the vector store, over the snapshot's lore only when this World uses the snapshot
+        self.vector_store = open_vector_store(self.snapshot.vectors_path if self.snapshot else None)
     
     def _initialize_world_context(self):
-        """Load initial world context and break into chunks for vector storage"""
+        """Stream the lore file into vector storage as sentence-aligned chunks"""
+        if self.snapshot:
+            self._load_snapshot_lore()
+            return
         try:
             with open(self.initial_context_path, 'r') as f:
-                context = f.read().strip()
-            
-            # Break context into 50-word sliding windows
-            chunks = self._create_context_chunks(context, window_size=50, overlap=10)
-            
-            # Store chunks in ChromaDB
-            for i, chunk in enumerate(chunks):
-                metadata = {
-                    "type": "world_context",
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "source": "initial_context"
-                }
-                add_episodic_memory(chunk, metadata)
+                # Chunks are embedded and stored batch by batch; the file is never fully in memory
+                chunk_index = 0
+                for batch in iter_chunk_batches(f, LORE_INGEST_BATCH_SIZE):
+                    metadatas = [
+                        {
+                            "type": "world_context",
+                            "chunk_index": chunk_index + i,
+                            "source": "initial_context"
+                        }
+                        for i in range(len(batch))
+                    ]
+                    add_episodic_memories(batch, metadatas)
+                    chunk_index += len(batch)
             
         except FileNotFoundError:
             pass  # Silently handle missing context file
         except Exception as e:
             pass  # Silently handle context loading errors
     
-    def _create_context_chunks(self, text: str, window_size: int = 50, overlap: int = 10) -> List[str]:
-        """Create sliding window chunks of text"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), window_size - overlap):
-            chunk_words = words[i:i + window_size]
-            chunk = ' '.join(chunk_words)
-            chunks.append(chunk)
-            
-            if i + window_size >= len(words):
-                break
-        
-        return chunks
+    def _load_snapshot_lore(self):
+        """Use the snapshot's precomputed lore instead of chunking and embedding the file"""
+        # The NumPy store maps the snapshot in directly; other backends get a copy of its vectors
+        if isinstance(self.vector_store, LayeredVectorStore):
+            return
+        lore = NumpyVectorStore(self.snapshot.vectors_path, read_only=True)
+        existing = lore.get(include=["documents", "metadatas", "embeddings"])
+        for start in range(0, len(existing["ids"]), LORE_INGEST_BATCH_SIZE):
+            end = start + LORE_INGEST_BATCH_SIZE
+            add_episodic_memories(
+                existing["documents"][start:end],
+                existing["metadatas"][start:end],
+                ids=existing["ids"][start:end],
+                embeddings=existing["embeddings"][start:end]
+            )
     
     def _initialize_game_state(self):
         """Initialize or load existing game state"""
@@ -84,9 +108,12 @@ class World:
         if not current_state:
             create_game_state(
                 plot_progress="initial",
-                session_data={"session_id": "1", "started": True, "interaction_count": 0},
+                session_data={"session_id": uuid.uuid4().hex[:12], "started": True, "interaction_count": 0},
                 world_state={"initialized": True}
             )
+            current_state = get_current_game_state()
+        
+        self.session_id = current_state.session_data.get("session_id") if current_state else None
     
     def add_episodic_memory_from_messages(self, messages: List[Dict[str, str]], metadata: Optional[Dict] = None):
         """Create episodic memory from conversation messages after threshold"""
@@ -107,14 +134,54 @@ class World:
                 "type": "conversation",
                 "message_count": len(messages),
                 "interaction_count": self.interaction_count,
-                "timestamp": "current"  # You might want to add actual timestamp
+                "timestamp": time.time()
             })
+            memory_metadata.setdefault("importance", 1.0)
+            if self.session_id is not None:
+                memory_metadata.setdefault("session_id", self.session_id)
             
-            add_episodic_memory(narrative, memory_metadata)
+            # Queued rather than written inline; searchable on the next turn either way
+            self.memory_writer.submit(narrative, memory_metadata)
             
             # Reset counter
             self.interaction_count = 0
     
+    def export_state(self) -> Dict[str, Any]:
+        """In-memory state needed to resume this world; the databases persist on their own"""
+        return {
+            "session_id": self.session_id,
+            "interaction_count": self.interaction_count
+        }
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore in-memory state saved by export_state"""
+        self.session_id = state.get("session_id", self.session_id)
+        self.interaction_count = state.get("interaction_count", 0)
+    
+    def start_memory_consolidation(self, summarize_fn: Optional[Callable[[List[str]], str]] = None):
+        """Start merging and evicting episodic memories in the background"""
+        if self.memory_consolidator is None:
+            self.memory_consolidator = MemoryConsolidator(summarize_fn=summarize_fn)
+        self.memory_consolidator.start()
+    
+    def stop_memory_consolidation(self):
+        """Stop background memory consolidation"""
+        if self.memory_consolidator:
+            self.memory_consolidator.stop()
+    
+    def flush_memories(self):
+        """Block until queued episodic memories are written"""
+        self.memory_writer.flush()
+    
+    def close(self):
+        """Stop background work, writing any queued memories first"""
+        self.stop_memory_consolidation()
+        self.memory_writer.stop()
+    
+    def get_memory_report(self) -> List[Dict]:
+        """Episodic memory collection size and query latency over time"""
+        return self.memory_consolidator.get_report() if self.memory_consolidator else []
+    
     def _messages_to_narrative(self, messages: List[Dict[str, str]]) -> str:
         """Convert conversation messages to narrative text"""
         narrative_parts = []
@@ -132,39 +199,88 @@ class World:
         
         return " | ".join(narrative_parts)
     
+    def search_memories(
+        self,
+        query: str,
+        n_results: int = 5,
+        memory_type: Optional[Any] = None,
+        session_id: Optional[str] = None,
+        plot_index: Optional[int] = None,
+        recency_window: Optional[float] = None,
+        recency_weight: float = 0.0
+    ) -> List[Dict]:
+        """Search memories with metadata filters pushed into the query, optionally recency-weighted"""
+        since = time.time() - recency_window if recency_window else None
+        where = build_memory_filter(memory_type, session_id, plot_index, since)
+        
+        # Over-fetch a little when re-ranking by recency
+        fetch = n_results * 2 if recency_weight > 0 else n_results
+        results = search_episodic_memory(query, fetch, where=where)
+        if not results.get("documents") or not results["documents"][0]:
+            return []
+        
+        documents = results["documents"][0]
+        metadatas = results["metadatas"][0] if results.get("metadatas") else [{}] * len(documents)
+        ids = results["ids"][0] if results.get("ids") else [None] * len(documents)
+        
+        # Relevance in [0, 1]: normalized fused score, or derived from vector distance
+        if results.get("scores"):
+            raw = results["scores"][0]
+            top = max(raw) or 1.0
+            relevance = [score / top for score in raw]
+        elif results.get("distances"):
+            relevance = [1.0 / (1.0 + distance) for distance in results["distances"][0]]
+        else:
+            relevance = [1.0 / (rank + 1) for rank in range(len(documents))]
+        
+        now = time.time()
+        memories = []
+        for memory_id, document, metadata, rel in zip(ids, documents, metadatas, relevance):
+            metadata = metadata or {}
+            score = rel
+            if recency_weight > 0:
+                timestamp = metadata.get("timestamp")
+                age = now - timestamp if isinstance(timestamp, (int, float)) else float("inf")
+                recency = 0.5 ** (max(age, 0.0) / RECENCY_HALF_LIFE)
+                score = (1 - recency_weight) * rel + recency_weight * recency
+            memories.append({"id": memory_id, "document": document, "metadata": metadata, "score": score})
+        
+        memories.sort(key=lambda memory: memory["score"], reverse=True)
+        return memories[:n_results]
+    
+    def count_memories(self) -> int:
+        """Number of records in episodic memory, lore included"""
+        return count_episodic_memories()
+    
     def get_world_context(self, query: str, n_results: int = 5) -> Dict:
-        """Get relevant world context based on query"""
-        results = search_episodic_memory(query, n_results)
-        
-        # Handle ChromaDB response format properly
-        if results.get("documents") and results["documents"]:
-            # ChromaDB returns documents as a list of lists
-            documents = results["documents"][0] if isinstance(results["documents"], list) else results["documents"]
-            metadatas = results.get("metadatas", [[]])[0] if results.get("metadatas") else []
-            
-            return {
-                "documents": documents,
-                "metadatas": metadatas
-            }
+        """Get relevant static world lore based on query"""
+        memories = self.search_memories(query, n_results, memory_type="world_context")
         
-        return {"documents": [], "metadatas": []}
+        return {
+            "documents": [memory["document"] for memory in memories],
+            "metadatas": [memory["metadata"] for memory in memories]
+        }
     
-    def get_episodic_context(self, query: str, n_results: int = 3) -> str:
-        """Get episodic memory context for plot generation and responses"""
-        results = search_episodic_memory(query, n_results)
+    def get_episodic_context(
+        self,
+        query: str,
+        n_results: int = 3,
+        plot_index: Optional[int] = None,
+        recency_window: Optional[float] = None
+    ) -> str:
+        """Get recency-weighted conversation memories for plot generation and responses"""
+        memories = self.search_memories(
+            query,
+            n_results,
+            memory_type="conversation",
+            session_id=self.session_id,
+            plot_index=plot_index,
+            recency_window=recency_window,
+            recency_weight=RECENCY_WEIGHT
+        )
         
-        if results.get("documents") and results["documents"]:
-            # ChromaDB returns documents as a list of lists, so we need to flatten
-            documents = results["documents"][0] if isinstance(results["documents"], list) else results["documents"]
-            metadatas = results.get("metadatas", [[]])[0] if results.get("metadatas") else []
-            
-            context_parts = []
-            for i, doc in enumerate(documents):
-                if i < len(metadatas):
-                    metadata = metadatas[i] or {}
-                else:
-                    metadata = {}
-                context_parts.append(f"Memory {i+1}: {doc}")
+        if memories:
+            context_parts = [f"Memory {i+1}: {memory['document']}" for i, memory in enumerate(memories)]
             return " | ".join(context_parts)
         
         return "No relevant episodic memory found"
@@ -190,24 +306,35 @@ class World:
             return {}
         
         return {
-            "plot_progress": state[1],
-            "session_data": json.loads(state[2]) if state[2] else {},
-            "world_state": json.loads(state[3]) if state[3] else {}
+            "plot_progress": state.plot_progress,
+            "session_data": state.session_data,
+            "world_state": state.world_state
         }
     
     def update_world_state(self, **kwargs):
-        """Update world state"""
-        current_state = get_current_game_state()
-        if not current_state:
-            return
-        
-        # Extract current values
-        plot_progress = kwargs.get('plot_progress', current_state[1])
-        session_data = kwargs.get('session_data', json.loads(current_state[2]) if current_state[2] else {})
-        world_state = kwargs.get('world_state', json.loads(current_state[3]) if current_state[3] else {})
+        """Update world state; only the columns passed are written"""
+        update_game_state(
+            plot_progress=kwargs.get('plot_progress'),
+            session_data=kwargs.get('session_data'),
+            world_state=kwargs.get('world_state')
+        )
+    
+    def apply_world_facts(self, facts: Dict[str, Any]) -> Optional[int]:
+        """Upsert extracted locations and entities; returns the id of the player's location if known"""
+        locations = list(facts["locations"])
+        player_location = facts.get("player_location")
+        if player_location and player_location.lower() not in {location["name"].lower() for location in locations}:
+            locations.append({"name": player_location, "description": None})
+        if not locations and not facts["entities"]:
+            return None
         
-        # Update the game state
-        update_game_state(plot_progress, session_data, world_state)
+        location_ids = upsert_world_facts(locations, facts["entities"])
+        return location_ids.get(player_location.lower()) if player_location else None
+    
+    def set_player_location(self, location_id: int) -> bool:
+        """Move the player; True if the location changed"""
+        # Written in place: the world extractor calls this from an agent thread while the turn updates the plot
+        return set_session_value("current_location_id", location_id)
     
     def create_location(self, name: str, description: str, properties: Optional[Dict] = None) -> int:
         """Create a new location"""
@@ -217,10 +344,10 @@ class World:
         """Create a new entity"""
         return create_entity(name, entity_type, description, location_id, properties)
     
-    def get_entities_by_type(self, entity_type: str) -> List:
+    def get_entities_by_type(self, entity_type: str) -> List[Entity]:
         """Get all entities of a specific type"""
         return get_entities_by_type(entity_type)
     
-    def get_all_locations(self) -> List:
+    def get_all_locations(self) -> List[Location]:
         """Get all locations"""
         return get_all_locations() 
\ No newline at end of file
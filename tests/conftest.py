@@ -0,0 +1,91 @@
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+from src.db import crud, database, embeddings, vector_store
+from src.db.database import create_sqlite_schema
+from src.db.vector_store import NumpyVectorStore
+
+_WORD = re.compile(r"\w+")
+
+
+class BagOfWordsEmbedding:
+    """Stands in for the sentence model: texts sharing words get similar vectors"""
+
+    dim = 64
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    """Embed with BagOfWordsEmbedding so no test downloads or runs the real model"""
+    monkeypatch.setattr(embeddings, "_embedding_function", BagOfWordsEmbedding())
+
+
+@pytest.fixture
+def game_db(tmp_path, monkeypatch):
+    """A fresh game database in a temporary directory"""
+    db_path = tmp_path / "game.db"
+    monkeypatch.setattr(database, "SQLITE_DB_PATH", db_path)
+    create_sqlite_schema()
+    return db_path
+
+
+@pytest.fixture
+def memory_store(tmp_path, monkeypatch):
+    """A fresh episodic memory store in a temporary directory, with crud's search state reset"""
+    store = NumpyVectorStore(tmp_path / "vectors")
+    monkeypatch.setattr(vector_store, "_store", store)
+    crud.clear_episodic_memory()
+    yield store
+    crud.clear_episodic_memory()
+
+
+LORE = """The village of Ashgrove sits under a hill crowned by a ruined chapel.
+
+The gravekeeper lives by the cemetery gate and knows every name on the stones.
+"""
+
+
+@pytest.fixture
+def world(tmp_path, game_db, memory_store):
+    """A World over the temporary database and memory store, seeded with a short lore file"""
+    from src.world.world import World
+
+    lore_path = tmp_path / "lore.txt"
+    lore_path.write_text(LORE)
+    world = World(str(lore_path))
+    yield world
+    world.close()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Route every LLMClient to the instant offline stub"""
+    from src.utils import llm
+
+    monkeypatch.setattr(llm, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(llm, "LLM_TASK_ROUTES", {})
+    monkeypatch.setattr(llm, "STUB_LATENCY", 0.0)
+    monkeypatch.setattr(llm, "STUB_TOKENS_PER_SECOND", 0.0)
+    monkeypatch.setattr(llm, "STUB_RESPONSES_PATH", None)
+
+
+@pytest.fixture
+def dm(world, stub_llm, monkeypatch):
+    """A DungeonMaster on the stub LLM, reading the source prompts rather than a built snapshot"""
+    from src.agents.dungeon_master.dm import DungeonMaster
+    from src.world import snapshot
+
+    monkeypatch.setattr(snapshot, "WORLD_SNAPSHOT", False)
+    dm = DungeonMaster(world, speculative=False)
+    yield dm
+    dm.close()
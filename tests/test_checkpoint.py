@@ -0,0 +1,88 @@
+import json
+import sys
+
+import pytest
+
+from src.agents.dungeon_master.dm import DungeonMaster
+from src.world.checkpoint import delete_checkpoint, load_checkpoint, save_checkpoint
+
+
+def test_checkpoint_roundtrip_restores_the_session(dm, tmp_path):
+    path = tmp_path / "session.json"
+    dm.respond_to_player("begin")
+    dm.respond_to_player("open the door")
+    save_checkpoint(dm, "Mina", 2, path)
+
+    checkpoint = load_checkpoint(path)
+    assert (checkpoint["player_name"], checkpoint["interaction_count"]) == ("Mina", 2)
+
+    restored = DungeonMaster(dm.world, speculative=False)
+    try:
+        restored.restore_state(checkpoint["dm"])
+        assert restored.turn_count == 2
+        assert list(restored.plot_points) == list(dm.plot_points)
+        assert restored.conversation_history == dm.conversation_history
+        assert restored.world.get_current_world_state()["world_state"]["plot_points"] == list(dm.plot_points)
+    finally:
+        restored.close()
+
+
+def test_history_in_a_checkpoint_is_bounded(dm, monkeypatch):
+    from src.agents.dungeon_master import dm as dm_module
+
+    monkeypatch.setattr(dm_module, "CHECKPOINT_HISTORY_TAIL", 4)
+    dm.conversation_history = [{"role": "user", "content": str(n)} for n in range(10)]
+    assert [message["content"] for message in dm.export_state()["history_tail"]] == ["6", "7", "8", "9"]
+
+
+def test_missing_corrupt_or_old_checkpoints_are_ignored(tmp_path):
+    path = tmp_path / "session.json"
+    assert load_checkpoint(path) is None
+    path.write_text("{not json")
+    assert load_checkpoint(path) is None
+    path.write_text(json.dumps({"version": 0}))
+    assert load_checkpoint(path) is None
+
+    delete_checkpoint(path)
+    delete_checkpoint(path)
+    assert not path.exists()
+
+
+def test_save_leaves_no_temp_file(dm, tmp_path):
+    directory = tmp_path / "checkpoints"
+    save_checkpoint(dm, "Mina", 0, directory / "session.json")
+    assert [path.name for path in directory.iterdir()] == ["session.json"]
+
+
+def _interrupted_main(monkeypatch, checkpoint):
+    """Run main() with a pipeline that builds nothing, interrupted at the name prompt"""
+    import main
+    from src.utils.terminal_ui import TerminalUI
+    from src.utils.warmup import WarmupPipeline
+
+    cleared = []
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(sys, "argv", ["main.py"])
+    monkeypatch.setattr(main, "setup_logging", lambda: None)
+    monkeypatch.setattr(main, "shutdown_logging", lambda: None)
+    monkeypatch.setattr(main, "build_warmup_pipeline", lambda checkpoint: WarmupPipeline().add_stage("databases", "", lambda results: None))
+    monkeypatch.setattr(main, "clear_databases", lambda: cleared.append(True))
+    monkeypatch.setattr(main, "load_checkpoint", lambda: checkpoint)
+    monkeypatch.setattr(TerminalUI, "show_loading_screen", lambda self, **kwargs: None)
+    monkeypatch.setattr(TerminalUI, "show_title_screen", lambda self: None)
+    monkeypatch.setattr(TerminalUI, "get_player_name", lambda self: interrupt())
+
+    with pytest.raises(KeyboardInterrupt):
+        main.main()
+    return bool(cleared)
+
+
+def test_interrupt_before_any_checkpoint_clears_the_session(monkeypatch):
+    assert _interrupted_main(monkeypatch, checkpoint=None)
+
+
+def test_interrupt_keeps_the_session_when_a_checkpoint_exists(monkeypatch):
+    assert not _interrupted_main(monkeypatch, checkpoint={"player_name": "Mina"})
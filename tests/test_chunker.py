@@ -0,0 +1,61 @@
+import io
+
+from src.world.chunker import iter_chunk_batches, iter_chunks, iter_paragraphs, split_sentences
+
+TEXT = (
+    "The castle stands on a crag. Wolves circle below it.\n\n"
+    "Inside, the halls are cold.\n\n  \n\n"
+    "The count sleeps by day. \"Do not wake him,\" the servant warns. Candles gutter in the crypt!"
+)
+
+
+def test_paragraphs_are_the_same_whatever_the_read_size():
+    expected = list(iter_paragraphs(io.StringIO(TEXT)))
+    assert len(expected) == 3
+    for read_size in (1, 7, 64):
+        assert list(iter_paragraphs(io.StringIO(TEXT), read_size=read_size, max_chars=1000)) == expected
+
+
+def test_an_overlong_paragraph_is_cut_at_a_sentence_end():
+    text = "One two three. " * 20
+    parts = list(iter_paragraphs(io.StringIO(text), read_size=16, max_chars=50))
+    assert all(len(part) <= 50 for part in parts)
+    assert all(part.endswith(".") for part in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+def test_split_sentences_keeps_punctuation_and_quotes():
+    assert split_sentences('He said "Run!" Then silence... (It was over.) The end') == [
+        'He said "Run!"', "Then silence...", "(It was over.)", "The end"
+    ]
+
+
+def test_chunks_are_sentence_aligned_and_within_budget():
+    chunks = list(iter_chunks(io.StringIO(TEXT), max_tokens=10, min_tokens=1))
+    assert all(len(chunk) // 4 <= 10 for chunk in chunks)
+    assert chunks[0] == "The castle stands on a crag."
+    assert all(chunk[-1] in ".!\"" for chunk in chunks)
+
+
+def test_small_paragraphs_continue_into_the_next_one():
+    chunks = list(iter_chunks(io.StringIO("Short.\n\nAlso short.\n\nTiny."), max_tokens=50, min_tokens=20))
+    assert chunks == ["Short. Also short. Tiny."]
+
+
+def test_run_on_sentences_are_split_at_words_and_duplicates_dropped():
+    run_on = " ".join(["word"] * 100)
+    chunks = list(iter_chunks(io.StringIO(f"{run_on}.\n\nRepeat me.\n\nrepeat   ME."), max_tokens=20, min_tokens=1))
+    assert all(len(chunk) // 4 <= 20 for chunk in chunks)
+    assert chunks.count("Repeat me.") == 1 and "repeat   ME." not in chunks
+
+
+def test_batches_group_chunks():
+    batches = list(iter_chunk_batches(io.StringIO(TEXT), 2, max_tokens=10, min_tokens=1))
+    assert [len(batch) for batch in batches[:-1]] == [2] * (len(batches) - 1)
+    assert sum(batches, []) == list(iter_chunks(io.StringIO(TEXT), max_tokens=10, min_tokens=1))
+
+
+def test_world_ingests_lore_chunks(world):
+    lore = world.vector_store.get(where={"type": "world_context"})
+    assert lore["documents"]
+    assert [metadata["chunk_index"] for metadata in lore["metadatas"]] == list(range(len(lore["ids"])))
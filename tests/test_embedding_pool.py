@@ -0,0 +1,90 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.db import embeddings
+from src.db.embedding_pool import EmbeddingPool, _worker_main
+from src.db.embeddings import cosine_similarity, embed_text, embed_texts
+
+TEXTS = [f"lore chunk number {n} about the castle" for n in range(10)]
+
+
+def _thread_pool(max_dim=64):
+    """A pool whose single worker runs on a (not yet started) thread, so it embeds with the test embedder"""
+    pool = EmbeddingPool(workers=0, batch_size=4, max_pending=2, max_dim=max_dim, sync_threshold=3, timeout=5)
+    pool.start()
+    slot_names = [shm.name for shm in pool._slots]
+    worker = threading.Thread(
+        target=_worker_main,
+        args=(pool._requests, pool._results, slot_names, pool.batch_size * pool.max_dim),
+        daemon=True
+    )
+    pool._processes = [worker]
+    return pool
+
+
+@pytest.fixture
+def pool():
+    pool = _thread_pool()
+    yield pool
+    pool.stop()
+
+
+def _wait_ready(pool):
+    end = time.monotonic() + 5
+    while not pool._workers_ready() and time.monotonic() < end:
+        time.sleep(0.01)
+    assert pool._workers_ready()
+
+
+def test_jobs_run_inline_until_the_workers_are_ready(pool):
+    expected = embeddings.get_embedding_function()(TEXTS)
+    assert np.array_equal(pool.embed(TEXTS), expected)
+    assert pool.get_metrics()["inline_batches"] == 1
+
+    pool._processes[0].start()
+    _wait_ready(pool)
+    vectors = pool.embed(TEXTS)
+
+    assert vectors.dtype == np.float32 and np.array_equal(vectors, expected)
+    metrics = pool.get_metrics()
+    assert (metrics["pool_batches"], metrics["inline_batches"], metrics["ready"]) == (3, 1, 1)
+
+
+def test_small_jobs_stay_inline(pool):
+    pool._processes[0].start()
+    _wait_ready(pool)
+    pool.embed(TEXTS[:2])
+    assert pool.get_metrics()["pool_batches"] == 0
+
+
+def test_results_are_copies_of_the_shared_buffers(pool):
+    pool._processes[0].start()
+    _wait_ready(pool)
+    first = pool.embed(TEXTS[:4])
+    first[:] = 0
+    assert np.array_equal(pool.embed(TEXTS[:4]), embeddings.get_embedding_function()(TEXTS[:4]))
+
+
+def test_a_failed_batch_falls_back_inline():
+    pool = _thread_pool(max_dim=8)  # the test embedder's vectors are wider than the slots
+    try:
+        pool._processes[0].start()
+        _wait_ready(pool)
+        vectors = pool.embed(TEXTS[:4])
+        assert vectors.shape == (4, 64)
+        assert pool.get_metrics()["failures"] == 1
+    finally:
+        pool.stop()
+
+
+def test_embed_texts_without_a_pool():
+    assert embeddings._pool is None
+    assert embeddings.start_embedding_pool(0) is None
+    assert embed_texts([]).shape == (0, 0)
+    vectors = embed_texts(["a raven", "a wolf"])
+    assert isinstance(vectors, np.ndarray) and vectors.dtype == np.float32
+    assert cosine_similarity(embed_text("a raven"), vectors[0]) == pytest.approx(1.0)
+    assert cosine_similarity([1, 0], [0, 0]) == 0.0
@@ -0,0 +1,73 @@
+from src.db import crud
+from src.db.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def _index():
+    index = BM25Index()
+    index.add("altar", "A cracked altar stained with old blood", {"type": "lore"})
+    index.add("gate", "The iron gate of the cemetery is rusted shut", {"type": "lore"})
+    index.add("talk", "Player asked the gravekeeper about the gate", {"type": "conversation"})
+    return index
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("What is in THE crypt?") == ["crypt"]
+
+
+def test_search_ranks_documents_by_term_weight():
+    ranked = _index().search("rusted iron gate")
+    assert [doc_id for doc_id, _ in ranked] == ["gate", "talk"]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_search_applies_metadata_filter():
+    ranked = _index().search("gate", where={"type": "conversation"})
+    assert [doc_id for doc_id, _ in ranked] == ["talk"]
+
+
+def test_replace_and_remove_update_postings():
+    index = _index()
+    index.add("gate", "A wooden door", {})
+    assert "gate" not in [doc_id for doc_id, _ in index.search("iron")]
+    index.remove("talk")
+    assert index.search("gravekeeper") == []
+    assert len(index) == 2
+
+
+def test_matched_terms_fraction():
+    assert _index().matched_terms("iron altar", "gate") == 0.5
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+
+
+def test_hybrid_search_fuses_vector_and_lexical_hits(memory_store):
+    crud.add_episodic_memories(
+        ["The gravekeeper hides a silver key", "A raven watches from the chapel roof", "Fog rolls over the graves"],
+        [{"type": "conversation"}] * 3
+    )
+    results = crud.search_episodic_memory("where is the silver key hidden", n_results=2, hybrid=True)
+    assert results["documents"][0][0] == "The gravekeeper hides a silver key"
+    assert len(results["ids"][0]) == 2
+
+
+def test_confident_lexical_match_skips_the_vector_query(memory_store, monkeypatch):
+    crud.add_episodic_memories(["The raven speaks", "Fog over the graves"], [{}, {}])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("vector store queried")
+    monkeypatch.setattr(memory_store, "query", fail)
+
+    results = crud.search_episodic_memory("raven", hybrid=True)
+    assert results["documents"] == [["The raven speaks"]]
+
+
+def test_staged_memories_are_searchable_before_they_are_written(memory_store):
+    crud.stage_episodic_memory("pending", "The lantern flickers out", {"type": "conversation"})
+    results = crud.search_episodic_memory("lantern", hybrid=False)
+    assert results["ids"] == [["pending"]]
+
+    crud.unstage_episodic_memories(["pending"], committed=False)
+    assert crud.search_episodic_memory("lantern", hybrid=True)["ids"] == [[]]
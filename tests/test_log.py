@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from src.utils import log
+from src.utils.log import RotatingJsonFileHandler, get_logger, set_log_context, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    monkeypatch.setitem(log._context, "session_id", None)
+    monkeypatch.setitem(log._context, "turn", None)
+    path = tmp_path / "logs" / "bhootai.log"
+    setup_logging(path, "INFO")
+    yield path
+    shutdown_logging()
+
+
+def _entries(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_are_json_lines_with_context_and_extras(log_path):
+    set_log_context(session_id="abc", turn=3)
+    get_logger("test").info("Turn done", extra={"latency_ms": 12.5})
+    get_logger("test").debug("Too quiet to keep")
+    shutdown_logging()
+
+    [entry] = _entries(log_path)
+    assert entry["logger"] == "bhootai.test"
+    assert (entry["message"], entry["session_id"], entry["turn"], entry["latency_ms"]) == ("Turn done", "abc", 3, 12.5)
+
+
+def test_exceptions_keep_their_traceback(log_path):
+    try:
+        raise ValueError("bad omen")
+    except ValueError as e:
+        get_logger("test").error("Failed", exc_info=e)
+    shutdown_logging()
+
+    [entry] = _entries(log_path)
+    assert "ValueError: bad omen" in entry["exc"]
+    assert entry["message"] == "Failed"
+
+
+def test_rotation_by_size_and_by_age(tmp_path):
+    handler = RotatingJsonFileHandler(tmp_path / "game.log", max_bytes=0, backup_count=2, rotate_seconds=60)
+    record = logging.LogRecord("bhootai", logging.INFO, "", 0, "x" * 50, None, None)
+    assert not handler.shouldRollover(record)
+
+    handler.opened_at -= 120
+    assert handler.shouldRollover(record)
+    before = time.time()
+    handler.emit(record)
+    assert handler.opened_at >= before
+    handler.close()
+
+    sized = RotatingJsonFileHandler(tmp_path / "sized.log", max_bytes=80, backup_count=2, rotate_seconds=0)
+    sized.setFormatter(log.JsonFormatter())
+    for _ in range(3):
+        sized.emit(record)
+    sized.close()
+    assert (tmp_path / "sized.log.1").exists()
+
+
+def test_age_rotation_survives_a_restart(tmp_path):
+    path = tmp_path / "game.log"
+    started = time.time() - 3600
+    path.write_text(json.dumps({"ts": started, "message": "old session"}) + "\n")
+    os.utime(path, (time.time(), time.time()))
+
+    handler = RotatingJsonFileHandler(path, max_bytes=0, backup_count=2, rotate_seconds=60)
+    record = logging.LogRecord("bhootai", logging.INFO, "", 0, "x", None, None)
+    assert handler.opened_at <= started + 1
+    assert handler.shouldRollover(record)
+    handler.close()
+
+    fresh = RotatingJsonFileHandler(tmp_path / "new.log", max_bytes=0, backup_count=2, rotate_seconds=60)
+    assert not fresh.shouldRollover(record)
+    fresh.close()
@@ -0,0 +1,58 @@
+import time
+
+from src.db import crud
+from src.world.memory_consolidation import MemoryConsolidator, extractive_summary
+
+
+def _add(content, age=0.0, importance=1.0):
+    metadata = {"type": "conversation", "timestamp": time.time() - age, "importance": importance}
+    return crud.add_episodic_memory(content, metadata)
+
+
+def test_extractive_summary_keeps_each_part_once():
+    documents = ["Player: look | DM: A dark hall", "player: LOOK | DM: A cold draft"]
+    assert extractive_summary(documents) == "Player: look | DM: A dark hall | DM: A cold draft"
+
+
+def test_old_duplicates_are_merged_into_one_summary(memory_store):
+    for _ in range(3):
+        _add("Player: search the altar | DM: Dust and bones", age=1000)
+    _add("Player: open the gate | DM: It creaks", age=1000)
+
+    sample = MemoryConsolidator(min_age=600, similarity_threshold=0.95).run_once()
+
+    assert sample["merged"] == 3
+    assert crud.count_episodic_memories() == 2
+    merged = crud.get_episodic_memories(where={"consolidated_from": 3})
+    assert merged["documents"] == ["Player: search the altar | DM: Dust and bones"]
+
+
+def test_recent_duplicates_are_left_alone(memory_store):
+    for _ in range(2):
+        _add("Player: search the altar | DM: Dust and bones", age=10)
+
+    sample = MemoryConsolidator(min_age=600).run_once()
+
+    assert sample["merged"] == 0
+    assert crud.count_episodic_memories() == 2
+
+
+def test_eviction_keeps_the_most_valuable_records(memory_store):
+    keep = [_add(f"Player: memory {n} | DM: kept", importance=5.0) for n in range(2)]
+    for n in range(3):
+        _add(f"Player: trivia {n} | DM: dropped", importance=0.5)
+
+    sample = MemoryConsolidator(max_records=2, similarity_threshold=1.1).run_once()
+
+    assert sample["evicted"] == 3
+    assert sorted(crud.get_episodic_memories()["ids"]) == sorted(keep)
+
+
+def test_max_age_drops_stale_unused_memories(memory_store):
+    _add("Player: ancient | DM: forgotten", age=5000)
+    important = _add("Player: ancient vow | DM: remembered", age=5000, importance=3.0)
+    fresh = _add("Player: new | DM: recent")
+
+    MemoryConsolidator(max_age=3600, similarity_threshold=1.1).run_once()
+
+    assert sorted(crud.get_episodic_memories()["ids"]) == sorted([important, fresh])
@@ -0,0 +1,63 @@
+import time
+
+from src.db import crud
+from src.db.crud import build_memory_filter
+from src.db.lexical_index import matches_where
+
+
+def test_build_memory_filter_shapes():
+    assert build_memory_filter() is None
+    assert build_memory_filter(memory_type="conversation") == {"type": "conversation"}
+    assert build_memory_filter(memory_type=["a", "b"], session_id="s1") == {
+        "$and": [{"type": {"$in": ["a", "b"]}}, {"session_id": "s1"}]
+    }
+    assert build_memory_filter(since=10.0) == {"timestamp": {"$gte": 10.0}}
+
+
+def test_matches_where_operators():
+    metadata = {"type": "conversation", "plot_index": 2, "timestamp": 50}
+    assert matches_where(metadata, {"$and": [{"type": "conversation"}, {"timestamp": {"$gte": 40}}]})
+    assert matches_where(metadata, {"$or": [{"type": "lore"}, {"plot_index": {"$in": [1, 2]}}]})
+    assert not matches_where(metadata, {"timestamp": {"$lt": 50}})
+    assert not matches_where({}, {"timestamp": {"$gte": 0}})
+
+
+def _remember(world, text, session_id=None, age=0.0, plot_index=0):
+    metadata = {
+        "type": "conversation",
+        "session_id": session_id or world.session_id,
+        "plot_index": plot_index,
+        "timestamp": time.time() - age
+    }
+    crud.add_episodic_memory(text, metadata)
+
+
+def test_world_context_searches_only_lore(world):
+    _remember(world, "Player: ask about the chapel | DM: The chapel is cursed")
+    context = world.get_world_context("ruined chapel")
+    assert context["documents"]
+    assert all(metadata["type"] == "world_context" for metadata in context["metadatas"])
+
+
+def test_search_filters_by_session_and_plot_index(world):
+    _remember(world, "Player: visit the chapel | DM: candles", plot_index=1)
+    _remember(world, "Player: visit the chapel | DM: bells", plot_index=2)
+    _remember(world, "Player: visit the chapel | DM: other game", session_id="elsewhere", plot_index=1)
+
+    memories = world.search_memories("chapel", memory_type="conversation", session_id=world.session_id, plot_index=1)
+    assert [memory["document"] for memory in memories] == ["Player: visit the chapel | DM: candles"]
+
+
+def test_recency_window_drops_old_memories(world):
+    _remember(world, "Player: chapel bells | DM: old", age=7200)
+    _remember(world, "Player: chapel bells | DM: new")
+    memories = world.search_memories("chapel bells", memory_type="conversation", recency_window=3600)
+    assert [memory["document"] for memory in memories] == ["Player: chapel bells | DM: new"]
+
+
+def test_recency_weight_prefers_newer_memories_of_equal_relevance(world):
+    _remember(world, "Player: chapel bells | DM: toll", age=7200)
+    _remember(world, "Player: chapel bells | DM: ring")
+    memories = world.search_memories("chapel bells", memory_type="conversation", recency_weight=0.5)
+    assert memories[0]["document"] == "Player: chapel bells | DM: ring"
+    assert memories[0]["score"] > memories[1]["score"]
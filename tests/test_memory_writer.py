@@ -0,0 +1,50 @@
+import pytest
+
+from src.db import crud, memory_writer
+from src.db.memory_writer import EpisodicMemoryWriter
+
+
+@pytest.fixture
+def writer(memory_store):
+    writer = EpisodicMemoryWriter(batch_size=4, flush_interval=0.2)
+    writer.start()
+    yield writer
+    writer.stop(timeout=5)
+
+
+def test_submitted_memories_are_searchable_before_the_write(memory_store):
+    writer = EpisodicMemoryWriter()
+    memory_id = writer.submit("The lantern flickers out", {"type": "conversation"})
+
+    assert crud.search_episodic_memory("lantern")["ids"] == [[memory_id]]
+    assert memory_store.count() == 0
+
+
+def test_memories_are_written_in_batches(writer, memory_store):
+    ids = [writer.submit(f"Memory {n} of the crypt", {"type": "conversation"}) for n in range(6)]
+    writer.flush()
+
+    assert memory_store.count() == 6
+    assert sorted(crud.get_episodic_memories()["ids"]) == sorted(ids)
+    metrics = writer.get_metrics()
+    assert (metrics["memories_written"], metrics["pending"]) == (6, 0)
+    assert metrics["batches_written"] == 2
+    assert not crud._pending_memories
+
+
+def test_stop_writes_whatever_is_still_queued(memory_store):
+    writer = EpisodicMemoryWriter(batch_size=100, flush_interval=5)
+    writer.start()
+    for n in range(3):
+        writer.submit(f"Memory {n}", {})
+    writer.stop(timeout=5)
+    assert memory_store.count() == 3
+
+
+def test_a_failed_write_is_dropped_from_search(writer, monkeypatch):
+    monkeypatch.setattr(memory_writer, "add_episodic_memories", lambda *args: [])
+    writer.submit("The lantern flickers out", {})
+    writer.flush()
+
+    assert crud.search_episodic_memory("lantern")["ids"] == [[]]
+    assert writer.get_metrics()["memories_written"] == 0
@@ -0,0 +1,41 @@
+from src.db import crud
+from src.db.models import GameState, Location, _UNDECODED
+
+
+def test_json_columns_decode_lazily_once():
+    state = GameState(1, "intro", '{"turn": 3}', None, "2024-01-01")
+    assert state._session_data is _UNDECODED
+    assert state.session_data == {"turn": 3}
+    assert state.session_data is state.session_data
+    assert state.world_state == {}
+
+
+def test_row_models_use_slots():
+    location = Location(1, "Crypt", "Damp", None)
+    assert not hasattr(location, "__dict__")
+    assert location.properties == {}
+
+
+def test_crud_returns_row_models(game_db):
+    location_id = crud.create_location("Crypt", "Damp stone", {"lit": False})
+    crud.create_entity("Ghoul", "creature", "Hungry", location_id, {"hp": 4})
+
+    location = crud.get_location(location_id)
+    assert isinstance(location, Location)
+    assert (location.name, location.properties) == ("Crypt", {"lit": False})
+    assert [entity.name for entity in crud.get_all_locations()] == ["Crypt"]
+
+    [entity] = crud.get_entities_by_location(location_id)
+    assert (entity.entity_type, entity.properties) == ("creature", {"hp": 4})
+    assert crud.get_entities_by_type("npc") == []
+
+
+def test_current_game_state_roundtrip(game_db):
+    assert crud.get_current_game_state() is None
+    crud.create_game_state("intro", {"turn": 1}, {"weather": "fog"})
+    crud.update_game_state("act one", {"turn": 2}, {"weather": "rain"})
+
+    state = crud.get_current_game_state()
+    assert state.plot_progress == "act one"
+    assert state.session_data == {"turn": 2}
+    assert state.world_state == {"weather": "rain"}
@@ -0,0 +1,139 @@
+import pytest
+
+from src.agents.dungeon_master.output_budget import (
+    OPTION_LIST, SCENE_CHANGE, SHORT_REACTION, TURN_TYPE_HINTS, TurnTypeStats, classify_turn, scaled_budget
+)
+from src.agents.dungeon_master.player_input import is_option_request, normalize_input
+from src.utils.llm import LLMClient, trim_to_sentence
+
+
+@pytest.mark.parametrize("player_input", [
+    "What are my options?", "what can I do", "Where should I go?", "Which way?", "I'm stuck", "help me", "any ideas",
+])
+def test_option_requests(player_input):
+    assert classify_turn(player_input) == OPTION_LIST
+
+
+@pytest.mark.parametrize("player_input, turn_type", [
+    ("look around", SHORT_REACTION),
+    ("hmm", SHORT_REACTION),
+    ("", SHORT_REACTION),
+    ("open the heavy door", SCENE_CHANGE),
+    ("What next?", SCENE_CHANGE),
+    ("2", SCENE_CHANGE),
+    ("I examine the old portrait above the fireplace", SHORT_REACTION),
+    ("the portrait above the fireplace seems to watch me", SCENE_CHANGE),
+])
+def test_other_turn_types(player_input, turn_type):
+    assert classify_turn(player_input) == turn_type
+
+
+def test_questions_about_the_scene_are_not_option_requests():
+    assert classify_turn("what do I see") != OPTION_LIST
+
+
+def test_normalize_input():
+    assert normalize_input("I open the door!") == "open the door"
+    assert normalize_input("  What's   NEXT?? ") == "what s next"
+    assert is_option_request(normalize_input("Tell me my options, please"))
+    assert not is_option_request(normalize_input("what do I see"))
+
+
+def test_scaled_budget_never_drops_below_a_sentence():
+    assert scaled_budget(200, 0.5) == 100
+    assert scaled_budget(40, 0.5) == 32
+
+
+def test_turn_type_stats():
+    stats = TurnTypeStats()
+    stats.record(OPTION_LIST, 100, 200.0, truncated=True)
+    stats.record(OPTION_LIST, 50, 100.0, truncated=False)
+    stats.record(SHORT_REACTION, 20, 50.0, truncated=False)
+
+    metrics = stats.get_metrics({OPTION_LIST: 160})
+    assert metrics[OPTION_LIST] == {
+        "turns": 2, "share": pytest.approx(2 / 3), "budget": 160,
+        "output_tokens_mean": 75.0, "latency_ms_mean": 150.0, "truncation_rate": 0.5,
+    }
+    assert metrics[SCENE_CHANGE]["turns"] == 0 and metrics[SCENE_CHANGE]["share"] == 0.0
+    assert metrics[SHORT_REACTION]["budget"] is None
+
+
+@pytest.mark.parametrize("text, trimmed", [
+    ("The bell tolls. The crows rise from the", "The bell tolls."),
+    ('He whispers, "Run!" and then the', 'He whispers, "Run!"'),
+    ("> Open the door?\n> Climb the sta", "> Open the door?"),
+    ("No sentence ends here", "No sentence ends here"),
+    ("Wait... it moves", "Wait..."),
+    ("", ""),
+])
+def test_trim_to_sentence(text, trimmed):
+    assert trim_to_sentence(text) == trimmed
+
+
+def test_generate_trims_replies_that_hit_the_cap(stub_llm):
+    client = LLMClient(task="narration")
+    client.client.responses["narration"] = ["The bell tolls. The crows rise from the tower and circle the keep."]
+
+    assert client.generate(prompt="Player says: wait", max_tokens=8) == "The bell tolls."
+    assert client.last_call()["truncated"]
+
+    assert client.generate(prompt="Player says: wait", max_tokens=200).endswith("circle the keep.")
+    assert not client.last_call()["truncated"]
+
+
+def test_dm_asks_for_the_turn_type_length(dm, monkeypatch):
+    calls = []
+    generate = dm.llm_client.client.generate
+    monkeypatch.setattr(
+        dm.llm_client.client, "generate",
+        lambda system_prompt, messages, prompt, *args, **kwargs: calls.append((prompt, args)) or generate(system_prompt, messages, prompt, *args, **kwargs)
+    )
+
+    dm._generate_response("What are my options?")
+
+    prompt, (_, max_tokens, _) = calls[0]
+    assert f"Length: {TURN_TYPE_HINTS[OPTION_LIST]}" in prompt
+    assert max_tokens == dm._output_budget(OPTION_LIST)
+    assert dm.get_output_budget_metrics()[OPTION_LIST]["turns"] == 1
+
+
+def test_side_call_sites_read_their_budgets_and_report_truncation(dm, monkeypatch):
+    from src.agents.dungeon_master import dm as dm_module
+
+    monkeypatch.setattr(dm_module, "WORLD_EXTRACTION", True)
+    monkeypatch.setitem(dm_module.OUTPUT_TOKEN_BUDGETS, "story_summary", 40)
+    max_tokens = []
+    # A provider that always writes until it is cut off
+    monkeypatch.setattr(
+        dm.summary_llm_client.client, "generate",
+        lambda system_prompt, messages, prompt, temperature, limit, stop=None: max_tokens.append(limit) or ("The castle sleeps. " * 50)[:limit * 4]
+    )
+    dm.turn_count = 5
+    dm.conversation_history = [{"role": "user", "content": "look"}, {"role": "assistant", "content": "Dark."}]
+
+    graph = dm._build_turn_agents()
+    assert graph.agents["world_extractor"].max_tokens == dm._output_budget("world_extractor")
+    dm._start_turn_agents("look around", "Dark.")
+    dm._agent_run.wait(timeout=5)
+
+    assert max_tokens == [40]
+    metrics = dm.get_output_budget_metrics()
+    summary = metrics["story_summary"]
+    assert (summary["calls"], summary["budget"], summary["output_tokens_mean"], summary["truncation_rate"]) == (1, 40, 40.0, 1.0)
+    assert metrics["world_extractor"]["calls"] == 1
+    assert metrics["plot_reask"]["calls"] == 0
+    assert "narration" not in metrics and OPTION_LIST in metrics
+
+
+def test_cache_variation_is_capped_by_its_budget(dm, monkeypatch):
+    from src.agents.dungeon_master import dm as dm_module
+
+    monkeypatch.setitem(dm_module.OUTPUT_TOKEN_BUDGETS, "cache_variation", 100)
+    calls = []
+    monkeypatch.setattr(dm.summary_llm_client, "generate", lambda **kwargs: calls.append(kwargs) or "Rephrased.")
+
+    dm._vary_response("Short reply.")
+    dm._vary_response("A long reply. " * 100)
+
+    assert [call["max_tokens"] for call in calls] == [53, 100]
@@ -0,0 +1,45 @@
+from collections import deque
+
+import pytest
+
+from src.agents.dungeon_master.plot_scheduler import PlotAdvanceClassifier
+
+POINT = "Find the silver key in the crypt"
+
+
+@pytest.fixture
+def classifier():
+    return PlotAdvanceClassifier(similarity_threshold=0.5)
+
+
+@pytest.mark.parametrize("action, response, advanced", [
+    ("open the gate", "You cannot do that here.", False),
+    ("2", "You climb the stairs.", True),
+    ("I open the coffin", "The lid groans.", True),
+    ("look around", "Dust everywhere.", False),
+    ("I listen carefully", "Silence.", False),
+])
+def test_keyword_decisions(classifier, action, response, advanced):
+    assert classifier.advanced(action, response, POINT) is advanced
+
+
+def test_inconclusive_input_falls_back_to_plot_similarity(classifier):
+    assert classifier.advanced("hum a tune", "The silver key in the crypt glints as you find it", POINT)
+    assert not classifier.advanced("hum a tune", "Wind howls outside", POINT)
+
+
+def test_plot_is_not_extended_above_the_watermark(dm, monkeypatch):
+    monkeypatch.setattr(dm, "_generate_plot_extension", lambda *args: pytest.fail("extended"))
+    update = dm._plan_plot_update("open the door", "It opens.")
+    assert update.advanced and update.new_points == []
+
+
+def test_plot_is_extended_once_the_queue_runs_low(dm):
+    dm.plot_points = deque(["Escape the crypt"])
+    update = dm._plan_plot_update("open the door", "It opens.")
+    assert update.advanced and update.new_points
+
+    dm._update_plot_progression("open the door", "It opens.", update)
+    assert dm.current_plot_index == 1
+    assert list(dm.plot_points) == update.new_points
+    assert list(dm.completed_plot_points) == ["Escape the crypt"]
@@ -0,0 +1,29 @@
+def test_prepare_turn_leaves_the_session_untouched(dm):
+    prepared = dm.prepare_turn("begin")
+
+    assert prepared.response
+    assert (prepared.turn, dm.turn_count, dm.conversation_history) == (0, 0, [])
+
+
+def test_commit_prepared_turn_records_the_exchange(dm):
+    prepared = dm.prepare_turn_async("begin").result(timeout=5)
+
+    assert dm.commit_prepared_turn(prepared) == prepared.response
+    assert dm.turn_count == 1
+    assert dm.conversation_history == [
+        {"role": "user", "content": "begin"},
+        {"role": "assistant", "content": prepared.response}
+    ]
+
+
+def test_stale_prepared_turn_is_regenerated(dm):
+    prepared = dm.prepare_turn("begin")
+    dm.respond_to_player("look around")
+
+    response = dm.commit_prepared_turn(prepared)
+
+    assert dm.turn_count == 2
+    assert dm.conversation_history[-2:] == [
+        {"role": "user", "content": "begin"},
+        {"role": "assistant", "content": response}
+    ]
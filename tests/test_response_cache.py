@@ -0,0 +1,76 @@
+import pytest
+
+from src.agents.dungeon_master import dm as dm_module
+from src.agents.dungeon_master.response_cache import ResponseCache, state_key
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(similarity_threshold=0.8, max_entries=2)
+
+
+def test_state_key_is_stable_and_distinguishes_parts():
+    assert state_key("Find the key", 3) == state_key("Find the key", 3)
+    assert state_key("Find the key", 3) != state_key("Find the key", 4)
+    assert state_key("a", "b") != state_key("ab")
+
+
+def test_exact_and_semantic_hits_in_the_same_state(cache):
+    cache.store("Look around.", "s1", "Cobwebs everywhere.", latency=1.0)
+    assert cache.lookup("look around", "s1").response == "Cobwebs everywhere."
+    assert cache.lookup("look around now", "s1").response == "Cobwebs everywhere."
+    assert cache.lookup("look around", "s2") is None
+
+    metrics = cache.get_metrics()
+    assert (metrics["exact_hits"], metrics["semantic_hits"], metrics["misses"]) == (1, 1, 1)
+
+
+def test_option_numbers_are_never_cached(cache):
+    cache.store("2", "s1", "You climb.", latency=1.0)
+    assert cache.lookup("2", "s1") is None
+    assert cache.get_metrics()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.store("look", "s1", "A", 1.0)
+    cache.store("listen", "s1", "B", 1.0)
+    cache.lookup("look", "s1")
+    cache.store("wait", "s1", "C", 1.0)
+    assert cache.lookup("listen", "s1") is None
+    assert cache.lookup("look", "s1").response == "A"
+
+
+def test_saved_latency_and_invalidation(cache):
+    cache.store("look", "s1", "A", latency=1.5)
+    cache.record_saved(cache.lookup("look", "s1"), serve_latency=0.5)
+    cache.invalidate()
+    metrics = cache.get_metrics()
+    assert (metrics["latency_saved"], metrics["invalidations"], metrics["entries"]) == (1.0, 1, 0)
+
+
+def test_response_state_depends_only_on_plot_point_and_location(dm):
+    dm.response_cache.store("look around", dm._response_state(), "Dark.", 1.0)
+    state = dm._response_state()
+
+    dm.plot_points.append("A newly planned plot point")
+    assert dm._response_state() == state
+    assert dm.response_cache.get_metrics()["entries"] == 1
+
+    location_id = dm.world.create_location("Crypt", "Damp")
+    dm.world.set_player_location(location_id)
+    assert dm._response_state() != state
+    assert dm.response_cache.get_metrics()["entries"] == 0
+
+
+def test_repeated_input_is_served_from_cache(dm, monkeypatch):
+    monkeypatch.setattr(dm_module, "WORLD_EXTRACTION", False)
+    calls = []
+    generate = dm.llm_client.generate
+    monkeypatch.setattr(dm.llm_client, "generate", lambda **kwargs: calls.append(1) or generate(**kwargs))
+
+    first = dm.respond_to_player("look around")
+    second = dm.respond_to_player("Look around!")
+
+    assert second == first
+    assert len(calls) == 1
+    assert dm.get_cache_metrics()["exact_hits"] == 1
@@ -0,0 +1,73 @@
+import pytest
+
+from src.agents.dungeon_master.retrieval_gate import REUSE, SEARCH, SKIP, RetrievalGate
+
+
+@pytest.fixture
+def gate():
+    return RetrievalGate(min_collection_size=5, min_input_words=2, drift_threshold=0.8, audit_every=2)
+
+
+def _reasons(gate, *inputs, collection_size=50, has_previous=True):
+    return [(d.mode, d.reason) for d in (gate.decide(text, collection_size, has_previous) for text in inputs)]
+
+
+def test_empty_collection_skips_retrieval(gate):
+    assert _reasons(gate, "search the crypt", collection_size=0) == [(SKIP, "empty_collection")]
+
+
+def test_cheap_signals_reuse_the_previous_results(gate):
+    assert _reasons(gate, "2", "Yes!", "run", "search the crypt", collection_size=3) == [
+        (REUSE, "option_number"), (REUSE, "continuation"), (REUSE, "short_input"), (REUSE, "small_collection")
+    ]
+
+
+def test_without_previous_results_every_turn_searches(gate):
+    assert _reasons(gate, "yes", "2", has_previous=False) == [(SEARCH, "no_previous"), (SEARCH, "no_previous")]
+
+
+def test_drift_is_measured_against_the_last_searched_query(gate):
+    assert _reasons(
+        gate,
+        "examine the ruined chapel",
+        "examine the ruined chapel closely",
+        "ask the gravekeeper about the stones",
+        "ask the gravekeeper about the stones again",
+    ) == [(SEARCH, "no_previous"), (REUSE, "same_topic"), (SEARCH, "topic_drift"), (REUSE, "same_topic")]
+
+
+def test_audits_run_every_nth_gated_turn_and_report_overlap(gate):
+    gate.decide("yes", 50, True)
+    assert not gate.should_audit()
+    gate.decide("2", 50, True)
+    assert gate.should_audit()
+
+    gate.record_audit(["a", "b"], ["a", "c"])
+    gate.record_audit([], [])
+    metrics = gate.get_metrics()
+    assert metrics["audits"] == 2
+    assert metrics["audit_overlap"] == pytest.approx((1 / 3 + 1) / 2)
+    assert metrics["skip_rate"] == 1.0
+    assert metrics["reasons"] == {"continuation": 1, "option_number": 1}
+
+
+def test_metrics_before_any_turn(gate):
+    metrics = gate.get_metrics()
+    assert (metrics["skip_rate"], metrics["audit_overlap"]) == (0.0, None)
+
+
+def test_dm_reuses_the_last_search_for_continuations(dm, monkeypatch):
+    dm.retrieval_gate = RetrievalGate(min_collection_size=0, min_input_words=2, drift_threshold=0.8, audit_every=0)
+    searches = []
+    search = dm._search_context
+    monkeypatch.setattr(dm, "_search_context", lambda query, sizes: searches.append(query) or search(query, sizes))
+
+    documents, _ = dm._retrieve_context("look at the ruined chapel", (2, 1), gated=True)
+    assert documents
+    assert dm._retrieve_context("yes", (2, 1), gated=True)[0] == documents
+    assert searches == ["look at the ruined chapel"]
+
+    # Results retrieved at another context size are not reused, and ungated calls always search
+    dm._retrieve_context("yes", (1, 1), gated=True)
+    dm._retrieve_context("yes", (1, 1), gated=False)
+    assert searches == ["look at the ruined chapel", "yes", "yes"]
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from src.agents.runtime import CANCELLED, DONE, FAILED, SKIPPED, Agent, AgentGraph, AgentRunner
+
+
+class FnAgent(Agent):
+    def __init__(self, name, fn, inputs=(), outputs=(), should_run=True):
+        self.name, self.fn, self.inputs, self.outputs = name, fn, inputs, outputs
+        self._should_run = should_run
+
+    def should_run(self, inputs):
+        return self._should_run
+
+    def run(self, inputs, ctx):
+        return self.fn(inputs, ctx)
+
+
+def _wait_for_cancel(inputs, ctx):
+    while True:
+        ctx.check()
+        time.sleep(0.005)
+
+
+def _settle(run, timeout=2.0):
+    """Wait for a run past its deadline, which TurnRun.wait() stops at"""
+    end = time.monotonic() + timeout
+    while not run.done() and time.monotonic() < end:
+        time.sleep(0.005)
+    return run.done()
+
+
+@pytest.fixture
+def runner():
+    runner = AgentRunner(max_workers=4)
+    yield runner
+    runner.shutdown()
+
+
+def test_agent_is_abstract():
+    with pytest.raises(TypeError):
+        Agent()
+
+
+@pytest.mark.parametrize("agents, message", [
+    ([FnAgent("a", None), FnAgent("a", None)], "unique"),
+    ([FnAgent("a", None, outputs=("x",)), FnAgent("b", None, outputs=("x",))], "more than once"),
+    ([FnAgent("a", None, inputs=("missing",))], "no producer"),
+    ([FnAgent("a", None, inputs=("y",), outputs=("x",)), FnAgent("b", None, inputs=("x",), outputs=("y",))], "cycle"),
+])
+def test_invalid_graphs_are_rejected(agents, message):
+    with pytest.raises(ValueError, match=message):
+        AgentGraph(agents)
+
+
+def test_outputs_flow_downstream(runner):
+    graph = AgentGraph([
+        FnAgent("double", lambda i, ctx: {"doubled": i["n"] * 2}, inputs=("n",), outputs=("doubled",)),
+        FnAgent("label", lambda i, ctx: {"label": f"got {i['doubled']}"}, inputs=("doubled",), outputs=("label",)),
+    ], provided=("n",))
+    run = runner.run(graph, {"n": 21}, turn=1, deadline=5)
+
+    assert run.wait()
+    assert run.status == {"double": DONE, "label": DONE}
+    assert run.results("label") == {"label": "got 42"}
+
+
+def test_failed_or_idle_agents_skip_their_dependents(runner):
+    def fail(inputs, ctx):
+        raise RuntimeError("boom")
+
+    graph = AgentGraph([
+        FnAgent("broken", fail, outputs=("a",)),
+        FnAgent("after_broken", lambda i, ctx: {}, inputs=("a",)),
+        FnAgent("idle", None, outputs=("b",), should_run=False),
+        FnAgent("after_idle", lambda i, ctx: {}, inputs=("b",)),
+    ])
+    run = runner.run(graph, {}, turn=1, deadline=5)
+
+    assert run.wait()
+    assert run.status == {"broken": FAILED, "after_broken": SKIPPED, "idle": SKIPPED, "after_idle": SKIPPED}
+    assert run.results("broken") is None
+
+
+def test_deadline_cancels_running_agents(runner):
+    graph = AgentGraph([
+        FnAgent("slow", _wait_for_cancel, outputs=("x",)),
+        FnAgent("after", lambda i, ctx: {}, inputs=("x",)),
+    ])
+    run = runner.run(graph, {}, turn=1, deadline=0.05)
+
+    assert _settle(run)
+    assert run.status == {"slow": CANCELLED, "after": CANCELLED}
+
+
+def test_cancel_discards_unfinished_agents(runner):
+    started = threading.Event()
+
+    def slow(inputs, ctx):
+        started.set()
+        _wait_for_cancel(inputs, ctx)
+
+    graph = AgentGraph([
+        FnAgent("quick", lambda i, ctx: {"q": 1}, outputs=("q",)),
+        FnAgent("slow", slow, outputs=("s",)),
+    ])
+    run = runner.run(graph, {}, turn=1, deadline=30)
+    assert started.wait(2)
+    run.cancel()
+
+    assert _settle(run)
+    assert run.status["slow"] == CANCELLED
+    assert run.results("slow") is None
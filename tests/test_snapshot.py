@@ -0,0 +1,152 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.db import crud
+from src.db.vector_store import NumpyVectorStore
+from src.world import snapshot
+from src.world.snapshot import (
+    SNAPSHOT_FORMAT, build_snapshot, content_hash, find_snapshot, install_sqlite, load_snapshot, source_digests
+)
+from tests.conftest import LORE
+
+
+@pytest.fixture
+def lore_path(tmp_path):
+    path = tmp_path / "lore.txt"
+    path.write_text(LORE)
+    return path
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    return tmp_path / "snapshots"
+
+
+def test_content_hash_follows_the_lore(lore_path):
+    before = content_hash(source_digests(lore_path))
+    assert before == content_hash(source_digests(lore_path))
+    lore_path.write_text(LORE + "\nA wolf howls beyond the wall.\n")
+    assert content_hash(source_digests(lore_path)) != before
+    assert "src/world/chunker.py" in source_digests(lore_path)
+
+
+def test_build_is_skipped_while_the_sources_are_unchanged(lore_path, snapshot_dir):
+    built, was_built = build_snapshot(lore_path, snapshot_dir)
+    assert was_built
+    assert built.path == snapshot_dir / built.content_hash
+    assert built.db_path.exists() and (built.prompts_path / "system").is_dir()
+
+    store = NumpyVectorStore(built.vectors_path, read_only=True)
+    assert store.count() == built.manifest["chunks"] > 0
+    assert store.dim == built.manifest["dim"]
+
+    again, was_built = build_snapshot(lore_path, snapshot_dir)
+    assert not was_built and again.content_hash == built.content_hash
+    assert build_snapshot(lore_path, snapshot_dir, force=True)[1]
+    assert not list(snapshot_dir.glob(".*.tmp"))
+
+
+def test_find_snapshot_matches_the_current_sources(lore_path, snapshot_dir):
+    assert find_snapshot(lore_path, snapshot_dir) is None
+    built, _ = build_snapshot(lore_path, snapshot_dir)
+    assert find_snapshot(lore_path, snapshot_dir).content_hash == built.content_hash
+
+    lore_path.write_text(LORE + "\nA wolf howls beyond the wall.\n")
+    assert find_snapshot(lore_path, snapshot_dir) is None
+    assert find_snapshot(lore_path.with_name("missing.txt"), snapshot_dir) is None
+
+
+def test_load_snapshot_rejects_incomplete_or_other_format(tmp_path):
+    assert load_snapshot(tmp_path / "missing") is None
+    (tmp_path / "manifest.json").write_text(json.dumps({"format": SNAPSHOT_FORMAT + 1, "hash": "x"}))
+    assert load_snapshot(tmp_path) is None
+    (tmp_path / "manifest.json").write_text("{not json")
+    assert load_snapshot(tmp_path) is None
+
+
+def test_old_snapshots_are_pruned(lore_path, snapshot_dir):
+    hashes = []
+    for n in range(3):
+        lore_path.write_text(LORE + f"\nVersion {n}.\n")
+        built, _ = build_snapshot(lore_path, snapshot_dir, keep=2)
+        hashes.append(built.content_hash)
+        # Manifests written in the same tick would tie on mtime
+        os.utime(built.path / "manifest.json", (n, n))
+
+    assert sorted(path.name for path in snapshot_dir.iterdir()) == sorted(hashes[1:])
+
+
+def test_install_sqlite_copies_once_and_keeps_existing_rows(lore_path, snapshot_dir, game_db):
+    built, _ = build_snapshot(lore_path, snapshot_dir)
+    fresh = game_db.with_name("fresh.db")
+    assert install_sqlite(built, fresh)
+    assert fresh.with_name("fresh.db.snapshot").read_text() == built.content_hash
+    assert not install_sqlite(built, fresh)
+
+    # An existing database is migrated in place rather than replaced
+    crud.create_location("Crypt", "Damp stone")
+    assert not install_sqlite(built, game_db)
+    assert [location.name for location in crud.get_all_locations()] == ["Crypt"]
+    assert game_db.with_name("game.db.snapshot").exists()
+
+
+def test_disabled_snapshots_fall_back_to_the_source_prompts(monkeypatch):
+    monkeypatch.setattr(snapshot, "WORLD_SNAPSHOT", False)
+    assert snapshot.active_snapshot() is None
+    assert snapshot.prompts_dir() == snapshot.PROMPTS_DIR
+
+
+def test_snapshot_vectors_are_the_normalized_lore_embeddings(lore_path, snapshot_dir):
+    from src.db.embeddings import embed_texts
+
+    built, _ = build_snapshot(lore_path, snapshot_dir)
+    store = NumpyVectorStore(built.vectors_path, read_only=True)
+    records = store.get(include=["documents", "embeddings"])
+    live = embed_texts(records["documents"])
+    assert np.allclose(records["embeddings"], live / np.linalg.norm(live, axis=1, keepdims=True))
+
+
+@pytest.fixture
+def default_lore_snapshot(tmp_path, monkeypatch, lore_path, snapshot_dir, game_db, memory_store):
+    """A snapshot of lore_path, which World treats as the default lore, with the store reopened per World"""
+    from src.db import vector_store
+    from src.world import world as world_module
+
+    built, _ = build_snapshot(lore_path, snapshot_dir)
+    monkeypatch.setattr(world_module, "LORE_PATH", lore_path)
+    monkeypatch.setattr(world_module, "active_snapshot", lambda: built)
+    monkeypatch.setattr(world_module, "install_sqlite", lambda snapshot: False)
+    monkeypatch.setattr(vector_store, "_store", None)
+    monkeypatch.setattr(vector_store, "_store_base", None)
+    monkeypatch.setattr(vector_store, "VECTOR_STORE_PATH", tmp_path / "session-vectors")
+    return built
+
+
+def _lore(world):
+    return [memory["document"] for memory in world.search_memories("chapel gravekeeper wolf", 10, memory_type="world_context")]
+
+
+def test_only_a_world_on_the_default_lore_uses_the_snapshot_vectors(tmp_path, default_lore_snapshot, lore_path):
+    from src.db.vector_store import LayeredVectorStore
+    from src.world.world import World
+
+    world = World(str(lore_path))
+    try:
+        assert isinstance(world.vector_store, LayeredVectorStore)
+        assert any("Ashgrove" in document for document in _lore(world))
+    finally:
+        world.close()
+
+    other_lore = tmp_path / "other.txt"
+    other_lore.write_text("A wolf pack circles the frozen lake.\n")
+    crud.clear_episodic_memory()
+    world = World(str(other_lore))
+    try:
+        assert not isinstance(world.vector_store, LayeredVectorStore)
+        lore = _lore(world)
+        assert lore and all("Ashgrove" not in document for document in lore)
+    finally:
+        world.close()
@@ -0,0 +1,59 @@
+import pytest
+
+from src.agents.dungeon_master.speculation import SpeculativeResponder, extract_options
+
+
+@pytest.fixture
+def responder():
+    responder = SpeculativeResponder(
+        generate_fn=lambda option: f"You {option.lower()}.",
+        max_options=3,
+        token_budget=1000,
+        similarity_threshold=0.8,
+        expected_response_tokens=100
+    )
+    yield responder
+    responder.shutdown()
+
+
+RESPONSE = """The corridor splits.
+> Take the left passage?
+> Climb the rusted ladder
+> What do you do?
+"""
+
+
+def test_extract_options_skips_the_closing_question():
+    assert extract_options(RESPONSE) == ["Take the left passage", "Climb the rusted ladder"]
+
+
+def test_take_matches_by_option_number(responder):
+    responder.speculate(1, extract_options(RESPONSE))
+    assert responder.take(1, "2") == "You climb the rusted ladder."
+    assert responder.get_metrics()["hits"] == 1
+
+
+def test_take_matches_normalized_and_similar_text(responder):
+    responder.speculate(1, ["Take the left passage"])
+    assert responder.take(1, "take the LEFT passage!") == "You take the left passage."
+
+    responder.speculate(2, ["Climb the rusted ladder"])
+    assert responder.take(2, "climb the rusted ladder now") == "You climb the rusted ladder."
+
+
+def test_unrelated_input_or_stale_turn_is_a_miss(responder):
+    responder.speculate(1, ["Take the left passage"])
+    assert responder.take(1, "sing a song") is None
+
+    responder.speculate(1, ["Take the left passage"])
+    assert responder.take(2, "1") is None
+
+    metrics = responder.get_metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["hit_rate"]) == (0, 1, 0.0)
+
+
+def test_token_budget_limits_speculated_options(responder):
+    responder.token_budget = 250
+    responder.speculate(1, ["one", "two", "three"])
+    assert responder.get_metrics()["speculated"] == 2
+    assert responder.take(1, "3") is None
@@ -0,0 +1,47 @@
+import pytest
+
+from src.utils.structured import parse_plot_lines, parse_plot_points
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"plot_points": ["A door opens", "Wolves howl"]}', ["A door opens", "Wolves howl"]),
+    ('Sure!\n```json\n{"plot_points": ["1. A door opens", "- Wolves howl"]}\n```', ["A door opens", "Wolves howl"]),
+    ('{"plot_points": ["a", "b", "c", "d"]}', ["a", "b", "c"]),
+])
+def test_parse_plot_points_accepts_valid_replies(text, expected):
+    assert parse_plot_points(text, 3) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "1. A door opens",
+    '{"points": ["A door opens"]}',
+    '{"plot_points": [1, 2]}',
+    '{"plot_points": ["  "]}',
+    '["A door opens"]',
+])
+def test_parse_plot_points_rejects_off_schema_replies(text):
+    assert parse_plot_points(text, 3) is None
+
+
+def test_parse_plot_lines_strips_numbering_and_preambles():
+    text = "Here are the next plot points:\n\n1. A door opens\n2) Wolves howl\n* The bell tolls"
+    assert parse_plot_lines(text, 2) == ["A door opens", "Wolves howl"]
+
+
+def _replies(dm, monkeypatch, *replies):
+    queue = list(replies)
+    monkeypatch.setattr(dm.plot_llm_client, "generate_json", lambda **kwargs: queue.pop(0))
+
+
+def test_unparseable_plot_reply_is_reasked_once(dm, monkeypatch):
+    _replies(dm, monkeypatch, "1. A door opens", '{"plot_points": ["A door opens"]}')
+    assert dm._generate_plot_extension("situation", "open", [], {}, 2) == ["A door opens"]
+    metrics = dm.get_plot_parse_metrics()
+    assert (metrics["reasked"], metrics["reask_parsed"], metrics["fallback"]) == (1, 1, 0)
+    assert metrics["extra_tokens"] > 0
+
+
+def test_failed_reask_falls_back_to_line_parsing(dm, monkeypatch):
+    _replies(dm, monkeypatch, "1. A door opens\n2. Wolves howl", "still not json")
+    assert dm._generate_plot_extension("situation", "open", [], {}, 2) == ["A door opens", "Wolves howl"]
+    assert dm.get_plot_parse_metrics()["fallback"] == 1
@@ -0,0 +1,44 @@
+import json
+
+from src.utils.scripted_player import percentile, run_scripted_session
+from src.utils.stub_llm import StubLLM
+
+
+def test_narration_is_deterministic_and_echoes_the_player():
+    stub = StubLLM(responses_path=None)
+    stub.responses["narration"] = ["You {player_input}."]
+    prompt = "Context: crypt\n\nPlayer says: light the candle!"
+    assert stub.generate(None, None, prompt, 0.8, None) == "You light the candle."
+    assert stub.generate(None, None, prompt, 0.8, None) == stub.generate(None, None, prompt, 0.2, None)
+
+
+def test_stop_sequences_and_max_tokens_cut_the_output():
+    stub = StubLLM()
+    stub.responses["narration"] = ["The bell tolls.\nPlayer: ring it again and again and again"]
+    assert stub.generate(None, None, "Player says: wait", 0.8, None, stop=["\nPlayer:"]) == "The bell tolls."
+    assert stub.generate(None, None, "Player says: wait", 0.8, 2) == "The bell"
+
+
+def test_prompt_kinds_and_overrides(tmp_path):
+    path = tmp_path / "responses.json"
+    path.write_text(json.dumps({"summary": ["Merged."], "plot_points": ["Only point"]}))
+    stub = StubLLM(responses_path=str(path))
+
+    assert "Say 'start'" in stub.generate(None, None, "Create a brief opening scene", 0.8, None)
+    assert stub.generate(None, None, "Merge these related memories", 0.2, None) == "Merged."
+    assert json.loads(stub.generate_json({}, "plot_points", None, "more", 0.8, None)) == {"plot_points": ["Only point"]}
+    assert json.loads(stub.generate_json({}, "world_facts", None, "x", 0.0, None))["player_location"] == "Castle Gates"
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile(list(range(1, 11)), 90) == 9
+
+
+def test_scripted_session_reports_every_turn(dm):
+    report = run_scripted_session(dm, 4, ["look around", "open the door"])
+    assert report["turns"] == 4
+    assert dm.turn_count == 4
+    assert report["turn_latency_ms"]["p50"] > 0
+    assert report["plot_status"]["total_points"] >= 5
@@ -0,0 +1,41 @@
+import pytest
+
+from src.utils import llm
+from src.utils.llm import LLMClient, resolve_task_route
+
+
+@pytest.fixture
+def routes(stub_llm, monkeypatch):
+    routes = {"narration": None, "plot": "stub:tiny-model", "summary": " STUB "}
+    monkeypatch.setattr(llm, "LLM_TASK_ROUTES", routes)
+    return routes
+
+
+def test_resolve_task_route(routes):
+    assert resolve_task_route("plot") == ("stub", "tiny-model")
+    assert resolve_task_route("summary") == ("stub", None)
+    assert resolve_task_route("narration") == (None, None)
+    assert resolve_task_route(None) == (None, None)
+
+
+def test_routed_task_uses_its_provider_and_model(routes, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_PROVIDER", "gemini")
+    client = LLMClient(task="plot")
+    assert (client.provider, client.model) == ("stub", "tiny-model")
+
+
+def test_unrouted_task_uses_the_default_provider(routes):
+    client = LLMClient(task="narration")
+    assert client.provider == "stub"
+    assert client.model == llm.LLM_MODELS.get("stub")
+
+
+def test_explicit_provider_overrides_the_route(routes, monkeypatch):
+    monkeypatch.setattr(llm, "LOCAL_LLM_BASE_URL", "http://localhost:9/v1")
+    client = LLMClient(provider="local", task="plot")
+    assert (client.provider, client.model) == ("local", llm.LLM_MODELS["local"])
+
+
+def test_unknown_provider_is_rejected(stub_llm):
+    with pytest.raises(ValueError):
+        LLMClient(provider="carrier-pigeon")
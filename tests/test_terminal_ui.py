@@ -0,0 +1,112 @@
+import io
+import sys
+
+from src.utils.terminal_ui import IncrementalWrapper, TerminalUI
+
+
+class FakeTTY(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def isatty(self):
+        return True
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_animate_text_prints_plainly_when_not_a_tty(capsys):
+    TerminalUI().animate_text("The candle dies.")
+    assert capsys.readouterr().out == "The candle dies.\n"
+
+
+def test_animate_text_writes_per_frame_not_per_character(monkeypatch):
+    tty = FakeTTY()
+    monkeypatch.setattr(sys, "stdout", tty)
+    text = "Something scratches at the inside of the coffin lid. " * 2
+
+    TerminalUI().animate_text(text, delay=0.001, fps=30)
+
+    assert tty.getvalue() == text + "\n"
+    assert tty.writes < len(text) / 4
+
+
+def test_print_box_keeps_the_text_layout(capsys):
+    ui = TerminalUI()
+    ui.terminal_width = 100
+    ui.print_box("Player:  Mina\n\nTurns:   3")
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].startswith("│ Player:  Mina ")
+    assert lines[2].strip("│ ") == ""
+    assert lines[3].startswith("│ Turns:   3 ")
+    assert len({len(line) for line in lines}) == 1
+
+
+def _wrap(width, *chunks):
+    wrapper = IncrementalWrapper(width)
+    lines = []
+    for chunk in chunks:
+        lines.extend(wrapper.feed(chunk))
+    return lines + wrapper.finish()
+
+
+def test_wrapper_lines_do_not_depend_on_chunking():
+    text = "The  gravekeeper   lifts his lantern.\n  Shadows stretch across the stones.\n\nNothing moves."
+    whole = _wrap(20, text)
+    assert whole == _wrap(20, *text) == _wrap(20, text[:7], text[7:31], text[31:])
+    assert whole == [
+        "The  gravekeeper", "lifts his lantern.", "  Shadows stretch", "across the stones.", "", "Nothing moves.",
+    ]
+
+
+def test_wrapper_splits_words_longer_than_a_line():
+    assert _wrap(5, "a abcdefghijkl b") == ["a", "abcde", "fghij", "kl b"]
+
+
+def test_wrapper_returns_lines_as_soon_as_they_complete():
+    wrapper = IncrementalWrapper(10)
+    assert wrapper.feed("The bell to") == []
+    assert wrapper.current_line == "The bell to"[:10]
+    assert wrapper.feed("lls again") == ["The bell"]
+    assert wrapper.current_line == "tolls agai"
+
+
+def _rows(drawn):
+    """What is left on screen: each row as last redrawn after a carriage return"""
+    return [row.rsplit("\r", 1)[-1] for row in drawn.split("\n")[:-1]]
+
+
+def test_stream_box_draws_a_fixed_width_frame_per_interval(monkeypatch):
+    tty = FakeTTY()
+    monkeypatch.setattr(sys, "stdout", tty)
+    ui = TerminalUI()
+    ui.terminal_width = 80
+    text = "Something scratches at the inside of the coffin lid. " * 6
+
+    assert ui.stream_box(list(text), fps=1e-9) == text
+
+    rows = _rows(tty.getvalue())
+    assert len({len(row) for row in rows}) == 1
+    assert " ".join(row.strip("│ ") for row in rows[1:-1]) == text.strip()
+    # One frame for the first chunk, one at the end, plus the borders
+    assert tty.writes == 4
+
+
+def test_show_dm_response_prints_plain_text_when_not_a_tty(capsys):
+    TerminalUI().show_dm_response("The candle dies.  Darkness.")
+    assert capsys.readouterr().out == "\n🌙 DUNGEON MASTER:\nThe candle dies.  Darkness.\n\n"
+
+
+def test_show_dm_response_types_into_the_box(monkeypatch):
+    tty = FakeTTY()
+    monkeypatch.setattr(sys, "stdout", tty)
+    text = "Wolves howl beyond the castle wall."
+
+    TerminalUI().show_dm_response(text, delay=0.0005)
+
+    rows = _rows(tty.getvalue())
+    assert rows[-3].startswith(f"│ {text} ")
+    assert rows[-2].startswith("└")
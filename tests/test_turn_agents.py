@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+
+from src.agents.runtime import DONE, SKIPPED
+from src.agents.turn_agents import MemorySummarizerAgent, PlotPlannerAgent
+
+
+def test_plot_planner_runs_below_the_watermark():
+    planner = PlotPlannerAgent(lambda situation, action, points, state, count: ["x"] * count, batch_size=3, low_watermark=2)
+    assert planner.should_run({"plot_points": ["a"]})
+    assert not planner.should_run({"plot_points": ["a", "b"]})
+    inputs = {"situation": "", "player_action": "", "plot_points": [], "world_state": {}}
+    assert planner.run(inputs, None) == {"new_plot_points": ["x", "x", "x"]}
+
+
+def test_memory_summarizer_runs_every_interval():
+    summarizer = MemorySummarizerAgent(None, "", interval=5, max_tokens=200)
+    history = [{"role": "user", "content": "hi"}]
+    assert summarizer.should_run({"turn": 10, "recent_history": history})
+    assert not summarizer.should_run({"turn": 11, "recent_history": history})
+    assert not summarizer.should_run({"turn": 10, "recent_history": []})
+
+
+def test_next_turn_applies_the_planned_plot_points(dm):
+    dm.plot_points = deque(["Escape the crypt"])
+    dm.turn_count = 5
+    dm.conversation_history = [{"role": "user", "content": "look"}, {"role": "assistant", "content": "Dark."}]
+    dm._start_turn_agents("look around", "Dark.")
+    run = dm._agent_run
+    run.wait(timeout=5)
+
+    dm._collect_turn_agents()
+
+    assert run.status["plot_planner"] == DONE
+    assert len(dm.plot_points) > 1 and dm.plot_points[0] == "Escape the crypt"
+    assert run.status["memory_summarizer"] == DONE
+    assert dm.story_summary
+
+
+def test_agents_skip_when_there_is_nothing_to_do(dm):
+    dm.turn_count = 1
+    dm._start_turn_agents("look around", "Dark.")
+    run = dm._agent_run
+    run.wait(timeout=5)
+
+    assert run.status["plot_planner"] == SKIPPED
+    assert run.status["memory_summarizer"] == SKIPPED
+
+
+def test_plot_planner_plans_from_the_snapshot_it_was_given(dm, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    episodic_context = dm.world.get_episodic_context
+    calls = []
+
+    def slow_context(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return episodic_context(*args, **kwargs)
+
+    generate_json = dm.plot_llm_client.generate_json
+    monkeypatch.setattr(dm.world, "get_episodic_context", slow_context)
+    monkeypatch.setattr(dm.plot_llm_client, "generate_json", lambda **kwargs: calls.append(kwargs) or generate_json(**kwargs))
+    dm.plot_points = deque(["Escape the crypt"])
+    dm._start_turn_agents("look around", "Dark.")
+
+    # The turn moves on while the planner is still gathering context
+    assert started.wait(5)
+    dm.plot_points.clear()
+    dm.plot_points.extend(["Changed", "Queue"])
+    release.set()
+    dm._agent_run.wait(timeout=5)
+
+    assert dm._agent_run.status["plot_planner"] == DONE
+    [plot_call] = [call for call in calls if call["call_site"] == "plot_extension"]
+    assert "Current plot points: ['Escape the crypt']" in plot_call["prompt"]
@@ -0,0 +1,58 @@
+from src.db import crud
+from src.utils.llm import LLMClient
+from src.utils.usage import BUDGET_HARD, BUDGET_OK, BUDGET_SOFT, UsageTracker, estimate_cost
+
+
+def test_estimate_cost_uses_per_million_prices():
+    assert estimate_cost("gpt-4", 1_000_000, 500_000) == 60.0
+    assert estimate_cost("stub", 1000, 1000) == 0.0
+    assert estimate_cost(None, 1000, 1000) == 0.0
+
+
+def test_budget_levels_follow_tokens_and_cost(game_db):
+    usage = UsageTracker("s1", soft_budget_tokens=100, hard_budget_tokens=200, hard_budget_usd=1.0)
+    assert usage.budget_level() == BUDGET_OK
+    usage.record("narration", "stub", "stub", 60, 40)
+    assert usage.budget_level() == BUDGET_SOFT
+    usage.record("narration", "stub", "stub", 60, 40)
+    assert usage.budget_level() == BUDGET_HARD
+
+    priced = UsageTracker("s2", hard_budget_usd=1.0)
+    priced.record("narration", "openai", "gpt-4", 20_000, 10_000)
+    assert priced.budget_level() == BUDGET_HARD
+
+
+def test_records_are_buffered_and_summarized(game_db):
+    usage = UsageTracker("s1", flush_every=3)
+    usage.record("narration", "stub", "stub", 10, 5, latency_ms=20)
+    usage.record("plot_extension", "stub", "stub", 30, 15, latency_ms=40)
+    assert crud.get_llm_usage_totals("s1")["input_tokens"] == 0
+    usage.record("narration", "stub", "stub", 10, 5, latency_ms=40)
+    assert crud.get_llm_usage_totals("s1") == {"input_tokens": 50, "output_tokens": 25, "cost_usd": 0.0}
+
+    summary = {row["call_site"]: row for row in usage.summary()}
+    assert (summary["narration"]["calls"], summary["narration"]["avg_latency_ms"]) == (2, 30.0)
+    assert summary["plot_extension"]["input_tokens"] == 30
+
+
+def test_a_resumed_session_keeps_its_totals(game_db):
+    UsageTracker("s1", flush_every=1).record("narration", "stub", "stub", 80, 40)
+    assert UsageTracker("s1", soft_budget_tokens=100).budget_level() == BUDGET_SOFT
+    assert UsageTracker("other", soft_budget_tokens=100).budget_level() == BUDGET_OK
+
+
+def test_client_records_estimated_usage_per_call_site(game_db, stub_llm):
+    usage = UsageTracker("s1", flush_every=1)
+    client = LLMClient(task="narration", usage=usage)
+    client.generate(prompt="Player says: look", call_site="narration")
+
+    [row] = usage.summary()
+    assert (row["call_site"], row["calls"]) == ("narration", 1)
+    assert row["input_tokens"] > 0 and row["output_tokens"] > 0
+
+
+def test_call_site_stats_count_truncated_replies():
+    usage = UsageTracker()
+    usage.record("npc_reactor", "stub", "stub", 10, 60, latency_ms=5, truncated=True)
+    usage.record("npc_reactor", "stub", "stub", 10, 20, latency_ms=15)
+    assert usage.call_site_stats() == {"npc_reactor": {"calls": 2, "output_tokens": 80, "latency_ms": 20.0, "truncated": 1}}
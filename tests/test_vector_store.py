@@ -0,0 +1,138 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.db.vector_store import LayeredVectorStore, NumpyVectorStore, VectorStore
+
+
+def _vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def _fill(store, count, prefix="m", seed=0):
+    ids = [f"{prefix}{n}" for n in range(count)]
+    store.add(ids, [f"doc {n}" for n in range(count)], [{"n": n} for n in range(count)], _vectors(count, seed=seed))
+    return ids
+
+
+def test_vector_store_is_abstract():
+    with pytest.raises(TypeError):
+        VectorStore()
+
+
+def test_query_returns_nearest_rows_like_chroma(tmp_path):
+    store = NumpyVectorStore(tmp_path, initial_capacity=4)
+    _fill(store, 10)
+    query = _vectors(10)[3] * 5
+
+    result = store.query_by_vector(query, 3)
+    assert result["ids"][0][0] == "m3"
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert result["distances"][0] == sorted(result["distances"][0])
+    assert store.query_by_vector(query, 3, where={"n": {"$gte": 5}})["ids"][0][0] != "m3"
+
+
+def test_get_delete_and_upsert(tmp_path):
+    store = NumpyVectorStore(tmp_path)
+    _fill(store, 3)
+    store.delete(["m1", "missing"])
+    store.add(["m2"], ["replaced"], [{"n": 20}], _vectors(1, seed=9))
+
+    assert store.count() == 2
+    result = store.get(include=["documents", "metadatas", "embeddings"])
+    assert result["ids"] == ["m0", "m2"]
+    assert result["documents"] == ["doc 0", "replaced"]
+    assert np.linalg.norm(result["embeddings"][1]) == pytest.approx(1.0)
+    assert store.get(ids=["m1", "m2"], where={"n": 20})["ids"] == ["m2"]
+
+
+def test_reload_replays_adds_and_deletes(tmp_path):
+    store = NumpyVectorStore(tmp_path, initial_capacity=2)
+    _fill(store, 5)
+    store.delete(["m0", "m4"])
+    expected = store.get(include=["documents", "metadatas", "embeddings"])
+    del store
+
+    reloaded = NumpyVectorStore(tmp_path)
+    assert reloaded.get(include=["documents", "metadatas", "embeddings"]) == expected
+    assert reloaded.query_by_vector(_vectors(5)[2], 1)["ids"] == [["m2"]]
+
+
+def test_compaction_reclaims_deleted_rows(tmp_path):
+    store = NumpyVectorStore(tmp_path)
+    ids = _fill(store, 200)
+    store.delete(ids[:150])
+
+    assert store._rows == 50
+    assert store.count() == 50
+    assert not list(tmp_path.glob("*.tmp"))
+    assert store.query_by_vector(_vectors(200)[170], 1)["ids"] == [["m170"]]
+
+    reloaded = NumpyVectorStore(tmp_path)
+    assert reloaded.get()["ids"] == ids[150:]
+    _fill(reloaded, 2, prefix="new")
+    assert reloaded.count() == 52
+
+
+def test_interrupted_compaction_before_the_swap_keeps_the_old_files(tmp_path):
+    store = NumpyVectorStore(tmp_path)
+    _fill(store, 3)
+    del store
+    (tmp_path / "vectors.f32.tmp").write_bytes(b"partial")
+    (tmp_path / "sidecar.jsonl.tmp").write_text("partial")
+
+    reloaded = NumpyVectorStore(tmp_path)
+    assert reloaded.count() == 3
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_interrupted_compaction_after_the_matrix_swap_is_finished(tmp_path):
+    store = NumpyVectorStore(tmp_path)
+    ids = _fill(store, 100)
+    sidecar = (tmp_path / "sidecar.jsonl").read_text()
+    store.delete(ids[:70])
+    compacted = (tmp_path / "sidecar.jsonl").read_text()
+    del store
+    # Crash after the matrix was replaced but before the sidecar was
+    (tmp_path / "sidecar.jsonl.tmp").write_text(compacted)
+    (tmp_path / "sidecar.jsonl").write_text(sidecar)
+
+    reloaded = NumpyVectorStore(tmp_path)
+    assert reloaded.get()["ids"] == ids[70:]
+    assert reloaded.query_by_vector(_vectors(100)[90], 1)["ids"] == [["m90"]]
+
+
+def test_clear_and_read_only(tmp_path):
+    store = NumpyVectorStore(tmp_path / "rw")
+    _fill(store, 3)
+    store.clear()
+    assert store.count() == 0
+    _fill(store, 2)
+    assert store.count() == 2
+
+    read_only = NumpyVectorStore(tmp_path / "rw", read_only=True)
+    assert read_only.count() == 2
+    with pytest.raises(PermissionError):
+        read_only.add(["x"], ["x"], [{}], _vectors(1))
+
+
+def test_layered_store_reads_both_layers_and_writes_the_top(tmp_path):
+    lore = ["The castle stands on a crag", "Wolves circle below", "The count sleeps by day"]
+    NumpyVectorStore(tmp_path / "base").add(["lore0", "lore1", "lore2"], lore, [{}, {}, {}])
+    layered = LayeredVectorStore(NumpyVectorStore(tmp_path / "base", read_only=True), NumpyVectorStore(tmp_path / "top"))
+    layered.add(["mem0"], ["The raven speaks of wolves"], [{}])
+
+    assert layered.count() == 4
+    assert layered.query("wolves circle below", 2)["ids"] == [["lore1", "mem0"]]
+
+    layered.delete(["lore0", "mem0"])
+    layered.clear()
+    assert layered.get()["ids"] == ["lore0", "lore1", "lore2"]
+
+
+def test_numpy_backend_does_not_import_chromadb():
+    code = "import sys, src.db.crud, src.db.embeddings; sys.exit('chromadb' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent).returncode == 0
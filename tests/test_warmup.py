@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from src.utils.warmup import WarmupPipeline
+
+
+def test_stages_run_in_order_and_see_earlier_results():
+    pipeline = (
+        WarmupPipeline()
+        .add_stage("db", "Opening the crypt", lambda results: "connected")
+        .add_stage("scene", "Lighting candles", lambda results: results["db"] + " + scene")
+        .start()
+    )
+    assert pipeline.wait("scene", timeout=5) == "connected + scene"
+    assert pipeline.wait(timeout=5) == {"db": "connected", "scene": "connected + scene"}
+    assert pipeline.progress() == (1.0, "Ready")
+    assert all(duration is not None for duration in pipeline.timings().values())
+
+
+def test_wait_returns_a_stage_before_later_ones_finish():
+    started, release = threading.Event(), threading.Event()
+
+    def slow(results):
+        started.set()
+        return release.wait(5)
+
+    pipeline = (
+        WarmupPipeline()
+        .add_stage("db", "Opening the crypt", lambda results: 1)
+        .add_stage("slow", "Summoning", slow)
+        .start()
+    )
+    assert pipeline.wait("db", timeout=5) == 1
+    assert started.wait(5)
+    assert not pipeline.is_done()
+    assert pipeline.progress() == (0.5, "Summoning")
+    release.set()
+    pipeline.wait(timeout=5)
+
+
+def test_a_failed_stage_is_raised_to_waiters():
+    def fail(results):
+        raise RuntimeError("no database")
+
+    pipeline = WarmupPipeline().add_stage("db", "Opening", fail).add_stage("scene", "Never", lambda r: 1).start()
+    with pytest.raises(RuntimeError, match="no database"):
+        pipeline.wait("scene", timeout=5)
+    assert pipeline.progress() == (0.0, "Failed")
@@ -0,0 +1,108 @@
+import json
+
+from src.agents.dungeon_master import dm as dm_module
+from src.agents.runtime import DONE
+from src.db import crud
+from src.utils.structured import parse_world_facts
+
+
+def _facts_json(**overrides):
+    facts = {
+        "locations": [{"name": "  The   Crypt ", "description": "Damp stone"}],
+        "entities": [{"name": "Ghoul", "type": "monster", "description": "Hungry", "location": "The Crypt"}],
+        "player_location": "The Crypt",
+    }
+    facts.update(overrides)
+    return json.dumps(facts)
+
+
+def test_parse_world_facts_cleans_fields():
+    facts = parse_world_facts(_facts_json(), max_items=5)
+    assert facts["locations"] == [{"name": "The Crypt", "description": "Damp stone"}]
+    # Unknown entity types are recorded as features
+    assert facts["entities"][0]["type"] == "feature"
+    assert facts["player_location"] == "The Crypt"
+
+
+def test_parse_world_facts_limits_and_rejects():
+    many = [{"name": f"Room {n}", "description": ""} for n in range(5)]
+    facts = parse_world_facts(_facts_json(locations=many + [{"name": ""}], player_location=""), max_items=2)
+    assert [location["name"] for location in facts["locations"]] == ["Room 0", "Room 1"]
+    assert facts["locations"][0]["description"] is None
+    assert facts["player_location"] is None
+
+    assert parse_world_facts("not json", 5) is None
+    assert parse_world_facts(_facts_json(entities="Ghoul"), 5) is None
+
+
+def test_upsert_world_facts_matches_names_case_insensitively(game_db):
+    ids = crud.upsert_world_facts(
+        [{"name": "The Crypt", "description": "Damp stone"}],
+        [{"name": "Ghoul", "type": "creature", "description": "Hungry", "location": "The Crypt"}]
+    )
+    crypt_id = ids["the crypt"]
+
+    # A later mention without a description keeps the stored one
+    again = crud.upsert_world_facts(
+        [{"name": "the crypt", "description": None}],
+        [{"name": "GHOUL", "type": "creature", "description": None, "location": None}]
+    )
+    assert again == {"the crypt": crypt_id}
+    [location] = crud.get_all_locations()
+    assert (location.name, location.description) == ("The Crypt", "Damp stone")
+    [ghoul] = crud.get_entities_by_location(crypt_id)
+    assert (ghoul.name, ghoul.description) == ("Ghoul", "Hungry")
+
+
+def test_world_applies_facts_and_moves_the_player(world):
+    assert world.apply_world_facts({"locations": [], "entities": [], "player_location": None}) is None
+
+    facts = {"locations": [], "entities": [], "player_location": "Bell Tower"}
+    location_id = world.apply_world_facts(facts)
+    assert world.get_location_info(location_id)["location"].name == "Bell Tower"
+
+    assert world.set_player_location(location_id)
+    assert not world.set_player_location(location_id)
+    assert world.get_current_world_state()["session_data"]["current_location_id"] == location_id
+
+
+def test_extractor_maps_the_scene_for_the_next_turn(dm, monkeypatch):
+    monkeypatch.setattr(dm_module, "WORLD_EXTRACTION", True)
+    dm.turn_count = 1
+    dm._start_turn_agents("walk to the gates", "You reach the castle gates. A coachman waits.")
+    run = dm._agent_run
+    run.wait(timeout=5)
+
+    assert run.status["world_extractor"] == DONE
+    assert run.results("world_extractor")["world_facts"]["moved"]
+    assert [npc.name for npc in dm._scene_npcs()] == ["The Coachman"]
+
+    metrics = dm.get_world_extraction_metrics()
+    assert (metrics["runs"], metrics["parsed"], metrics["moves"], metrics["parse_rate"]) == (1, 1, 1, 1.0)
+    assert (metrics["locations"], metrics["entities"]) == (1, 1)
+
+
+def test_only_actors_get_npc_reactors(dm, world):
+    location_id = world.create_location("Chapel", "Ruined")
+    world.create_entity("Priest", "npc", "Nervous", location_id)
+    world.create_entity("Bat", "creature", "Restless", location_id)
+    world.create_entity("Altar", "feature", "Cracked", location_id)
+    world.set_player_location(location_id)
+
+    assert sorted(npc.name for npc in dm._scene_npcs()) == ["Bat", "Priest"]
+
+
+def test_moving_the_player_survives_a_concurrent_plot_update(world):
+    location_id = world.apply_world_facts({"locations": [], "entities": [], "player_location": "Bell Tower"})
+    session_before = world.get_current_world_state()["session_data"]
+
+    # The turn writes the plot while the extractor moves the player; neither overwrites the other
+    world.set_player_location(location_id)
+    world.update_world_state(plot_progress="plot_point_1", world_state={"plot_points": ["Ring the bell"]})
+
+    state = world.get_current_world_state()
+    assert state["session_data"] == dict(session_before, current_location_id=location_id)
+    assert (state["plot_progress"], state["world_state"]) == ("plot_point_1", {"plot_points": ["Ring the bell"]})
+
+    crud.update_game_state(world_state={"plot_points": []})
+    assert world.get_current_world_state()["plot_progress"] == "plot_point_1"